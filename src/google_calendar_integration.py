@@ -28,17 +28,18 @@ TOKEN_FILE = 'token.pickle'
 class GoogleCalendarIntegration:
     """Клас для інтеграції з Google Calendar"""
     
-    def __init__(self, credentials_file=CREDENTIALS_FILE, token_file=TOKEN_FILE):
+    def __init__(self, credentials_file=CREDENTIALS_FILE, token_file=TOKEN_FILE, task_manager=None):
         """
         Ініціалізація інтеграції з Google Calendar
         
         :param credentials_file: Шлях до файлу з даними облікових даних
         :param token_file: Шлях до файлу з токеном
+        :param task_manager: Менеджер задач (за замовчуванням створюється новий)
         """
         self.credentials_file = credentials_file
         self.token_file = token_file
         self.service = None
-        self.task_manager = TaskManager()
+        self.task_manager = task_manager or TaskManager(shared=True)
     
     def authenticate(self):
         """
@@ -131,6 +132,24 @@ class GoogleCalendarIntegration:
         """
         Конвертація подій календаря в задачі
         
+        Усі зміни зберігаються одним записом після обробки всіх подій.
+        
+        :param events: Список подій календаря
+        :param category: Категорія для нових задач
+        :return: Кількість доданих задач або -1, якщо зміни не вдалося зберегти
+        """
+        with self.task_manager.batch() as batch:
+            added_count = self._apply_events(events, category)
+        
+        if not batch.committed:
+            return -1
+        
+        return added_count
+    
+    def _apply_events(self, events, category):
+        """
+        Застосування подій календаря до задач
+        
         :param events: Список подій календаря
         :param category: Категорія для нових задач
         :return: Кількість доданих задач
@@ -171,15 +190,12 @@ class GoogleCalendarIntegration:
             
             if task:
                 # Оновлення існуючої задачі
-                for i, t in enumerate(self.task_manager.get_all_tasks()):
-                    if t.get('name') == summary:
-                        self.task_manager.update_task(
-                            i,
-                            completed=completed,
-                            due_date=due_date,
-                            priority=priority
-                        )
-                        break
+                self.task_manager.update_task_by_name(
+                    summary,
+                    completed=completed,
+                    due_date=due_date,
+                    priority=priority
+                )
             else:
                 # Додавання нової задачі
                 if self.task_manager.add_task(
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import ssl
+import json
+import time
+import uuid
+import shutil
+import logging
+import threading
+import subprocess
+from collections import deque
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from requests.adapters import HTTPAdapter
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# httpx - необов'язкова залежність для HTTP/2 (pip install httpx[http2])
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Параметри транспорту за замовчуванням
+CONNECT_TIMEOUT = 5   # Тайм-аут встановлення з'єднання (секунди)
+READ_TIMEOUT = 30     # Тайм-аут очікування відповіді (секунди)
+POOL_MAXSIZE = 10     # Кількість відкритих з'єднань з одним хостом
+LATENCY_WINDOW = 1000  # Кількість останніх запитів, за якими рахуються перцентилі
+
+# Запас тайм-ауту відповіді понад час довгого опитування (getUpdates)
+LONG_POLL_MARGIN = 10
+
+
+class _HttpxResponse:
+    """Відповідь httpx з інтерфейсом відповіді requests (raise_for_status, json)"""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.text = response.text
+
+    def json(self):
+        return self._response.json()
+
+    def raise_for_status(self):
+        try:
+            self._response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            raise requests.HTTPError(str(e), response=self)
+
+
+class MultipartBody:
+    """
+    Тіло запиту multipart/form-data, що читається частинами
+
+    requests кодує files=... повністю в пам'яті; це тіло натомість віддає
+    поля та вміст файлів блоками під час відправки. Довжина відома
+    заздалегідь, тому запит надсилається з Content-Length. Файли
+    приймаються в тих самих формах, що й у requests: файловий об'єкт,
+    байти, рядок або кортеж з ім'ям файлу.
+    """
+
+    def __init__(self, fields, files):
+        """
+        Ініціалізація тіла запиту
+
+        :param fields: Словник текстових полів
+        :param files: Словник "поле -> файл або (ім'я файлу, файл[, тип вмісту[, заголовки]])";
+                      файлом можуть бути байти, рядок або файловий об'єкт, що читається
+                      з поточної позиції до кінця
+        """
+        boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        self._parts = []
+
+        for name, value in (fields or {}).items():
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, ensure_ascii=False)
+            self._parts.append((f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                                f'{value}\r\n').encode('utf-8'))
+
+        for name, value in files.items():
+            filename, f, content_type, headers = self._file_spec(name, value)
+            header = (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                      f'filename="{filename}"\r\nContent-Type: {content_type}\r\n')
+            for key, header_value in headers.items():
+                header += f'{key}: {header_value}\r\n'
+            self._parts.append((header + '\r\n').encode('utf-8'))
+            self._parts.append(f)
+            self._parts.append(b'\r\n')
+
+        self._parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+        self._length = sum(self._part_length(part) for part in self._parts)
+        self._position = 0
+        self._buffer = b''
+
+    @staticmethod
+    def _file_spec(name, value):
+        """
+        Розбір опису файлу у формі, яку приймає requests
+
+        :param name: Назва поля
+        :param value: Файл або кортеж (ім'я файлу, файл[, тип вмісту[, заголовки]])
+        :return: Кортеж (ім'я файлу, байти або файловий об'єкт, тип вмісту, заголовки)
+        """
+        content_type, headers = None, {}
+        if isinstance(value, (tuple, list)):
+            filename, f = value[0], value[1]
+            if len(value) > 2:
+                content_type = value[2]
+            if len(value) > 3:
+                headers = value[3] or {}
+        else:
+            f = value
+            filename = getattr(f, 'name', None)
+            if isinstance(filename, str) and not filename.startswith('<'):
+                filename = os.path.basename(filename)
+            else:
+                filename = name
+
+        if isinstance(f, str):
+            f = f.encode('utf-8')
+        elif isinstance(f, (bytearray, memoryview)):
+            f = bytes(f)
+        elif not isinstance(f, bytes) and not MultipartBody._seekable(f):
+            # Потік без позиції (канал, сокет) читається в пам'ять, щоб знати довжину
+            f = f.read()
+            if isinstance(f, str):
+                f = f.encode('utf-8')
+        return filename, f, content_type or 'application/octet-stream', headers
+
+    @staticmethod
+    def _seekable(f):
+        """
+        Чи можна визначити довжину файлу через seek/tell
+
+        :param f: Файловий об'єкт
+        :return: True або False
+        """
+        try:
+            return f.seekable()
+        except AttributeError:
+            return hasattr(f, 'seek') and hasattr(f, 'tell')
+        except (OSError, ValueError):
+            return False
+
+    @staticmethod
+    def _part_length(part):
+        """
+        Довжина частини тіла
+
+        :param part: Байти або двійковий файл
+        :return: Кількість байтів від поточної позиції до кінця
+        """
+        if isinstance(part, bytes):
+            return len(part)
+
+        position = part.tell()
+        try:
+            # Звичайний файл: розмір без переміщення позиції
+            return os.fstat(part.fileno()).st_size - position
+        except (AttributeError, OSError, ValueError):
+            pass
+        part.seek(0, os.SEEK_END)
+        end = part.tell()
+        part.seek(position)
+        return end - position
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        """
+        Читання наступного блоку тіла
+
+        :param size: Максимальна кількість байтів (-1 - усе, що залишилось)
+        :return: Байти (порожні в кінці тіла)
+        """
+        if size is None or size < 0:
+            size = self._length
+
+        while not self._buffer and self._position < len(self._parts):
+            part = self._parts[self._position]
+            if isinstance(part, bytes):
+                self._buffer = part
+                self._position += 1
+            else:
+                self._buffer = part.read(size)
+                if not self._buffer:
+                    self._position += 1
+
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(65536)
+            if not chunk:
+                return
+            yield chunk
+
+
+class HttpTransport:
+    """
+    Спільний HTTP транспорт для клієнтів месенджерів
+
+    Для кожного хоста тримається окрема сесія з пулом keep-alive з'єднань,
+    тому TCP та TLS з'єднання встановлюються один раз і повторно
+    використовуються наступними запитами замість нового рукостискання на
+    кожен виклик API. З http2=True (потрібен httpx з h2) запити до хоста
+    мультиплексуються в одному з'єднанні HTTP/2.
+
+    Помилки мають типи requests (requests.RequestException) в обох режимах,
+    тому клієнти обробляють їх однаково. Для кожного хоста збирається
+    статистика: кількість запитів, помилок, відкритих з'єднань та затримки.
+    """
+
+    def __init__(self, pool_maxsize=POOL_MAXSIZE, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, http2=False):
+        """
+        Ініціалізація транспорту
+
+        :param pool_maxsize: Максимальна кількість з'єднань з одним хостом
+        :param connect_timeout: Тайм-аут встановлення з'єднання в секундах
+        :param read_timeout: Тайм-аут очікування відповіді в секундах
+        :param http2: Використовувати HTTP/2 (якщо встановлено httpx)
+        """
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.http2 = http2
+        if http2 and httpx is None:
+            logger.warning("Для HTTP/2 потрібен пакет httpx[http2], використовується HTTP/1.1")
+            self.http2 = False
+
+        self._clients = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _client(self, host):
+        """
+        Сесія для хоста (створюється під час першого запиту)
+
+        :param host: Схема та адреса хоста ("https://api.telegram.org")
+        :return: requests.Session або httpx.Client
+        """
+        with self._lock:
+            client = self._clients.get(host)
+            if client is None:
+                if self.http2:
+                    client = httpx.Client(
+                        http2=True,
+                        limits=httpx.Limits(max_connections=self.pool_maxsize,
+                                            max_keepalive_connections=self.pool_maxsize)
+                    )
+                else:
+                    client = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                    client.mount('https://', adapter)
+                    client.mount('http://', adapter)
+                self._clients[host] = client
+                self._stats[host] = {
+                    'requests': 0,
+                    'errors': 0,
+                    'latencies': deque(maxlen=LATENCY_WINDOW)
+                }
+            return client
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """
+        Виконання HTTP запиту через пул з'єднань хоста
+
+        :param method: HTTP метод
+        :param url: URL запиту
+        :param timeout: Тайм-аут очікування відповіді в секундах (None - read_timeout)
+        :param kwargs: Параметри запиту (json, data, headers)
+        :return: Відповідь (status_code, json(), raise_for_status())
+        """
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        client = self._client(host)
+        read_timeout = self.read_timeout if timeout is None else timeout
+
+        start = time.perf_counter()
+        try:
+            if self.http2:
+                if 'data' in kwargs and not isinstance(kwargs['data'], dict):
+                    # Потокове тіло (MultipartBody) передається в httpx як content
+                    kwargs['content'] = kwargs.pop('data')
+                try:
+                    response = _HttpxResponse(client.request(
+                        method, url, timeout=httpx.Timeout(read_timeout, connect=self.connect_timeout), **kwargs))
+                except httpx.TimeoutException as e:
+                    raise requests.Timeout(str(e))
+                except httpx.HTTPError as e:
+                    raise requests.ConnectionError(str(e))
+            else:
+                response = client.request(method, url, timeout=(self.connect_timeout, read_timeout), **kwargs)
+        except requests.RequestException:
+            self._record(host, start, error=True)
+            raise
+        self._record(host, start, error=False)
+        return response
+
+    def post(self, url, **kwargs):
+        """
+        POST запит
+
+        :param url: URL запиту
+        :param kwargs: Параметри запиту (json, data, headers, timeout)
+        :return: Відповідь
+        """
+        return self.request('POST', url, **kwargs)
+
+    def _record(self, host, start, error):
+        """
+        Облік запиту у статистиці хоста
+
+        :param host: Хост
+        :param start: Час початку запиту (perf_counter)
+        :param error: Чи завершився запит помилкою
+        """
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self._stats[host]
+            stats['requests'] += 1
+            if error:
+                stats['errors'] += 1
+            else:
+                stats['latencies'].append(elapsed)
+
+    def _connections(self, host):
+        """
+        Кількість з'єднань, відкритих для хоста
+
+        :param host: Хост
+        :return: Кількість або None (для HTTP/2 не відстежується)
+        """
+        client = self._clients.get(host)
+        if self.http2:
+            return None
+        if client is None:
+            return 0
+        total = 0
+        for adapter in {id(adapter): adapter for adapter in client.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    total += pool.num_connections
+        return total
+
+    def stats(self):
+        """
+        Статистика запитів за хостами
+
+        Затримки рахуються за останніми LATENCY_WINDOW успішними запитами.
+
+        :return: Словник "хост -> {requests, errors, connections, latency_ms: {avg, p50, p95, max}}"
+        """
+        result = {}
+        with self._lock:
+            for host, stats in self._stats.items():
+                latencies = sorted(stats['latencies'])
+                latency = {}
+                if latencies:
+                    latency = {
+                        'avg': round(sum(latencies) / len(latencies) * 1000, 2),
+                        'p50': round(latencies[len(latencies) // 2] * 1000, 2),
+                        'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2),
+                        'max': round(latencies[-1] * 1000, 2)
+                    }
+                result[host] = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'connections': self._connections(host),
+                    'latency_ms': latency
+                }
+        return result
+
+    def close(self):
+        """Закриття всіх з'єднань"""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            client.close()
+
+
+# Транспорт, спільний для всіх клієнтів процесу
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def shared_transport():
+    """
+    Спільний для процесу HTTP транспорт
+
+    :return: HttpTransport
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport()
+        return _transport
+
+
+def configure_transport(**options):
+    """
+    Налаштування спільного транспорту
+
+    Попередній транспорт закривається; клієнти отримують новий під час
+    наступного запиту.
+
+    :param options: Параметри HttpTransport (pool_maxsize, connect_timeout, read_timeout, http2)
+    :return: HttpTransport
+    """
+    global _transport
+    with _transport_lock:
+        previous, _transport = _transport, HttpTransport(**options)
+    if previous is not None:
+        previous.close()
+    return _transport
+
+
+def _self_signed_certificate(directory):
+    """
+    Самопідписаний сертифікат для 127.0.0.1 (потрібна утиліта openssl)
+
+    :param directory: Каталог для файлів сертифіката та ключа
+    :return: Кортеж (шлях до сертифіката, шлях до ключа) або None, якщо openssl недоступний
+    """
+    if shutil.which('openssl') is None:
+        return None
+    certificate = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    try:
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                        '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1',
+                        '-keyout', key, '-out', certificate],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.error(f"Не вдалося створити сертифікат: {e}")
+        return None
+    return certificate, key
+
+
+class _BenchmarkServer:
+    """Локальний імітатор Bot API для main(): відповідає на кожен POST; з сертифікатом - через HTTPS"""
+
+    def __init__(self, certificate=None):
+        """
+        Запуск сервера на випадковому порту
+
+        :param certificate: Кортеж (сертифікат, ключ) для HTTPS або None для HTTP
+        """
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Заголовки й тіло пишуться окремо; без TCP_NODELAY тіло чекає на затримане ACK (~40 мс)
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                payload = b'{"ok":true,"result":{"message_id":1}}'
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        scheme = 'http'
+        if certificate:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*certificate)
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+            scheme = 'https'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'{scheme}://127.0.0.1:{self.server.server_port}/bottoken/sendMessage'
+
+    def close(self):
+        """Зупинка сервера"""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def compare_latency(url, count, verify=True):
+    """
+    Затримки запитів: нове з'єднання на кожен запит проти спільного транспорту
+
+    :param url: URL запиту
+    :param count: Кількість запитів кожним способом
+    :param verify: Перевірка сертифіката (True, False або шлях до сертифіката CA)
+    :return: Словник {requests, transport}: перцентилі затримок у мілісекундах
+             ({avg, p50, p95}) та, для транспорту, кількість з'єднань
+    """
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        requests.post(url, json={}, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), verify=verify)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    transport = HttpTransport()
+    try:
+        for _ in range(count):
+            transport.post(url, json={}, verify=verify)
+        stats = next(iter(transport.stats().values()))
+    finally:
+        transport.close()
+
+    latency = stats['latency_ms']
+    return {
+        'requests': {
+            'avg': round(sum(latencies) / len(latencies) * 1000, 2),
+            'p50': round(latencies[len(latencies) // 2] * 1000, 2),
+            'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2)
+        },
+        'transport': {
+            'avg': latency['avg'],
+            'p50': latency['p50'],
+            'p95': latency['p95'],
+            'connections': stats['connections']
+        }
+    }
+
+
+# Порівняння затримок з пулом з'єднань та без нього
+def main():
+    """
+    Затримки запитів: нове з'єднання на кожен запит проти спільного транспорту
+
+    Без URL порівняння виконується на локальному імітаторі через HTTP та,
+    якщо доступний openssl, через HTTPS із самопідписаним сертифікатом.
+    """
+    import sys
+    import tempfile
+
+    args = sys.argv[1:]
+    url = args.pop(0) if args and '://' in args[0] else None
+    count = int(args[0]) if args else 100
+
+    def report(name, result):
+        for label, stats in (("requests.post (нове з'єднання)", result['requests']),
+                             ("HttpTransport", result['transport'])):
+            line = f"{name} {label}: середня {stats['avg']:.2f} мс, p50 {stats['p50']:.2f} мс, p95 {stats['p95']:.2f} мс"
+            if 'connections' in stats:
+                line += f", з'єднань {stats['connections']} на {count} запитів"
+            print(line)
+
+    if url:
+        report(url, compare_latency(url, count))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        certificate = _self_signed_certificate(directory)
+        for name, server_certificate in (("HTTP", None), ("HTTPS", certificate)):
+            if name == "HTTPS" and certificate is None:
+                print("HTTPS пропущено: для сертифіката потрібна утиліта openssl")
+                continue
+            server = _BenchmarkServer(server_certificate)
+            try:
+                report(name, compare_latency(server.url, count, verify=certificate[0] if server_certificate else True))
+            finally:
+                server.close()
+
+
+if __name__ == "__main__":
+    main()
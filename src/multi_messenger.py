@@ -5,11 +5,18 @@ import os
 import json
 import time
 import logging
+import functools
 import requests
 import schedule
 from datetime import datetime
-from threading import Thread
+from threading import Thread, RLock
 from abc import ABC, abstractmethod
+from src.task_shards import TaskShards
+from src.task_file_cache import shared_cache
+from src.task_persistence import write_atomic
+from src.http_transport import shared_transport, configure_transport, MultipartBody, LONG_POLL_MARGIN
+from src.update_poller import UpdatePoller
+from src.outbound_queue import OutboundQueue, RateLimited, retry_after_from, PRIORITY_INTERACTIVE, PRIORITY_BULK
 
 # Налаштування логування
 logging.basicConfig(
@@ -91,13 +98,15 @@ class TelegramAPI(MessengerAPI):
         
         return True
     
-    def api_request(self, method, data=None, files=None):
+    def api_request(self, method, data=None, files=None, timeout=None, raise_rate_limit=False):
         """
         Виконання запиту до Telegram API
         
         :param method: Метод API
         :param data: Дані для запиту
         :param files: Файли для відправки
+        :param timeout: Тайм-аут відповіді в секундах (None - тайм-аут транспорту)
+        :param raise_rate_limit: Піднімати RateLimited на відповідь 429 (для черги вихідних повідомлень)
         :return: Дані відповіді або None у разі помилки
         """
         if not self.token:
@@ -108,10 +117,16 @@ class TelegramAPI(MessengerAPI):
         
         try:
             if files:
-                response = requests.post(url, data=data, files=files, timeout=30)
+                body = MultipartBody(data, files)
+                response = shared_transport().post(url, data=body, timeout=timeout, headers={
+                    'Content-Type': body.content_type,
+                    'Content-Length': str(len(body))
+                })
             else:
-                response = requests.post(url, json=data, timeout=30)
+                response = shared_transport().post(url, json=data, timeout=timeout)
             
+            if response.status_code == 429 and raise_rate_limit:
+                raise RateLimited(retry_after_from(response))
             response.raise_for_status()
             result = response.json()
             
@@ -124,12 +139,13 @@ class TelegramAPI(MessengerAPI):
             logger.error(f"Помилка запиту: {e}")
             return None
     
-    def get_updates(self, offset=0, timeout=30):
+    def get_updates(self, offset=0, timeout=30, limit=None):
         """
         Отримання оновлень від Telegram API
         
         :param offset: ID останнього отриманого оновлення + 1
         :param timeout: Час очікування в секундах
+        :param limit: Максимальна кількість оновлень (None - за замовчуванням Telegram, 100)
         :return: Список оновлень
         """
         data = {
@@ -137,7 +153,9 @@ class TelegramAPI(MessengerAPI):
             'timeout': timeout,
             'allowed_updates': ['message', 'callback_query']
         }
-        return self.api_request('getUpdates', data)
+        if limit:
+            data['limit'] = limit
+        return self.api_request('getUpdates', data, timeout=timeout + LONG_POLL_MARGIN)
     
     def send_message(self, chat_id, text, **kwargs):
         """
@@ -145,7 +163,7 @@ class TelegramAPI(MessengerAPI):
         
         :param chat_id: ID чату
         :param text: Текст повідомлення
-        :param kwargs: Додаткові параметри (parse_mode, reply_markup)
+        :param kwargs: Додаткові параметри (parse_mode, reply_markup, raise_rate_limit)
         :return: Відправлене повідомлення
         """
         data = {
@@ -158,7 +176,7 @@ class TelegramAPI(MessengerAPI):
             if key in ['parse_mode', 'reply_markup']:
                 data[key] = value
         
-        return self.api_request('sendMessage', data)
+        return self.api_request('sendMessage', data, raise_rate_limit=kwargs.get('raise_rate_limit', False))
     
     def process_update(self, update_data):
         """
@@ -186,30 +204,21 @@ class TelegramAPI(MessengerAPI):
         
         return None
     
+    def handle_update(self, update):
+        """
+        Передача оновлення обробнику повідомлень
+        
+        :param update: Оновлення Telegram
+        """
+        if getattr(self, 'message_handler', None):
+            message_data = self.process_update(update)
+            if message_data:
+                self.message_handler(message_data)
+    
     def start_polling(self):
-        """Початок опитування Telegram API"""
+        """Початок опитування Telegram API (без пауз між запитами, пакети обробляються пулом потоків)"""
         logger.info("Початок опитування Telegram API")
-        
-        while True:
-            try:
-                updates = self.get_updates(offset=self.last_update_id + 1)
-                
-                if updates:
-                    for update in updates:
-                        update_id = update.get('update_id')
-                        if update_id > self.last_update_id:
-                            self.last_update_id = update_id
-                        
-                        # Обробка повідомлення через callback
-                        if self.message_handler:
-                            message_data = self.process_update(update)
-                            if message_data:
-                                self.message_handler(message_data)
-            
-            except Exception as e:
-                logger.error(f"Помилка під час опитування Telegram: {e}")
-            
-            time.sleep(1)
+        UpdatePoller(self).run()
 
 
 class ViberAPI(MessengerAPI):
@@ -266,7 +275,7 @@ class ViberAPI(MessengerAPI):
         }
         
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = shared_transport().post(url, json=data, headers=headers)
             response.raise_for_status()
             result = response.json()
             
@@ -376,7 +385,7 @@ class WhatsAppAPI(MessengerAPI):
         
         :param recipient_id: ID отримувача (номер телефону)
         :param text: Текст повідомлення
-        :param kwargs: Додаткові параметри
+        :param kwargs: Додаткові параметри (raise_rate_limit)
         :return: Результат операції
         """
         if not self.token or not self.phone_number_id:
@@ -400,7 +409,9 @@ class WhatsAppAPI(MessengerAPI):
         }
         
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = shared_transport().post(url, json=data, headers=headers)
+            if response.status_code == 429 and kwargs.get('raise_rate_limit'):
+                raise RateLimited(retry_after_from(response))
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -454,8 +465,20 @@ class MultiMessengerBot:
     def __init__(self):
         """Ініціалізація мультимесенджер бота"""
         self.messengers = {}
+        self.outboxes = {}  # Черга вихідних повідомлень кожного месенджера
         self.user_states = {}  # {messenger_name: {user_id: state}}
         self.config = self.load_config()
+        self._config_lock = RLock()  # Зміни та запис конфігурації з потоків обробників
+        if self.config.get('http'):
+            # Параметри спільного HTTP транспорту (pool_maxsize, connect_timeout, read_timeout, http2)
+            configure_transport(**self.config['http'])
+        
+        # Окремі файли задач для кожного чату (якщо задано shards_dir у конфігурації)
+        shards_dir = self.config.get('shards_dir')
+        backup_dir = self.config.get('tasks', {}).get('backup_dir')
+        archive_dir = self.config.get('tasks', {}).get('archive_dir')
+        self.shards = TaskShards(shards_dir, shared=True, backup_dir=backup_dir,
+                                 archive_dir=archive_dir) if shards_dir else None
         
         # Підтримувані месенджери
         self.add_messenger('telegram', TelegramAPI())
@@ -476,6 +499,9 @@ class MultiMessengerBot:
         :param messenger_api: Екземпляр MessengerAPI
         """
         self.messengers[name] = messenger_api
+        if name not in self.outboxes:
+            # Ліміти (global_rate, chat_rate, group_rate) спільні для всіх месенджерів
+            self.outboxes[name] = OutboundQueue(name=f'{name}-outbound', **self.config.get('outbound', {}))
         if name not in self.user_states:
             self.user_states[name] = {}
     
@@ -491,32 +517,54 @@ class MultiMessengerBot:
             return {}
     
     def save_config(self):
-        """Збереження конфігурації у файл"""
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Помилка збереження конфігурації: {e}")
+        """
+        Збереження конфігурації у файл
+        
+        Обробники оновлень працюють у кількох потоках, тому зміни конфігурації
+        виконуються під блокуванням _config_lock, а файл записується атомарно.
+        """
+        with self._config_lock:
+            try:
+                write_atomic(CONFIG_FILE, json.dumps(self.config, ensure_ascii=False, indent=2))
+            except Exception as e:
+                logger.error(f"Помилка збереження конфігурації: {e}")
     
     def load_tasks(self):
-        """Завантаження задач з файлу"""
-        try:
-            if os.path.exists(TASKS_FILE):
-                with open(TASKS_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {"tasks": []}
-        except Exception as e:
-            logger.error(f"Помилка завантаження задач: {e}")
-            return {"tasks": []}
+        """
+        Завантаження задач з файлу
+        
+        Файл перечитується лише після його зміни; повернені дані спільні
+        для всіх читачів процесу і не повинні змінюватися.
+        """
+        return shared_cache(TASKS_FILE).get()
     
-    def get_daily_report(self):
+    @staticmethod
+    def tenant_key(messenger_name, chat_id):
+        """
+        Ключ сховища задач чату
+        
+        :param messenger_name: Назва месенджера
+        :param chat_id: ID чату
+        :return: Рядок ключа
+        """
+        return f"{messenger_name}_{chat_id}"
+    
+    def get_daily_report(self, messenger_name=None, chat_id=None):
         """
         Формування щоденного звіту з задач
         
+        Якщо задачі розділено за чатами, звіт формується зі сховища вказаного чату.
+        
+        :param messenger_name: Назва месенджера
+        :param chat_id: ID чату
         :return: Текст звіту
         """
-        tasks_data = self.load_tasks()
-        tasks = tasks_data.get('tasks', [])
+        if self.shards is not None and chat_id is not None:
+            with self.shards.use(self.tenant_key(messenger_name, chat_id)) as task_manager:
+                tasks = task_manager.get_all_tasks()
+        else:
+            tasks_data = self.load_tasks()
+            tasks = tasks_data.get('tasks', [])
         
         today = datetime.now().strftime('%d.%m.%Y')
         report = f"📅 Звіт за день ({today}):\n\n"
@@ -541,6 +589,31 @@ class MultiMessengerBot:
         
         return report
     
+    def send(self, messenger_name, chat_id, text, priority=PRIORITY_INTERACTIVE, wait=False, **kwargs):
+        """
+        Відправка повідомлення через чергу вихідних повідомлень месенджера
+        
+        Повідомлення чекає на ліміти месенджера для бота та чату і
+        повторюється після відповіді 429 через вказаний у ній час.
+        Обробник не чекає на відправку; повідомлення одного чату
+        надсилаються в порядку постановки в чергу.
+        
+        :param messenger_name: Назва месенджера
+        :param chat_id: ID чату
+        :param text: Текст повідомлення
+        :param priority: Пріоритет (PRIORITY_INTERACTIVE - відповідь, PRIORITY_BULK - звіт)
+        :param wait: Чекати на відправку (якщо потрібен її результат)
+        :param kwargs: Додаткові параметри send_message месенджера
+        :return: Результат відправки (якщо wait) або Future з ним
+        """
+        messenger = self.messengers[messenger_name]
+        future = self.outboxes[messenger_name].submit(
+            chat_id,
+            functools.partial(messenger.send_message, chat_id, text, raise_rate_limit=True, **kwargs),
+            priority
+        )
+        return future.result() if wait else future
+    
     def handle_message(self, message_data):
         """
         Обробка вхідного повідомлення
@@ -562,23 +635,23 @@ class MultiMessengerBot:
         user_state = self.user_states.get(messenger_name, {}).get(user_id, 0)
         
         # Збереження chat_id, якщо потрібно
-        messenger_config = self.config.get(messenger_name, {})
-        if not messenger_config.get('chat_id'):
-            messenger_config['chat_id'] = chat_id
-            self.config[messenger_name] = messenger_config
-            self.save_config()
+        with self._config_lock:
+            messenger_config = self.config.setdefault(messenger_name, {})
+            if not messenger_config.get('chat_id'):
+                messenger_config['chat_id'] = chat_id
+                self.save_config()
         
         # Обробка стану очікування токена
         if user_state == 1:  # Стан очікування токена
-            messenger_config['token'] = text.strip()
-            self.config[messenger_name] = messenger_config
-            self.save_config()
+            with self._config_lock:
+                messenger_config['token'] = text.strip()
+                self.save_config()
             
             # Повторна ініціалізація месенджера з новим токеном
             messenger.initialize(messenger_config)
             
             # Відправка підтвердження
-            messenger.send_message(chat_id, "✅ Токен успішно збережено!")
+            self.send(messenger_name, chat_id, "✅ Токен успішно збережено!")
             self.user_states[messenger_name][user_id] = 0
             return
         
@@ -587,7 +660,8 @@ class MultiMessengerBot:
             command = text.split()[0].lower()
             
             if command == '/start':
-                messenger.send_message(
+                self.send(
+                    messenger_name,
                     chat_id,
                     "👋 Вітаю! Я ваш особистий бот для керування задачами.\n\n"
                     "🔹 Доступні команди:\n"
@@ -598,31 +672,37 @@ class MultiMessengerBot:
                 )
             
             elif command == '/settings':
-                messenger.send_message(chat_id, "🔑 Будь ласка, введіть токен бота:")
+                self.send(messenger_name, chat_id, "🔑 Будь ласка, введіть токен бота:")
                 if messenger_name not in self.user_states:
                     self.user_states[messenger_name] = {}
                 self.user_states[messenger_name][user_id] = 1  # Стан очікування токена
             
             elif command == '/report':
                 if not messenger_config.get('token'):
-                    messenger.send_message(chat_id, "❌ Спочатку налаштуйте токен через /settings")
+                    self.send(messenger_name, chat_id, "❌ Спочатку налаштуйте токен через /settings")
                     return
                 
-                report = self.get_daily_report()
-                messenger.send_message(chat_id, report)
+                report = self.get_daily_report(messenger_name, chat_id)
+                self.send(messenger_name, chat_id, report)
     
     def send_report_to_all(self):
         """Надсилання звіту всім активним месенджерам"""
-        report = self.get_daily_report()
-        
-        for name, messenger in self.messengers.items():
+        # Звіти ставляться в черги одразу і не затримують відповіді користувачам
+        sent = {}
+        for name in self.messengers:
             chat_id = self.config.get(name, {}).get('chat_id')
             if chat_id:
                 try:
-                    messenger.send_message(chat_id, report)
-                    logger.info(f"Звіт надіслано у {name}")
+                    report = self.get_daily_report(name, chat_id)
+                    sent[name] = self.send(name, chat_id, report, priority=PRIORITY_BULK, wait=False)
                 except Exception as e:
                     logger.error(f"Помилка надсилання звіту у {name}: {e}")
+        
+        for name, future in sent.items():
+            if future.result() is not None:
+                logger.info(f"Звіт надіслано у {name}")
+            else:
+                logger.error(f"Помилка надсилання звіту у {name}")
     
     def run_scheduler(self):
         """Запуск планувальника для щоденних звітів"""
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Ліміти Telegram за замовчуванням
+GLOBAL_RATE = 30         # Повідомлень на секунду для всього бота
+CHAT_RATE = 1            # Повідомлень на секунду в одному чаті
+GROUP_RATE = 20 / 60     # Повідомлень на секунду в групі (20 на хвилину)
+CHAT_BURST = 1           # Повідомлень в один чат без очікування (більше - ризик відповіді 429)
+
+SENDERS = 4              # Потоки, що надсилають повідомлення
+MAX_RETRIES = 5          # Кількість повторів після відповіді 429
+IDLE_TTL = 60            # Час (секунди), після якого стан неактивного чату видаляється
+
+# Пріоритети: відповіді користувачам надсилаються раніше за масові звіти
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+
+class RateLimited(Exception):
+    """Відповідь 429 Too Many Requests з часом, після якого можна повторити запит"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Перевищено ліміт запитів, повтор через {retry_after} с")
+        self.retry_after = retry_after
+
+
+def retry_after_from(response):
+    """
+    Час очікування з відповіді 429
+
+    :param response: Відповідь HTTP
+    :return: Кількість секунд (parameters.retry_after, заголовок Retry-After або 1)
+    """
+    try:
+        retry_after = response.json().get('parameters', {}).get('retry_after')
+    except ValueError:
+        retry_after = None
+    if retry_after is None:
+        retry_after = response.headers.get('Retry-After')
+    try:
+        return max(float(retry_after), 0)
+    except (TypeError, ValueError):
+        return 1
+
+
+class TokenBucket:
+    """Відро токенів: rate токенів на секунду, не більше capacity одночасно"""
+
+    def __init__(self, rate, capacity):
+        """
+        Ініціалізація відра
+
+        :param rate: Швидкість поповнення (токенів на секунду)
+        :param capacity: Місткість відра
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def delay(self, now):
+        """
+        Час до появи токена
+
+        :param now: Поточний час (time.monotonic)
+        :return: Секунди (0, якщо токен доступний зараз)
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Використання токена (після перевірки delay)"""
+        self.tokens -= 1
+
+    def full(self, now):
+        """
+        Чи заповнене відро (стан можна відкинути без втрати обмеження)
+
+        :param now: Поточний час (time.monotonic)
+        :return: True, якщо відро повне
+        """
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class _Chat:
+    """Стан черги одного чату"""
+
+    __slots__ = ('bucket', 'items', 'busy', 'not_before', 'idle_since')
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.items = []        # Купа (пріоритет, номер, повідомлення)
+        self.busy = False      # Повідомлення чату зараз надсилається
+        self.not_before = 0    # Не надсилати раніше (retry_after)
+        self.idle_since = None
+
+
+class _Message:
+    """Повідомлення в черзі"""
+
+    __slots__ = ('call', 'future', 'attempts')
+
+    def __init__(self, call):
+        self.call = call
+        self.future = Future()
+        self.attempts = 0
+
+
+class OutboundQueue:
+    """
+    Черга вихідних повідомлень з обмеженням швидкості
+
+    Повідомлення надсилаються з урахуванням спільного відра токенів бота та
+    окремого відра для кожного чату (для груп - повільнішого). Повідомлення
+    одного чату надсилаються по одному та в порядку пріоритету і
+    надходження, а з різних чатів - паралельно кількома потоками.
+
+    Якщо надсилання завершилось RateLimited (відповідь 429), повідомлення
+    повертається в чергу і повторюється через retry_after секунд; інші
+    повідомлення цього чату чекають разом з ним. Відповіді користувачам
+    (PRIORITY_INTERACTIVE) обганяють масові звіти (PRIORITY_BULK).
+    """
+
+    def __init__(self, global_rate=GLOBAL_RATE, chat_rate=CHAT_RATE, group_rate=GROUP_RATE,
+                 chat_burst=CHAT_BURST, senders=SENDERS, max_retries=MAX_RETRIES, name='outbound'):
+        """
+        Ініціалізація черги
+
+        :param global_rate: Повідомлень на секунду для всього бота
+        :param chat_rate: Повідомлень на секунду в одному чаті
+        :param group_rate: Повідомлень на секунду в групі
+        :param chat_burst: Кількість повідомлень в один чат без очікування
+        :param senders: Кількість потоків надсилання
+        :param max_retries: Кількість повторів після 429
+        :param name: Назва потоків черги
+        """
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        # Місткість 1: повідомлення розподіляються рівномірно, без сплесків понад ліміт у будь-якому вікні
+        self._global = TokenBucket(global_rate, 1)
+        self._chats = {}
+        self._ready = []     # Купа (пріоритет, номер, ключ чату) - чати з повідомленнями
+        self._delayed = []   # Купа (час, номер, ключ чату) - чати, що чекають на токен чи retry_after
+        self._seq = itertools.count()
+        self._pending = 0
+        self._closed = False
+        self._swept = time.monotonic()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(senders, thread_name_prefix=f'{name}-sender')
+        self._thread = threading.Thread(target=self._run, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @staticmethod
+    def is_group(chat_id):
+        """
+        Чи є чат групою (ID груп і каналів Telegram від'ємні)
+
+        :param chat_id: ID чату
+        :return: True для групи
+        """
+        return isinstance(chat_id, int) and chat_id < 0
+
+    def submit(self, chat_id, call, priority=PRIORITY_INTERACTIVE, group=None):
+        """
+        Додавання повідомлення до черги
+
+        :param chat_id: ID чату (ключ черги та обмеження швидкості)
+        :param call: Функція без аргументів, що надсилає повідомлення; повертає
+                     результат або піднімає RateLimited
+        :param priority: Пріоритет (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+        :param group: Чи є чат групою (None - за ID чату)
+        :return: Future з результатом call (None, якщо повідомлення не надіслано)
+        """
+        message = _Message(call)
+        with self._condition:
+            if self._closed:
+                logger.error("Черга вихідних повідомлень закрита, повідомлення не надіслано")
+                message.future.set_result(None)
+                return message.future
+
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                if group is None:
+                    group = self.is_group(chat_id)
+                rate = self.group_rate if group else self.chat_rate
+                chat = self._chats[chat_id] = _Chat(TokenBucket(rate, 1 if group else self.chat_burst))
+
+            entry = (priority, next(self._seq), message)
+            heapq.heappush(chat.items, entry)
+            chat.idle_since = None
+            self._pending += 1
+            if not chat.busy:
+                heapq.heappush(self._ready, (entry[0], entry[1], chat_id))
+            self._condition.notify()
+        return message.future
+
+    def _schedule(self, chat_id, chat, now):
+        """
+        Повернення чату до черги готових або відкладених (під блокуванням)
+
+        :param chat_id: ID чату
+        :param chat: Стан чату
+        :param now: Поточний час
+        """
+        if not chat.items:
+            chat.idle_since = now
+            return
+        if chat.not_before > now:
+            heapq.heappush(self._delayed, (chat.not_before, next(self._seq), chat_id))
+        else:
+            priority, seq, _ = chat.items[0]
+            heapq.heappush(self._ready, (priority, seq, chat_id))
+
+    def _next(self, now):
+        """
+        Вибір наступного повідомлення (під блокуванням)
+
+        :param now: Поточний час
+        :return: Кортеж (ID чату, запис черги чату) або час очікування в секундах (None - без обмеження)
+        """
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, chat_id = heapq.heappop(self._delayed)
+            chat = self._chats.get(chat_id)
+            if chat is not None and not chat.busy and chat.items:
+                priority, seq, _ = chat.items[0]
+                heapq.heappush(self._ready, (priority, seq, chat_id))
+
+        while self._ready:
+            priority, seq, chat_id = self._ready[0]
+            chat = self._chats.get(chat_id)
+            # Застарілі записи: чат зайнятий, порожній або має новіше перше повідомлення
+            if chat is None or chat.busy or not chat.items or chat.items[0][:2] != (priority, seq):
+                heapq.heappop(self._ready)
+                continue
+
+            if chat.not_before > now:
+                heapq.heappop(self._ready)
+                heapq.heappush(self._delayed, (chat.not_before, next(self._seq), chat_id))
+                continue
+
+            chat_wait = chat.bucket.delay(now)
+            if chat_wait:
+                heapq.heappop(self._ready)
+                chat.not_before = now + chat_wait
+                heapq.heappush(self._delayed, (chat.not_before, next(self._seq), chat_id))
+                continue
+
+            global_wait = self._global.delay(now)
+            if global_wait:
+                return global_wait
+
+            heapq.heappop(self._ready)
+            self._global.take()
+            chat.bucket.take()
+            chat.busy = True
+            return chat_id, heapq.heappop(chat.items)
+
+        if self._delayed:
+            return self._delayed[0][0] - now
+        return None
+
+    def _sweep(self, now):
+        """
+        Видалення станів давно неактивних чатів (під блокуванням)
+
+        :param now: Поточний час
+        """
+        if now - self._swept < IDLE_TTL:
+            return
+        self._swept = now
+        for chat_id in [chat_id for chat_id, chat in self._chats.items()
+                        if chat.idle_since is not None and now - chat.idle_since >= IDLE_TTL
+                        and chat.bucket.full(now)]:
+            del self._chats[chat_id]
+
+    def _run(self):
+        """Цикл вибору повідомлень для надсилання"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._sweep(now)
+                selected = self._next(now)
+                if isinstance(selected, tuple):
+                    self._executor.submit(self._send, *selected)
+                    continue
+
+                if self._closed and not self._pending:
+                    return
+                self._condition.wait(selected)
+
+    def _send(self, chat_id, entry):
+        """
+        Надсилання повідомлення в потоці надсилання
+
+        :param chat_id: ID чату
+        :param entry: Запис черги чату (пріоритет, номер, повідомлення)
+        """
+        message = entry[2]
+        retry_after = None
+        try:
+            result = message.call()
+        except RateLimited as e:
+            retry_after = e.retry_after
+        except Exception as e:
+            logger.error(f"Помилка надсилання повідомлення в чат {chat_id}: {e}")
+            result = None
+
+        message.attempts += 1
+        if retry_after is not None and message.attempts > self.max_retries:
+            logger.error(f"Повідомлення в чат {chat_id} не надіслано після {message.attempts} спроб (429)")
+            retry_after, result = None, None
+
+        with self._condition:
+            now = time.monotonic()
+            chat = self._chats[chat_id]
+            chat.busy = False
+            if retry_after is not None:
+                logger.warning(f"Перевищено ліміт для чату {chat_id}: повтор через {retry_after} с")
+                chat.not_before = now + retry_after
+                # Повідомлення зберігає своє місце в черзі чату
+                heapq.heappush(chat.items, entry)
+            else:
+                self._pending -= 1
+            self._schedule(chat_id, chat, now)
+            self._condition.notify()
+
+        if retry_after is None:
+            message.future.set_result(result)
+
+    def close(self, timeout=None):
+        """
+        Надсилання повідомлень, що залишились, та зупинка потоків
+
+        :param timeout: Максимальний час очікування в секундах (None - без обмеження)
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
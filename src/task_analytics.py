@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import date, datetime
+from src.task_index import due_key
+from src.task_record import parse_timestamp
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# NumPy - необов'язкова залежність
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Позначка відсутнього значення в числових колонках
+MISSING = -1
+
+SECONDS_PER_DAY = 86400
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class TaskAnalytics:
+    """
+    Аналітика продуктивності за задачами
+
+    Задачі перетворюються на колонки NumPy (коди категорій та пріоритетів,
+    статус, часові позначки), після чого агрегати обчислюються
+    векторизовано. Колонки будуються з одного знімка задач, кешуються і
+    перебудовуються лише після зміни задач (за версією знімка).
+
+    З include_archive=True до колонок додаються задачі з архіву менеджера
+    (archive_dir), тож історія виконаних задач не втрачається після
+    архівування.
+    """
+
+    def __init__(self, task_manager, include_archive=False):
+        """
+        Ініціалізація аналітики
+
+        :param task_manager: Менеджер задач
+        :param include_archive: Враховувати архівні задачі
+        """
+        self.task_manager = task_manager
+        self.include_archive = include_archive
+        self._columns = None
+        self._version = None
+
+    @staticmethod
+    def available():
+        """
+        Перевірка наявності NumPy
+
+        :return: True, якщо аналітика доступна
+        """
+        return np is not None
+
+    def columns(self):
+        """
+        Колонки задач (з кешу, якщо задачі не змінювались)
+
+        :return: Словник колонок: category, priority (коди), categories, priorities
+                 (значення кодів), completed, created, completed_at, due
+        """
+        if np is None:
+            raise RuntimeError("Для аналітики потрібен пакет numpy")
+
+        snapshot = self.task_manager.snapshot()
+        archive = getattr(self.task_manager, 'archive', None) if self.include_archive else None
+        version = (snapshot.version, archive.version if archive is not None else None)
+        if self._columns is None or self._version != version:
+            tasks = snapshot.get_all_tasks()
+            if archive is not None:
+                # Задача, що є і в архіві, і в основному файлі, враховується один раз
+                tasks += [task for task in archive.iter_tasks() if task['id'] not in snapshot.tasks]
+            self._columns = self._build_columns(tasks)
+            self._version = version
+        return self._columns
+
+    @staticmethod
+    def _encode(values):
+        """
+        Кодування значень цілими числами
+
+        :param values: Список значень
+        :return: Кортеж (масив кодів, список значень за кодом)
+        """
+        codes = {}
+        encoded = [codes.setdefault(value, len(codes)) for value in values]
+        return np.array(encoded, dtype=np.int32), list(codes)
+
+    @staticmethod
+    def _timestamps(values):
+        """
+        Перетворення позначок часу у секунди від 01.01.1970
+
+        :param values: Список рядків "DD.MM.YYYY HH:MM:SS" або None
+        :return: Масив int64 (MISSING для відсутніх значень)
+        """
+        result = []
+        for value in values:
+            seconds = parse_timestamp(value)
+            result.append(seconds if isinstance(seconds, int) else MISSING)
+        return np.array(result, dtype=np.int64)
+
+    def _build_columns(self, tasks):
+        """
+        Побудова колонок з задач
+
+        :param tasks: Список задач
+        :return: Словник колонок
+        """
+        category, categories = self._encode([task.get('category') for task in tasks])
+        priority, priorities = self._encode([task.get('priority') for task in tasks])
+
+        due = []
+        for task in tasks:
+            key = due_key(task.get('due_date'))
+            due.append(MISSING if key is None else key)
+
+        return {
+            'category': category,
+            'categories': categories,
+            'priority': priority,
+            'priorities': priorities,
+            'completed': np.array([bool(task.get('completed')) for task in tasks], dtype=bool),
+            'created': self._timestamps([task.get('created_at') for task in tasks]),
+            'completed_at': self._timestamps([task.get('completed_at') for task in tasks]),
+            'due': np.array(due, dtype=np.int64)
+        }
+
+    def completion_by_category_per_day(self, days=None):
+        """
+        Частка виконаних задач за категоріями для кожного дня створення
+
+        :param days: Лише останні N днів (None - усі дні)
+        :return: Словник "дата (DD.MM.YYYY) -> {категорія: {total, completed, rate}}"
+        """
+        columns = self.columns()
+        created = columns['created']
+        mask = created != MISSING
+        day = created[mask] // SECONDS_PER_DAY
+        if not day.size:
+            return {}
+
+        if days is not None:
+            recent = day >= day.max() - days + 1
+            mask[mask] = recent
+            day = day[recent]
+
+        category = columns['category'][mask]
+        completed = columns['completed'][mask]
+        category_count = len(columns['categories'])
+
+        # Групування за парою (день, категорія) одним ключем
+        first_day = day.min()
+        keys = (day - first_day) * category_count + category
+        groups, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse)
+        done = np.bincount(inverse, weights=completed)
+
+        result = {}
+        for key, total, completed_count in zip(groups.tolist(), totals.tolist(), done.tolist()):
+            day_offset, category_code = divmod(key, category_count)
+            label = date.fromordinal(_EPOCH_ORDINAL + int(first_day) + day_offset).strftime('%d.%m.%Y')
+            result.setdefault(label, {})[columns['categories'][category_code]] = {
+                'total': total,
+                'completed': int(completed_count),
+                'rate': round(completed_count / total * 100, 2)
+            }
+        return result
+
+    def median_completion_time(self, by_category=False):
+        """
+        Медіанний час від створення до виконання задачі
+
+        :param by_category: Окремо для кожної категорії
+        :return: Медіана в секундах (None, якщо даних немає) або словник
+                 "категорія -> медіана"
+        """
+        columns = self.columns()
+        mask = ((columns['created'] != MISSING) & (columns['completed_at'] != MISSING)
+                & columns['completed'])
+        durations = columns['completed_at'][mask] - columns['created'][mask]
+
+        if not by_category:
+            return float(np.median(durations)) if durations.size else None
+
+        category = columns['category'][mask]
+        order = np.argsort(category, kind='stable')
+        category, durations = category[order], durations[order]
+        codes, starts = np.unique(category, return_index=True)
+
+        result = {}
+        for code, part in zip(codes.tolist(), np.split(durations, starts[1:])):
+            result[columns['categories'][code]] = float(np.median(part))
+        return result
+
+    def overdue_ratio_by_priority(self, now=None):
+        """
+        Частка прострочених задач за пріоритетами
+
+        Враховуються лише задачі з датою виконання. Простроченою вважається
+        невиконана задача, термін якої минув.
+
+        :param now: Поточний момент (за замовчуванням - datetime.now())
+        :return: Словник "пріоритет -> {total, overdue, ratio}"
+        """
+        columns = self.columns()
+        due = columns['due']
+        mask = due != MISSING
+        overdue = (due < due_key(now or datetime.now())) & ~columns['completed']
+
+        priority = columns['priority'][mask]
+        count = len(columns['priorities'])
+        totals = np.bincount(priority, minlength=count)
+        late = np.bincount(priority, weights=overdue[mask], minlength=count)
+
+        result = {}
+        for code, value in enumerate(columns['priorities']):
+            if totals[code]:
+                result[value] = {
+                    'total': int(totals[code]),
+                    'overdue': int(late[code]),
+                    'ratio': round(float(late[code] / totals[code]) * 100, 2)
+                }
+        return result
+
+    def get_report(self, days=7):
+        """
+        Текстовий звіт з аналітикою для бота
+
+        :param days: Кількість останніх днів для розподілу за категоріями
+        :return: Текст звіту
+        """
+        if not self.available():
+            return "❌ Аналітика недоступна: не встановлено numpy"
+
+        report = "📈 Аналітика задач\n\n"
+
+        median = self.median_completion_time()
+        if median is not None:
+            report += f"⏱ Медіанний час виконання: {self.format_duration(median)}\n"
+            for category, value in sorted(self.median_completion_time(by_category=True).items(),
+                                          key=lambda item: str(item[0])):
+                report += f"  • {category or 'Без категорії'}: {self.format_duration(value)}\n"
+            report += "\n"
+
+        overdue = self.overdue_ratio_by_priority()
+        if overdue:
+            report += "⏰ Прострочені задачі за пріоритетом:\n"
+            for priority, stats in sorted(overdue.items(), key=lambda item: str(item[0])):
+                report += (f"  • {priority or 'Без пріоритету'}: "
+                           f"{stats['overdue']}/{stats['total']} ({stats['ratio']}%)\n")
+            report += "\n"
+
+        per_day = self.completion_by_category_per_day(days)
+        if per_day:
+            report += f"📅 Виконання за категоріями (останні {days} дн.):\n"
+            for day, categories in per_day.items():
+                parts = [f"{category or 'Без категорії'} {stats['completed']}/{stats['total']}"
+                         for category, stats in categories.items()]
+                report += f"  {day}: " + ", ".join(parts) + "\n"
+
+        if median is None and not overdue and not per_day:
+            report += "Недостатньо даних для аналітики"
+
+        return report
+
+    @staticmethod
+    def format_duration(seconds):
+        """
+        Форматування тривалості
+
+        :param seconds: Тривалість у секундах
+        :return: Рядок (наприклад, "2 дн. 3 год.")
+        """
+        minutes = int(seconds) // 60
+        days, minutes = divmod(minutes, 24 * 60)
+        hours, minutes = divmod(minutes, 60)
+        if days:
+            return f"{days} дн. {hours} год."
+        if hours:
+            return f"{hours} год. {minutes} хв."
+        return f"{minutes} хв."
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import gzip
+import json
+import logging
+import zlib
+import threading
+from collections import OrderedDict
+from src.task_record import parse_timestamp
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Параметри архівування за замовчуванням
+ARCHIVE_AFTER = 30       # Вік виконаної задачі (дні), після якого вона переноситься до архіву
+ARCHIVE_INTERVAL = 3600  # Інтервал фонового архівування (секунди)
+CACHE_SEGMENTS = 4       # Кількість розпакованих сегментів, що тримаються в пам'яті
+
+SEGMENT_PREFIX = 'tasks-'
+SEGMENT_SUFFIX = '.jsonl.gz'
+
+# Поля часу, за якими визначається момент виконання задачі (у порядку пріоритету)
+MOMENT_FIELDS = ('completed_at', 'updated_at', 'created_at')
+
+
+def completion_moment(task):
+    """
+    Момент виконання задачі
+
+    Для задач без completed_at (старі файли) використовується час
+    останньої зміни або створення.
+
+    :param task: Задача
+    :return: Кортеж (секунди від 01.01.1970, місяць "YYYY-MM") або None,
+             якщо жодна позначка часу не розпізнана
+    """
+    for field in MOMENT_FIELDS:
+        value = task.get(field)
+        seconds = parse_timestamp(value)
+        if isinstance(seconds, int):
+            return seconds, f"{value[6:10]}-{value[3:5]}"
+    return None
+
+
+def _valid_members(data):
+    """
+    Розпакування цілих gzip-блоків сегмента
+
+    :param data: Вміст файлу сегмента
+    :return: Кортеж (розпаковані дані, довжина частини файлу з цілими блоками)
+    """
+    chunks = []
+    offset = 0
+    while offset < len(data):
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            chunk = decompressor.decompress(data[offset:])
+        except zlib.error:
+            break
+        if not decompressor.eof:
+            break
+        chunks.append(chunk)
+        offset = len(data) - len(decompressor.unused_data)
+    return b''.join(chunks), offset
+
+
+class TaskArchive:
+    """
+    Архів виконаних задач
+
+    Давно виконані задачі переносяться з основного файлу до стиснених
+    сегментів за місяцями виконання (tasks-YYYY-MM.jsonl.gz). Сегменти лише
+    доповнюються: кожне архівування дописує до файлу окремий gzip-блок з
+    рядками JSON, тому вже записані дані не перезаписуються. Обірваний
+    останній блок (збій під час запису) під час читання пропускається, а
+    перед наступним дописуванням обрізається.
+
+    Сегменти читаються лише під час запиту до архіву, а кілька останніх
+    розпакованих сегментів кешуються до наступної зміни файлу.
+    """
+
+    def __init__(self, archive_dir, cache_segments=CACHE_SEGMENTS):
+        """
+        Ініціалізація архіву
+
+        :param archive_dir: Каталог сегментів архіву
+        :param cache_segments: Кількість розпакованих сегментів у кеші
+        """
+        self.archive_dir = archive_dir
+        self.cache_segments = cache_segments
+        self.version = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def _path(self, month):
+        """
+        Шлях до сегмента місяця
+
+        :param month: Місяць "YYYY-MM"
+        :return: Шлях до файлу
+        """
+        return os.path.join(self.archive_dir, f"{SEGMENT_PREFIX}{month}{SEGMENT_SUFFIX}")
+
+    def months(self):
+        """
+        Місяці, за які є архівні задачі
+
+        :return: Відсортований список рядків "YYYY-MM"
+        """
+        months = []
+        for filename in os.listdir(self.archive_dir):
+            if filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX):
+                months.append(filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+        months.sort()
+        return months
+
+    def append(self, tasks):
+        """
+        Дописування задач до сегментів за місяцями виконання
+
+        :param tasks: Список задач (задачі без позначок часу пропускаються)
+        :return: Кількість записаних задач або None у разі помилки
+        """
+        segments = {}
+        for task in tasks:
+            moment = completion_moment(task)
+            if moment is not None:
+                segments.setdefault(moment[1], []).append(dict(task))
+
+        with self._lock:
+            try:
+                for month, month_tasks in sorted(segments.items()):
+                    lines = ''.join(json.dumps(task, ensure_ascii=False, separators=(',', ':')) + '\n'
+                                    for task in month_tasks)
+                    path = self._path(month)
+                    self._repair(path)
+                    with open(path, 'ab') as f:
+                        f.write(gzip.compress(lines.encode('utf-8'), compresslevel=6))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._cache.pop(month, None)
+            except OSError as e:
+                logger.error(f"Помилка запису архіву задач: {e}")
+                return None
+            finally:
+                self.version += 1
+
+        return sum(len(month_tasks) for month_tasks in segments.values())
+
+    @staticmethod
+    def _repair(path):
+        """
+        Обрізання обірваного останнього блоку сегмента перед дописуванням
+
+        :param path: Шлях до файлу сегмента
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        _, valid = _valid_members(data)
+        if valid < len(data):
+            logger.warning(f"Обірваний кінець сегмента архіву {path} обрізано ({len(data) - valid} байт)")
+            with open(path, 'r+b') as f:
+                f.truncate(valid)
+
+    @staticmethod
+    def _read_segment(path):
+        """
+        Читання сегмента
+
+        Якщо задачу було заархівовано двічі (збій між записом архіву та
+        видаленням з основного файлу), залишається останній запис.
+
+        :param path: Шлях до файлу сегмента
+        :return: Список задач у порядку ID
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        text, valid = _valid_members(data)
+        if valid < len(data):
+            logger.warning(f"Обірваний кінець сегмента архіву {path} пропущено")
+
+        tasks = {}
+        for line in text.decode('utf-8').split('\n'):
+            if line:
+                task = json.loads(line)
+                tasks[task['id']] = task
+        return [tasks[task_id] for task_id in sorted(tasks)]
+
+    def get_tasks(self, month):
+        """
+        Задачі сегмента місяця
+
+        :param month: Місяць "YYYY-MM"
+        :return: Список задач (порожній, якщо сегмента немає)
+        """
+        path = self._path(month)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return []
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            cached = self._cache.get(month)
+            if cached is not None and cached[0] == signature:
+                self._cache.move_to_end(month)
+                return cached[1]
+
+        try:
+            tasks = self._read_segment(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Помилка читання архіву {path}: {e}")
+            return []
+
+        with self._lock:
+            self._cache[month] = (signature, tasks)
+            self._cache.move_to_end(month)
+            while len(self._cache) > self.cache_segments:
+                self._cache.popitem(last=False)
+        return tasks
+
+    def iter_tasks(self, start=None, end=None):
+        """
+        Перебір архівних задач за місяцями
+
+        :param start: Перший місяць "YYYY-MM" (включно; None - з початку)
+        :param end: Останній місяць "YYYY-MM" (включно; None - до кінця)
+        :return: Генератор задач у порядку місяців
+        """
+        for month in self.months():
+            if (start is None or month >= start) and (end is None or month <= end):
+                yield from self.get_tasks(month)
+
+    def get_task_by_id(self, task_id):
+        """
+        Архівна задача за ID
+
+        Сегменти переглядаються від найновішого.
+
+        :param task_id: ID задачі
+        :return: Задача або None
+        """
+        for month in reversed(self.months()):
+            for task in self.get_tasks(month):
+                if task['id'] == task_id:
+                    return task
+        return None
+
+    def start(self, archive_callback, interval=ARCHIVE_INTERVAL):
+        """
+        Запуск фонового потоку архівування
+
+        Перше архівування виконується одразу після запуску.
+
+        :param archive_callback: Функція, що переносить задачі до архіву
+        :param interval: Інтервал архівування в секундах
+        """
+        def run():
+            while True:
+                try:
+                    archive_callback()
+                except Exception as e:
+                    logger.error(f"Помилка архівування задач: {e}")
+                if self._stop_event.wait(interval):
+                    break
+
+        self._thread = threading.Thread(target=run, name='task-archive')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self):
+        """Зупинка фонового потоку архівування"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import gzip
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from src.task_persistence import write_atomic
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Каталог резервних копій за замовчуванням
+BACKUP_DIR = 'backup'
+
+# Параметри резервного копіювання за замовчуванням
+BACKUP_INTERVAL = 300  # Інтервал фонового копіювання (секунди)
+BASE_EVERY = 50        # Кількість приростів, після якої створюється нова повна копія
+KEEP_BASES = 7         # Кількість повних копій (разом з їхніми приростами), що зберігаються
+
+# Види файлів резервних копій
+KIND_BASE = 'base'
+KIND_DELTA = 'delta'
+
+BACKUP_SUFFIX = '.json.gz'
+STAMP_FORMAT = '%Y%m%d-%H%M%S-%f'
+
+# Формати моменту відновлення
+MOMENT_FORMATS = ('%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M')
+
+
+def parse_moment(value):
+    """
+    Момент часу для відновлення
+
+    Дата без часу означає кінець дня.
+
+    :param value: datetime або рядок "DD.MM.YYYY[ HH:MM[:SS]]"
+    :return: datetime або None, якщо формат невідомий
+    """
+    if isinstance(value, datetime):
+        return value
+
+    for moment_format in MOMENT_FORMATS:
+        try:
+            return datetime.strptime(value, moment_format)
+        except ValueError:
+            pass
+
+    try:
+        return datetime.strptime(value, '%d.%m.%Y') + timedelta(days=1, microseconds=-1)
+    except ValueError:
+        return None
+
+
+class TaskBackup:
+    """
+    Інкрементні резервні копії задач
+
+    Періодично зберігається повна копія (base), а між ними - стиснені
+    прирости (delta) лише зі зміненими та видаленими задачами. Зміни
+    визначаються порівнянням знімків TaskManager: задачі знімка не
+    змінюються, тому незмінена задача - той самий об'єкт, і порівняння
+    здебільшого зводиться до перевірки ідентичності.
+
+    Копіювання виконується у фоновому потоці: менеджер лише передає
+    поточний знімок. Зберігаються останні keep_bases повних копій з їхніми
+    приростами; відновлення можливе на будь-який момент у цих межах.
+    """
+
+    def __init__(self, backup_dir=BACKUP_DIR, base_every=BASE_EVERY, keep_bases=KEEP_BASES):
+        """
+        Ініціалізація резервного копіювання
+
+        :param backup_dir: Каталог резервних копій
+        :param base_every: Кількість приростів між повними копіями
+        :param keep_bases: Кількість повних копій, що зберігаються
+        """
+        self.backup_dir = backup_dir
+        self.base_every = base_every
+        self.keep_bases = keep_bases
+        self._last_snapshot = None
+        self._last_tasks = None
+        self._last_state = None
+        self._deltas = 0
+        self._last_stamp = None
+        self._queue = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        os.makedirs(backup_dir, exist_ok=True)
+
+    def list_backups(self):
+        """
+        Наявні файли резервних копій у хронологічному порядку
+
+        :return: Список кортежів (datetime, вид, шлях)
+        """
+        backups = []
+        for filename in os.listdir(self.backup_dir):
+            if not filename.endswith(BACKUP_SUFFIX):
+                continue
+            kind, _, stamp = filename[:-len(BACKUP_SUFFIX)].partition('-')
+            if kind not in (KIND_BASE, KIND_DELTA):
+                continue
+            try:
+                moment = datetime.strptime(stamp, STAMP_FORMAT)
+            except ValueError:
+                continue
+            backups.append((moment, kind, os.path.join(self.backup_dir, filename)))
+        backups.sort()
+        return backups
+
+    @staticmethod
+    def _read(path):
+        """
+        Читання файлу резервної копії
+
+        :param path: Шлях до файлу
+        :return: Словник
+        """
+        with gzip.open(path, 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+
+    def _write(self, kind, payload):
+        """
+        Атомарний запис файлу резервної копії
+
+        :param kind: Вид копії (base, delta)
+        :param payload: Дані копії
+        :return: Шлях до файлу
+        """
+        moment = datetime.now()
+        if self._last_stamp is not None and moment <= self._last_stamp:
+            moment = self._last_stamp + timedelta(microseconds=1)
+        self._last_stamp = moment
+
+        payload['time'] = moment.strftime('%d.%m.%Y %H:%M:%S')
+        path = os.path.join(self.backup_dir, f"{kind}-{moment.strftime(STAMP_FORMAT)}{BACKUP_SUFFIX}")
+        data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        write_atomic(path, gzip.compress(data, compresslevel=6))
+        return path
+
+    def _restore_state(self, backups):
+        """
+        Стан задач за ланцюжком копій
+
+        :param backups: Список копій, останньою з яких визначається момент
+        :return: Кортеж (словник "ID -> задача", метадані, останній ID, кількість приростів)
+                 або None, якщо повної копії немає
+        """
+        start = None
+        for position in range(len(backups) - 1, -1, -1):
+            if backups[position][1] == KIND_BASE:
+                start = position
+                break
+        if start is None:
+            return None
+
+        base = self._read(backups[start][2])
+        tasks = {task['id']: task for task in base.get('tasks', [])}
+        meta, last_id = base.get('meta', {}), base.get('last_id', 0)
+
+        for _, _, path in backups[start + 1:]:
+            delta = self._read(path)
+            for task_id in delta.get('deleted', []):
+                tasks.pop(task_id, None)
+            for task in delta.get('changed', []):
+                tasks[task['id']] = task
+            meta, last_id = delta.get('meta', meta), delta.get('last_id', last_id)
+
+        tasks = dict(sorted(tasks.items()))
+        return tasks, meta, last_id, len(backups) - start - 1
+
+    def restore_data(self, moment=None):
+        """
+        Дані задач на вказаний момент
+
+        :param moment: Момент часу (datetime або "DD.MM.YYYY HH:MM:SS"); None - остання копія
+        :return: Словник у форматі файлу задач або None, якщо копії немає
+        """
+        backups = self.list_backups()
+        if moment is not None:
+            point = parse_moment(moment)
+            if point is None:
+                logger.error(f"Невірний формат моменту відновлення: {moment}")
+                return None
+            backups = [backup for backup in backups if backup[0] <= point]
+
+        try:
+            state = self._restore_state(backups)
+        except Exception as e:
+            logger.error(f"Помилка читання резервних копій: {e}")
+            return None
+        if state is None:
+            return None
+
+        tasks, meta, last_id, _ = state
+        data = dict(meta)
+        data['tasks'] = list(tasks.values())
+        data['last_id'] = last_id
+        return data
+
+    def backup(self, snapshot):
+        """
+        Резервна копія знімка задач
+
+        Записується приріст відносно попередньої копії або, якщо попередньої
+        немає чи приростів накопичилось base_every, повна копія.
+
+        :param snapshot: Знімок задач (TaskSnapshot)
+        :return: Шлях до записаного файлу або None, якщо змін немає чи сталася помилка
+        """
+        if snapshot is None:
+            return None
+
+        with self._write_lock:
+            if snapshot is self._last_snapshot:
+                return None
+
+            try:
+                if self._last_tasks is None:
+                    self._load_chain()
+
+                state = (snapshot.meta, snapshot.last_id)
+                if self._last_tasks is None or self._deltas >= self.base_every:
+                    path = self._write(KIND_BASE, {
+                        'tasks': [dict(task) for task in snapshot.tasks.values()],
+                        'meta': snapshot.meta,
+                        'last_id': snapshot.last_id
+                    })
+                    self._deltas = 0
+                    self._rotate()
+                else:
+                    changed, deleted = self._diff(self._last_tasks, snapshot.tasks)
+                    if not changed and not deleted and state == self._last_state:
+                        self._last_snapshot = snapshot
+                        return None
+
+                    path = self._write(KIND_DELTA, {
+                        'changed': changed,
+                        'deleted': deleted,
+                        'meta': snapshot.meta,
+                        'last_id': snapshot.last_id
+                    })
+                    self._deltas += 1
+            except Exception as e:
+                logger.error(f"Помилка резервного копіювання задач: {e}")
+                return None
+
+            self._last_snapshot = snapshot
+            self._last_tasks = snapshot.tasks
+            self._last_state = state
+            return path
+
+    @staticmethod
+    def _diff(previous, tasks):
+        """
+        Змінені та видалені задачі
+
+        :param previous: Словник "ID -> задача" попередньої копії
+        :param tasks: Словник "ID -> задача" поточного знімка
+        :return: Кортеж (список змінених задач, список ID видалених)
+        """
+        changed = []
+        for task_id, task in tasks.items():
+            old = previous.get(task_id)
+            if old is not task and (old is None or old != task):
+                changed.append(dict(task))
+        deleted = [task_id for task_id in previous if task_id not in tasks]
+        return changed, deleted
+
+    def _load_chain(self):
+        """Відновлення стану останньої копії після перезапуску, щоб продовжити ланцюжок приростів"""
+        state = self._restore_state(self.list_backups())
+        if state is not None:
+            tasks, meta, last_id, deltas = state
+            self._last_tasks = tasks
+            self._last_state = (meta, last_id)
+            self._deltas = deltas
+
+    def _rotate(self):
+        """Видалення копій, старіших за keep_bases останніх повних копій"""
+        backups = self.list_backups()
+        bases = [moment for moment, kind, _ in backups if kind == KIND_BASE]
+        if len(bases) <= self.keep_bases:
+            return
+
+        cutoff = bases[-self.keep_bases]
+        for moment, _, path in backups:
+            if moment >= cutoff:
+                break
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.error(f"Помилка видалення старої резервної копії {path}: {e}")
+
+    def request(self, snapshot):
+        """
+        Резервна копія знімка у фоновому потоці
+
+        Знімок незмінний, тому його можна передати до, наприклад, очищення
+        задач, і копія відобразить стан саме на цей момент.
+
+        :param snapshot: Знімок задач (TaskSnapshot)
+        """
+        if snapshot is None:
+            return
+        with self._lock:
+            self._queue.append(snapshot)
+        self._wake_event.set()
+
+    def run_pending(self, snapshot_provider=None):
+        """
+        Копіювання переданих знімків та поточного стану
+
+        :param snapshot_provider: Функція, що повертає поточний знімок задач
+        """
+        with self._lock:
+            queue, self._queue = self._queue, []
+        for snapshot in queue:
+            self.backup(snapshot)
+        if snapshot_provider:
+            self.backup(snapshot_provider())
+
+    def start(self, snapshot_provider, interval=BACKUP_INTERVAL):
+        """
+        Запуск фонового потоку резервного копіювання
+
+        :param snapshot_provider: Функція, що повертає поточний знімок задач
+        :param interval: Інтервал копіювання в секундах
+        """
+        def run():
+            waited = 0
+            while not self._stop_event.is_set():
+                requested = self._wake_event.wait(1)
+                self._wake_event.clear()
+                waited += 1
+                if waited >= interval:
+                    self.run_pending(snapshot_provider)
+                    waited = 0
+                elif requested:
+                    self.run_pending()
+
+        self._thread = threading.Thread(target=run, name='task-backup')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self, snapshot_provider=None):
+        """
+        Зупинка фонового потоку з копіюванням незбережених змін
+
+        :param snapshot_provider: Функція, що повертає поточний знімок задач
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.run_pending(snapshot_provider)
+
+
+def main():
+    """Відновлення файлу задач з резервних копій на вказаний момент"""
+    if len(sys.argv) < 3:
+        print("Використання: python -m src.task_backup <каталог копій> <файл задач> [\"DD.MM.YYYY HH:MM:SS\"]")
+        sys.exit(1)
+
+    backup_dir, tasks_file = sys.argv[1], sys.argv[2]
+    moment = sys.argv[3] if len(sys.argv) > 3 else None
+
+    data = TaskBackup(backup_dir).restore_data(moment)
+    if data is None:
+        print("Резервну копію не знайдено")
+        sys.exit(1)
+
+    write_atomic(tasks_file, json.dumps(data, ensure_ascii=False, indent=2))
+    print(f"Відновлено {len(data['tasks'])} задач у {tasks_file}")
+
+
+if __name__ == "__main__":
+    main()
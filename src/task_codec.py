@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import json
+import struct
+from array import array
+import logging
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Необов'язкові швидкі кодеки
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Формати файлу задач
+FORMAT_JSON = 'json'
+FORMAT_BINARY = 'binary'
+
+# Заголовок бінарного формату: сигнатура, версія, кодек записів
+# Версія 2 додала таблицю ID задач для лінивого завантаження
+MAGIC = b'NGTB'
+VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+# Прапорці запису задачі (дозволяють фільтрувати без декодування)
+FLAG_COMPLETED = 0x01
+
+HEADER = struct.Struct('<4sBB')
+LENGTH = struct.Struct('<I')
+
+
+def _dumps(obj, codec):
+    """
+    Компактне кодування об'єкта
+
+    :param obj: Об'єкт для кодування
+    :param codec: Кодек (CODEC_JSON, CODEC_MSGPACK)
+    :return: Байти
+    """
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(obj, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(payload, codec):
+    """
+    Декодування об'єкта
+
+    :param payload: Байти
+    :param codec: Кодек (CODEC_JSON, CODEC_MSGPACK)
+    :return: Об'єкт
+    """
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ValueError("Файл задач закодовано msgpack, але модуль msgpack не встановлено")
+        return msgpack.unpackb(payload, raw=False)
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(bytes(payload))
+
+
+def default_codec():
+    """
+    Найшвидший доступний кодек записів
+
+    :return: CODEC_MSGPACK, якщо встановлено msgpack, інакше CODEC_JSON
+    """
+    return CODEC_MSGPACK if msgpack is not None else CODEC_JSON
+
+
+def is_binary(data):
+    """
+    Перевірка, чи дані записано у бінарному форматі
+
+    :param data: Вміст файлу (bytes)
+    :return: True для бінарного формату
+    """
+    return data[:len(MAGIC)] == MAGIC
+
+
+def encode_binary(data, codec=None):
+    """
+    Кодування задач у бінарний формат
+
+    Структура файлу:
+    - заголовок (сигнатура, версія, кодек);
+    - метадані (усе, крім списку задач) з префіксом довжини;
+    - кількість задач N;
+    - N байтів прапорців (FLAG_COMPLETED);
+    - N ID задач (0 - задача без ID);
+    - N + 1 зміщень: початки записів і кінець останнього запису
+      (відносно початку блоку записів);
+    - блок записів, який сам є масивом кодека (JSON або msgpack).
+
+    Завдяки таблиці зміщень окрему задачу можна прочитати без декодування
+    інших, а весь блок записів декодується одним викликом кодека.
+
+    :param data: Словник з задачами (формат tasks.json)
+    :param codec: Кодек записів (за замовчуванням - найшвидший доступний)
+    :return: Байти
+    """
+    if codec is None:
+        codec = default_codec()
+
+    tasks = data.get('tasks', [])
+    meta = {key: value for key, value in data.items() if key != 'tasks'}
+    meta_payload = _dumps(meta, codec)
+
+    if codec == CODEC_MSGPACK:
+        opening, separator, closing = msgpack.Packer().pack_array_header(len(tasks)), b'', b''
+    else:
+        opening, separator, closing = b'[', b',', b']'
+
+    flags = bytearray(len(tasks))
+    ids = []
+    offsets = []
+    records = [opening]
+    position = len(opening)
+
+    for i, task in enumerate(tasks):
+        if i and separator:
+            records.append(separator)
+            position += len(separator)
+
+        payload = _dumps(task, codec)
+        offsets.append(position)
+        records.append(payload)
+        position += len(payload)
+
+        if task.get('completed'):
+            flags[i] = FLAG_COMPLETED
+
+        task_id = task.get('id')
+        ids.append(task_id if isinstance(task_id, int) and task_id > 0 else 0)
+
+    offsets.append(position)
+    records.append(closing)
+
+    return b''.join([
+        HEADER.pack(MAGIC, VERSION, codec),
+        LENGTH.pack(len(meta_payload)),
+        meta_payload,
+        LENGTH.pack(len(tasks)),
+        bytes(flags),
+        struct.pack(f'<{len(ids)}I', *ids),
+        struct.pack(f'<{len(offsets)}I', *offsets)
+    ] + records)
+
+
+def _read_uint32_array(data, offset, count):
+    """
+    Читання таблиці беззнакових 32-бітних чисел (little-endian)
+
+    :param data: Байти або mmap
+    :param offset: Зміщення таблиці
+    :param count: Кількість чисел
+    :return: Масив array('I')
+    """
+    values = array('I')
+    values.frombytes(data[offset:offset + count * LENGTH.size])
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def read_layout(data):
+    """
+    Розбір службової частини бінарного файлу без декодування задач
+
+    :param data: Байти або mmap
+    :return: Словник: codec, meta, count, flags, ids (None для версії 1),
+             offsets, records_start, separator
+    """
+    magic, version, codec = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version not in SUPPORTED_VERSIONS:
+        raise ValueError("Невідомий формат файлу задач")
+
+    offset = HEADER.size
+    (meta_length,) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    meta = _loads(data[offset:offset + meta_length], codec)
+    offset += meta_length
+
+    (count,) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+
+    flags = data[offset:offset + count]
+    offset += count
+
+    ids = None
+    if version >= 2:
+        ids = _read_uint32_array(data, offset, count)
+        offset += count * LENGTH.size
+
+    offsets = _read_uint32_array(data, offset, count + 1)
+    offset += (count + 1) * LENGTH.size
+
+    return {
+        'codec': codec,
+        'meta': meta,
+        'count': count,
+        'flags': flags,
+        'ids': ids,
+        'offsets': offsets,
+        'records_start': offset,
+        'separator': 0 if codec == CODEC_MSGPACK else 1
+    }
+
+
+def record_bounds(layout, position):
+    """
+    Межі запису задачі у файлі
+
+    :param layout: Результат read_layout
+    :param position: Порядковий номер задачі у файлі
+    :return: Кортеж (початок, кінець) відносно початку файлу
+    """
+    offsets = layout['offsets']
+    end = offsets[position + 1]
+    if position + 1 < layout['count']:
+        end -= layout['separator']
+    start = layout['records_start']
+    return start + offsets[position], start + end
+
+
+def decode_record(data, layout, position):
+    """
+    Декодування однієї задачі без читання інших
+
+    :param data: Байти або mmap
+    :param layout: Результат read_layout
+    :param position: Порядковий номер задачі у файлі
+    :return: Задача
+    """
+    start, end = record_bounds(layout, position)
+    return _loads(data[start:end], layout['codec'])
+
+
+def decode_binary(data):
+    """
+    Декодування задач з бінарного формату
+
+    :param data: Байти або mmap
+    :return: Словник з задачами (формат tasks.json)
+    """
+    layout = read_layout(data)
+    result = layout['meta']
+    with memoryview(data) as view:
+        result['tasks'] = _loads(view[layout['records_start']:], layout['codec'])
+    return result
+
+
+def encode_tasks(data, file_format=FORMAT_JSON):
+    """
+    Кодування задач у вказаний формат файлу
+
+    :param data: Словник з задачами
+    :param file_format: Формат (json, binary)
+    :return: Байти
+    """
+    if file_format == FORMAT_BINARY:
+        return encode_binary(data)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def decode_tasks(data):
+    """
+    Декодування задач з автоматичним визначенням формату
+
+    :param data: Вміст файлу (bytes)
+    :return: Словник з задачами
+    """
+    if is_binary(data):
+        return decode_binary(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def load_tasks_file(path):
+    """
+    Читання файлу задач будь-якого формату
+
+    :param path: Шлях до файлу
+    :return: Словник з задачами
+    """
+    with open(path, 'rb') as f:
+        return decode_tasks(f.read())
+
+
+# Конвертація файлу задач між форматами
+def main():
+    """Конвертація файлу задач між форматами JSON та бінарним з порівнянням швидкодії"""
+    import os
+    import sys
+    import time
+
+    if len(sys.argv) < 3:
+        print("Використання: python -m src.task_codec <вхідний файл> <вихідний файл> [json|binary]")
+        sys.exit(1)
+
+    source, target = sys.argv[1], sys.argv[2]
+    file_format = sys.argv[3] if len(sys.argv) > 3 else FORMAT_BINARY
+
+    start = time.perf_counter()
+    data = load_tasks_file(source)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    payload = encode_tasks(data, file_format)
+    encode_time = time.perf_counter() - start
+
+    with open(target, 'wb') as f:
+        f.write(payload)
+
+    start = time.perf_counter()
+    decode_tasks(payload)
+    decode_time = time.perf_counter() - start
+
+    print(f"Задач: {len(data.get('tasks', []))}")
+    print(f"{source}: {os.path.getsize(source)} байт, читання {load_time * 1000:.1f} мс")
+    print(f"{target} ({file_format}): {len(payload)} байт, "
+          f"кодування {encode_time * 1000:.1f} мс, читання {decode_time * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from src.task_codec import decode_tasks
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Рекомендаційні блокування файлів доступні лише в POSIX
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOCK_SUFFIX = '.lock'
+
+
+def file_signature(path):
+    """
+    Підпис стану файлу для перевірки змін іншими процесами
+
+    Атомарний запис замінює файл новим, тому змінюється inode; розмір та
+    час зміни з наносекундами покривають запис на місці.
+
+    :param path: Шлях до файлу
+    :return: Кортеж (inode, mtime_ns, size) або None, якщо файлу немає
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """
+    Рекомендаційне блокування файлу задач між процесами
+
+    Блокується окремий файл <path>.lock, бо сам файл задач замінюється
+    під час атомарного запису. На системах без fcntl блокування не
+    виконується.
+
+    :param path: Шлях до файлу задач
+    :param shared: Спільне блокування (для читання) замість виключного
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(path + LOCK_SUFFIX, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class TaskFileCache:
+    """
+    Кеш розібраного файлу задач
+
+    Файл перечитується лише тоді, коли змінився його підпис (inode, час
+    зміни, розмір), тому повторні звіти не розбирають файл щоразу.
+    """
+
+    def __init__(self, path):
+        """
+        Ініціалізація кешу
+
+        :param path: Шлях до файлу задач
+        """
+        self.path = path
+        self.loads = 0
+        self._data = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Актуальні дані задач
+
+        Повернені дані спільні для всіх читачів і не повинні змінюватися.
+
+        :return: Словник з задачами
+        """
+        signature = file_signature(self.path)
+        with self._lock:
+            if self._data is not None and signature == self._signature:
+                return self._data
+
+            if signature is None:
+                data = {"tasks": []}
+            else:
+                try:
+                    with file_lock(self.path, shared=True):
+                        signature = file_signature(self.path)
+                        with open(self.path, 'rb') as f:
+                            data = decode_tasks(f.read())
+                except Exception as e:
+                    logger.error(f"Помилка завантаження задач: {e}")
+                    return self._data if self._data is not None else {"tasks": []}
+
+            self._data = data
+            self._signature = signature
+            self.loads += 1
+            return data
+
+    def invalidate(self):
+        """Примусове перечитування файлу при наступному зверненні"""
+        with self._lock:
+            self._data = None
+            self._signature = None
+
+
+# Кеші, спільні для всіх компонентів процесу
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def shared_cache(path):
+    """
+    Спільний для процесу кеш файлу задач
+
+    :param path: Шлях до файлу задач
+    :return: TaskFileCache
+    """
+    key = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = TaskFileCache(path)
+        return cache
@@ -0,0 +1,771 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+
+# Поля задачі, за якими будуються вторинні індекси
+INDEXED_FIELDS = ('completed', 'category', 'priority', 'due_date')
+
+# Формати дат виконання з часом, що розбираються через strptime
+DATETIME_FORMATS = ('%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M')
+
+SECONDS_PER_DAY = 86400
+
+# Ключ задач без дати виконання в індексі дат (більший за ключ будь-якої дати)
+UNDATED = 10 ** 12
+
+# Поля задачі, за якими виконується повнотекстовий пошук
+TEXT_FIELDS = ('name', 'category')
+
+# Слово: літери та цифри (латиниця, кирилиця тощо), апостроф всередині слова ("п'ять")
+_WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+_APOSTROPHES = str.maketrans({'\u2019': "'", '\u02bc': "'"})
+
+
+def _datetime_key(value):
+    """
+    Числовий ключ моменту часу (секунди від 01.01.0001)
+
+    :param value: datetime без часового поясу
+    :return: Ціле число
+    """
+    return (value.toordinal() * SECONDS_PER_DAY + value.hour * 3600
+            + value.minute * 60 + value.second)
+
+
+def due_key(value, end_of_day=True):
+    """
+    Числовий ключ дати виконання для сортування
+
+    Приймаються рядки "DD.MM.YYYY", "DD.MM.YYYY HH:MM[:SS]", "YYYY-MM-DD",
+    ISO-позначки часу ("2025-03-20T15:00:00"), а також date та datetime.
+    Дата без часу вважається кінцем дня (термін "до" цієї дати) або, для
+    нижньої межі діапазону, його початком.
+
+    :param value: Дата виконання
+    :param end_of_day: Для дати без часу брати кінець дня (інакше - початок)
+    :return: Ціле число або None, якщо дату не вдалося розпізнати
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return _datetime_key(value)
+
+    if isinstance(value, date):
+        day = value.toordinal() * SECONDS_PER_DAY
+        return day + SECONDS_PER_DAY - 1 if end_of_day else day
+
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    value = value.strip()
+    try:
+        # Швидкий розбір основних форматів без strptime
+        parts = value.split('.')
+        if len(parts) == 3 and len(parts[2]) == 4:
+            return due_key(date(int(parts[2]), int(parts[1]), int(parts[0])), end_of_day)
+        if len(value) == 10:
+            return due_key(date.fromisoformat(value), end_of_day)
+        return due_key(datetime.fromisoformat(value.replace('Z', '+00:00')))
+    except ValueError:
+        pass
+
+    for date_format in DATETIME_FORMATS:
+        try:
+            return _datetime_key(datetime.strptime(value, date_format))
+        except ValueError:
+            pass
+
+    return None
+
+
+def text_tokens(text):
+    """
+    Слова тексту для повнотекстового пошуку
+
+    Текст приводиться до нижнього регістру (casefold), варіанти апострофа
+    замінюються звичайним.
+
+    :param text: Текст
+    :return: Список слів
+    """
+    if not isinstance(text, str):
+        return []
+    return _WORD_PATTERN.findall(text.casefold().translate(_APOSTROPHES))
+
+
+class TaskIndex:
+    """
+    Вторинні індекси задач
+
+    Для кожного поля зберігається словник "значення -> відсортований список
+    ключів задач". Ключі відображають порядок задач у списку, тому вибірка
+    з кошика одразу повертає задачі в початковому порядку. Окремо ведуться
+    лічильники виконаних задач для кожного значення поля та відсортований
+    список ключів усіх задач. Після copy() словники полів, кошики та список
+    ключів спільні з оригіналом і копіюються лише під час першої зміни
+    (copy-on-write), тому зміна задачі копіює тільки зачеплені кошики.
+    """
+
+    def __init__(self):
+        """Ініціалізація порожніх індексів"""
+        self.clear()
+
+    def clear(self):
+        """Очищення всіх індексів"""
+        self._buckets = {field: {} for field in INDEXED_FIELDS}
+        self._completed = {field: {} for field in INDEXED_FIELDS}
+        self._keys = []
+        self._owned = None
+
+    def copy(self):
+        """
+        Копія індексів, що не змінює оригінал
+
+        :return: TaskIndex
+        """
+        index = TaskIndex.__new__(TaskIndex)
+        index._buckets = dict(self._buckets)
+        index._completed = dict(self._completed)
+        index._keys = self._keys
+        index._owned = set()
+        return index
+
+    def _writable_keys(self):
+        """
+        Список ключів усіх задач, який можна змінювати
+
+        :return: Відсортований список ключів
+        """
+        if self._owned is not None and 'keys' not in self._owned:
+            self._keys = list(self._keys)
+            self._owned.add('keys')
+        return self._keys
+
+    def _writable_buckets(self, field):
+        """
+        Словник кошиків поля, який можна змінювати
+
+        :param field: Назва поля
+        :return: Словник "значення -> список ключів"
+        """
+        buckets = self._buckets[field]
+        if self._owned is not None and field not in self._owned:
+            buckets = self._buckets[field] = dict(buckets)
+            self._owned.add(field)
+        return buckets
+
+    def _writable_bucket(self, field, value):
+        """
+        Кошик значення поля, який можна змінювати
+
+        :param field: Назва поля
+        :param value: Значення поля (кошик має існувати)
+        :return: Відсортований список ключів
+        """
+        buckets = self._writable_buckets(field)
+        bucket = buckets[value]
+        if self._owned is not None and (field, value) not in self._owned:
+            bucket = buckets[value] = list(bucket)
+            self._owned.add((field, value))
+        return bucket
+
+    def _writable_counts(self, field):
+        """
+        Лічильники виконаних задач поля, які можна змінювати
+
+        :param field: Назва поля
+        :return: Словник "значення -> кількість"
+        """
+        counts = self._completed[field]
+        if self._owned is not None and ('counts', field) not in self._owned:
+            counts = self._completed[field] = dict(counts)
+            self._owned.add(('counts', field))
+        return counts
+
+    @staticmethod
+    def field_value(task, field):
+        """
+        Значення поля задачі для індексу
+
+        :param task: Задача
+        :param field: Назва поля
+        :return: Значення поля (статус виконання завжди bool)
+        """
+        if field == 'completed':
+            return bool(task.get('completed'))
+        return task.get(field)
+
+    def add(self, key, task):
+        """
+        Додавання задачі до індексів
+
+        :param key: Ключ задачі
+        :param task: Задача
+        """
+        keys = self._writable_keys()
+        if not keys or keys[-1] < key:
+            keys.append(key)
+        else:
+            insort(keys, key)
+
+        completed = bool(task.get('completed'))
+        for field in INDEXED_FIELDS:
+            value = self.field_value(task, field)
+            if value not in self._buckets[field]:
+                self._writable_buckets(field)[value] = [key]
+                if self._owned is not None:
+                    self._owned.add((field, value))
+            else:
+                bucket = self._writable_bucket(field, value)
+                if bucket[-1] < key:
+                    bucket.append(key)
+                else:
+                    insort(bucket, key)
+
+            if completed:
+                counts = self._writable_counts(field)
+                counts[value] = counts.get(value, 0) + 1
+
+    def remove(self, key, task):
+        """
+        Видалення задачі з індексів
+
+        Значення полів задачі мають бути такими ж, як під час додавання.
+
+        :param key: Ключ задачі
+        :param task: Задача
+        """
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._writable_keys()[position]
+
+        completed = bool(task.get('completed'))
+        for field in INDEXED_FIELDS:
+            value = self.field_value(task, field)
+            bucket = self._buckets[field].get(value)
+            if not bucket:
+                continue
+
+            position = bisect_left(bucket, key)
+            if position < len(bucket) and bucket[position] == key:
+                if len(bucket) > 1:
+                    del self._writable_bucket(field, value)[position]
+                else:
+                    del self._writable_buckets(field)[value]
+                    if self._owned is not None:
+                        self._owned.discard((field, value))
+
+                if completed:
+                    counts = self._writable_counts(field)
+                    counts[value] -= 1
+                    if not counts[value]:
+                        del counts[value]
+
+    def lookup(self, field, value):
+        """
+        Ключі задач з вказаним значенням поля
+
+        :param field: Назва поля
+        :param value: Значення поля
+        :return: Відсортований список ключів (не змінювати)
+        """
+        if field == 'completed':
+            value = bool(value)
+        return self._buckets[field].get(value, [])
+
+    def keys(self):
+        """
+        Ключі всіх задач
+
+        :return: Відсортований список ключів (не змінювати)
+        """
+        return self._keys
+
+    def count(self, field, value):
+        """
+        Кількість задач з вказаним значенням поля
+
+        :param field: Назва поля
+        :param value: Значення поля
+        :return: Кількість задач
+        """
+        return len(self.lookup(field, value))
+
+    def breakdown(self, field):
+        """
+        Розподіл задач за значеннями поля
+
+        :param field: Назва поля
+        :return: Словник "значення -> {total, completed, pending}"
+        """
+        completed_counts = self._completed[field]
+        result = {}
+        for value, bucket in self._buckets[field].items():
+            completed = completed_counts.get(value, 0)
+            result[value] = {
+                'total': len(bucket),
+                'completed': completed,
+                'pending': len(bucket) - completed
+            }
+        return result
+
+    def values(self, field):
+        """
+        Усі наявні значення поля
+
+        :param field: Назва поля
+        :return: Список значень
+        """
+        return list(self._buckets[field])
+
+    def query(self, **criteria):
+        """
+        Перетин кошиків для складеного запиту
+
+        Перебирається найменший кошик, а належність до інших перевіряється
+        бінарним пошуком, тому вартість залежить від розміру найменшого кошика.
+
+        :param criteria: Умови у вигляді поле=значення
+        :return: Відсортований список ключів задач
+        """
+        buckets = []
+        for field, value in criteria.items():
+            if field not in self._buckets:
+                raise ValueError(f"Поле '{field}' не індексується")
+            buckets.append(self.lookup(field, value))
+
+        if not buckets:
+            return []
+
+        buckets.sort(key=len)
+        smallest, others = buckets[0], buckets[1:]
+
+        result = []
+        for key in smallest:
+            for bucket in others:
+                position = bisect_left(bucket, key)
+                if position >= len(bucket) or bucket[position] != key:
+                    break
+            else:
+                result.append(key)
+
+        return result
+
+
+class DueDateIndex:
+    """
+    Відсортований індекс дат виконання
+
+    Дати розбираються один раз під час індексації у числові ключі, а пари
+    (ключ, ID задачі) зберігаються у відсортованих списках: для всіх задач
+    та окремо для невиконаних. Задачі без дати мають ключ UNDATED і
+    розташовані в кінці списків, тому списки задають повний порядок задач
+    за датою. Запити за діапазоном виконуються бінарним пошуком за
+    O(log n + k). Після copy() списки спільні з оригіналом і копіюються
+    лише під час першої зміни.
+    """
+
+    def __init__(self):
+        """Ініціалізація порожнього індексу"""
+        self.clear()
+
+    def clear(self):
+        """Очищення індексу"""
+        self._all = []
+        self._pending = []
+        self._shared = False
+
+    def copy(self):
+        """
+        Копія індексу, що не змінює оригінал
+
+        :return: DueDateIndex
+        """
+        index = DueDateIndex.__new__(DueDateIndex)
+        index._all = self._all
+        index._pending = self._pending
+        index._shared = True
+        return index
+
+    def _own(self):
+        """Копіювання списків, спільних з оригіналом, перед першою зміною"""
+        if self._shared:
+            self._all = list(self._all)
+            self._pending = list(self._pending)
+            self._shared = False
+
+    @staticmethod
+    def _entry(key, task):
+        """
+        Запис індексу для задачі
+
+        :param key: ID задачі
+        :param task: Задача
+        :return: Пара (ключ дати або UNDATED, ID)
+        """
+        due = due_key(task.get('due_date'))
+        return (UNDATED if due is None else due, key)
+
+    def build(self, tasks):
+        """
+        Повна побудова індексу одним сортуванням
+
+        :param tasks: Словник "ID -> задача"
+        """
+        self._all = []
+        self._pending = []
+        for key, task in tasks.items():
+            entry = self._entry(key, task)
+            self._all.append(entry)
+            if not task.get('completed'):
+                self._pending.append(entry)
+
+        self._all.sort()
+        self._pending.sort()
+        self._shared = False
+
+    def add(self, key, task):
+        """
+        Додавання задачі до індексу
+
+        :param key: ID задачі
+        :param task: Задача
+        """
+        entry = self._entry(key, task)
+        self._own()
+        insort(self._all, entry)
+        if not task.get('completed'):
+            insort(self._pending, entry)
+
+    def remove(self, key, task):
+        """
+        Видалення задачі з індексу
+
+        Значення полів задачі мають бути такими ж, як під час додавання.
+
+        :param key: ID задачі
+        :param task: Задача
+        """
+        entry = self._entry(key, task)
+        self._own()
+        for entries in (self._all, self._pending):
+            position = bisect_left(entries, entry)
+            if position < len(entries) and entries[position] == entry:
+                del entries[position]
+
+    @staticmethod
+    def _slice(entries, start, end):
+        """
+        ID задач з ключами дат у межах [start, end]
+
+        :param entries: Відсортований список пар (ключ дати, ID)
+        :param start: Нижня межа (None - без обмеження)
+        :param end: Верхня межа (None - усі задачі з датою)
+        :return: Список ID
+        """
+        low = 0 if start is None else bisect_left(entries, (start,))
+        high = bisect_left(entries, (UNDATED,)) if end is None else bisect_right(entries, (end, float('inf')))
+        return [key for _, key in entries[low:high]]
+
+    def between(self, start, end, pending_only=False):
+        """
+        ID задач з датою виконання в діапазоні (межі включно)
+
+        :param start: Нижня межа (ключ дати або None)
+        :param end: Верхня межа (ключ дати або None)
+        :param pending_only: Лише невиконані задачі
+        :return: Список ID у порядку дат
+        """
+        return self._slice(self._pending if pending_only else self._all, start, end)
+
+    def before(self, moment):
+        """
+        ID невиконаних задач з датою виконання раніше вказаного моменту
+
+        :param moment: Ключ дати
+        :return: Список ID у порядку дат
+        """
+        return [key for _, key in self._pending[:bisect_left(self._pending, (moment,))]]
+
+    def next_after(self, moment, limit):
+        """
+        Найближчі невиконані задачі, починаючи з вказаного моменту
+
+        :param moment: Ключ дати
+        :param limit: Кількість задач
+        :return: Список ID у порядку дат
+        """
+        position = bisect_left(self._pending, (moment,))
+        end = min(position + limit, bisect_left(self._pending, (UNDATED,)))
+        return [key for _, key in self._pending[position:end]]
+
+    def entries(self, pending_only=False):
+        """
+        Пари (ключ дати, ID) усіх задач у порядку дат; задачі без дати - в кінці
+
+        :param pending_only: Лише невиконані задачі
+        :return: Відсортований список пар (не змінювати)
+        """
+        return self._pending if pending_only else self._all
+
+
+class TextIndex:
+    """
+    Інвертований індекс слів назв та категорій задач
+
+    Для кожного слова зберігається відсортований список ключів задач, а
+    всі слова - у відсортованому списку, тому слова з заданим префіксом
+    знаходяться бінарним пошуком. Окремо для кожної задачі зберігаються її
+    слова, що дозволяє перевіряти кандидатів без об'єднання великих
+    списків. Після copy() словники, список слів та списки ключів спільні з
+    оригіналом і копіюються лише під час першої зміни (copy-on-write).
+    """
+
+    def __init__(self):
+        """Ініціалізація порожнього індексу"""
+        self.clear()
+
+    def clear(self):
+        """Очищення індексу"""
+        self._postings = {}
+        self._words = []
+        self._task_words = {}
+        self._owned = None
+
+    def copy(self):
+        """
+        Копія індексу, що не змінює оригінал
+
+        :return: TextIndex
+        """
+        index = TextIndex.__new__(TextIndex)
+        index._postings = self._postings
+        index._words = self._words
+        index._task_words = self._task_words
+        index._owned = set()
+        return index
+
+    def _own(self, name):
+        """
+        Структура індексу, яку можна змінювати
+
+        :param name: Назва атрибута (_postings, _words, _task_words)
+        :return: Словник або список
+        """
+        value = getattr(self, name)
+        # Кортеж не збігається з жодним словом у множині _owned
+        if self._owned is not None and (name,) not in self._owned:
+            value = value.copy()
+            setattr(self, name, value)
+            self._owned.add((name,))
+        return value
+
+    @staticmethod
+    def task_words(task):
+        """
+        Слова задачі для індексу
+
+        :param task: Задача
+        :return: Кортеж різних слів
+        """
+        words = []
+        for field in TEXT_FIELDS:
+            words.extend(text_tokens(task.get(field)))
+        return tuple(dict.fromkeys(words))
+
+    def build(self, tasks):
+        """
+        Повна побудова індексу з одним сортуванням слів
+
+        :param tasks: Словник "ключ -> задача"
+        """
+        postings = {}
+        task_words = {}
+        for key, task in tasks.items():
+            words = task_words[key] = self.task_words(task)
+            for word in words:
+                posting = postings.get(word)
+                if posting is None:
+                    postings[word] = [key]
+                else:
+                    posting.append(key)
+
+        for posting in postings.values():
+            posting.sort()
+        self._postings = postings
+        self._words = sorted(postings)
+        self._task_words = task_words
+        self._owned = None
+
+    def _writable(self, word):
+        """
+        Список ключів слова, який можна змінювати
+
+        :param word: Слово
+        :return: Відсортований список ключів
+        """
+        posting = self._postings[word]
+        if self._owned is not None and word not in self._owned:
+            posting = self._own('_postings')[word] = list(posting)
+            self._owned.add(word)
+        return posting
+
+    @staticmethod
+    def _contains(posting, key):
+        """
+        Перевірка наявності ключа у відсортованому списку
+
+        :param posting: Відсортований список ключів
+        :param key: Ключ задачі
+        :return: True або False
+        """
+        position = bisect_left(posting, key)
+        return position < len(posting) and posting[position] == key
+
+    def add(self, key, task):
+        """
+        Додавання задачі до індексу
+
+        :param key: Ключ задачі
+        :param task: Задача
+        """
+        words = self._own('_task_words')[key] = self.task_words(task)
+        for word in words:
+            posting = self._postings.get(word)
+            if posting is not None:
+                if not self._contains(posting, key):
+                    insort(self._writable(word), key)
+            else:
+                self._own('_postings')[word] = [key]
+                insort(self._own('_words'), word)
+                if self._owned is not None:
+                    self._owned.add(word)
+
+    def remove(self, key, task):
+        """
+        Видалення задачі з індексу
+
+        :param key: Ключ задачі
+        :param task: Задача
+        """
+        if key not in self._task_words:
+            return
+
+        for word in self._own('_task_words').pop(key):
+            posting = self._postings.get(word)
+            if posting is None or not self._contains(posting, key):
+                continue
+
+            if len(posting) > 1:
+                posting = self._writable(word)
+                del posting[bisect_left(posting, key)]
+                continue
+
+            del self._own('_postings')[word]
+            words = self._own('_words')
+            del words[bisect_left(words, word)]
+            if self._owned is not None:
+                self._owned.discard(word)
+
+    def _prefix_postings(self, prefix):
+        """
+        Списки ключів усіх слів, що починаються з префікса
+
+        :param prefix: Префікс
+        :return: Список відсортованих списків ключів
+        """
+        words = self._words
+        start = bisect_left(words, prefix)
+        # Усі слова з префіксом менші за префікс зі збільшеним останнім символом
+        end = bisect_left(words, prefix[:-1] + chr(ord(prefix[-1]) + 1), start)
+        postings = self._postings
+        return [postings[word] for word in words[start:end]]
+
+    def _has_prefix(self, key, prefix):
+        """
+        Перевірка, чи є в задачі слово з префіксом
+
+        :param key: Ключ задачі
+        :param prefix: Префікс
+        :return: True або False
+        """
+        for word in self._task_words[key]:
+            if word.startswith(prefix):
+                return True
+        return False
+
+    @staticmethod
+    def _merged(postings, limit):
+        """
+        Ключі кількох списків у порядку зростання без повторів
+
+        :param postings: Відсортовані списки ключів
+        :param limit: Очікувана кількість ключів (None - усі)
+        :return: Ітератор ключів
+        """
+        if len(postings) == 1:
+            return iter(postings[0])
+        if limit is None:
+            return iter(sorted(set().union(*postings)))
+
+        def merge():
+            # Ліниве злиття: для сторінки підказок перебирається лише початок списків
+            heap = [(posting[0], number, 0) for number, posting in enumerate(postings)]
+            heapq.heapify(heap)
+            previous = None
+            while heap:
+                key, number, position = heap[0]
+                posting = postings[number]
+                position += 1
+                if position < len(posting):
+                    heapq.heapreplace(heap, (posting[position], number, position))
+                else:
+                    heapq.heappop(heap)
+                if key != previous:
+                    previous = key
+                    yield key
+
+        return merge()
+
+    def search(self, query, limit=None):
+        """
+        Ключі задач, що містять усі слова запиту
+
+        Кожне слово запиту збігається як префікс ("звіт" знайде "звітність"),
+        тому пошук підходить для підказок під час введення. Кандидати
+        беруться за найрідкіснішим словом у порядку ключів (списки слів з
+        цим префіксом зливаються ліниво), решта слів перевіряється для
+        кожного кандидата, і перебір зупиняється після limit збігів.
+
+        :param query: Текст запиту
+        :param limit: Максимальна кількість ключів (None - усі)
+        :return: Відсортований список ключів
+        """
+        matches = []
+        for prefix in dict.fromkeys(text_tokens(query)):
+            postings = self._prefix_postings(prefix)
+            if not postings:
+                return []
+            matches.append((sum(len(posting) for posting in postings), prefix, postings))
+
+        if not matches:
+            return []
+
+        matches.sort(key=lambda match: match[0])
+
+        # Слова з одним варіантом перевіряються бінарним пошуком у списку, решта - за словами задачі
+        exact = [postings[0] for _, _, postings in matches[1:] if len(postings) == 1]
+        prefixes = [prefix for _, prefix, postings in matches[1:] if len(postings) > 1]
+
+        result = []
+        for key in self._merged(matches[0][2], limit):
+            if (all(self._contains(posting, key) for posting in exact)
+                    and all(self._has_prefix(key, prefix) for prefix in prefixes)):
+                result.append(key)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import logging
+import threading
+from src.task_persistence import write_atomic
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Суфікс файлу журналу (додається до шляху файлу задач)
+JOURNAL_SUFFIX = '.journal'
+
+# Ключ у знімку з номером останнього врахованого запису журналу
+SNAPSHOT_SEQ_KEY = 'journal_seq'
+
+# Параметри фонового ущільнення за замовчуванням
+COMPACT_INTERVAL = 60
+COMPACT_THRESHOLD = 1000
+
+
+class TaskJournal:
+    """
+    Журнал змін задач (write-ahead log)
+
+    Кожна зміна дописується в кінець журналу одним рядком JSON з
+    порядковим номером. Фоновий потік періодично згортає журнал у знімок
+    (звичайний файл задач), після чого записи, що вже увійшли до знімка,
+    відкидаються.
+    """
+
+    def __init__(self, snapshot_file, journal_file=None, lock=None, sync=False, encoder=None):
+        """
+        Ініціалізація журналу
+
+        :param snapshot_file: Шлях до файлу знімка (файл задач)
+        :param journal_file: Шлях до файлу журналу
+        :param lock: Спільне блокування з менеджером задач
+        :param sync: Чи викликати fsync після кожного запису
+        :param encoder: Функція кодування знімка (за замовчуванням - JSON з відступами)
+        """
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file or snapshot_file + JOURNAL_SUFFIX
+        self.sync = sync
+        self.encoder = encoder or self._encode_json
+        self._lock = lock or threading.RLock()
+        self._seq = 0
+        self._pending = 0
+        self._file = None
+        self._stop_event = threading.Event()
+        self._compactor = None
+
+    @staticmethod
+    def _encode_json(data):
+        """
+        Кодування знімка у JSON
+
+        :param data: Словник з задачами
+        :return: Рядок JSON
+        """
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+    def replay(self, after_seq=0):
+        """
+        Читання записів журналу, які ще не увійшли до знімка
+
+        Обірваний або пошкоджений останній запис відкидається, а файл
+        журналу обрізається до останнього цілого запису.
+
+        :param after_seq: Номер останнього запису, врахованого у знімку
+        :return: Список записів у порядку їх додавання
+        """
+        records = []
+        self._seq = after_seq
+
+        if os.path.exists(self.journal_file):
+            valid_size = 0
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        logger.warning("Відкинуто обірваний запис у кінці журналу")
+                        break
+                    try:
+                        record = json.loads(line.decode('utf-8'))
+                    except ValueError:
+                        logger.warning("Відкинуто пошкоджений запис журналу")
+                        break
+
+                    valid_size += len(line)
+                    seq = record.get('seq', 0)
+                    if seq > after_seq:
+                        records.append(record)
+                        self._seq = seq
+
+            if valid_size < os.path.getsize(self.journal_file):
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(valid_size)
+
+        self._pending = len(records)
+        return records
+
+    def append(self, record):
+        """
+        Додавання запису в журнал
+
+        :param record: Словник з описом зміни
+        :return: True, якщо запис успішний, False - інакше
+        """
+        return self.append_many([record])
+
+    def append_many(self, records):
+        """
+        Додавання кількох записів у журнал одним записом на диск
+
+        :param records: Список словників з описом змін
+        :return: True, якщо запис успішний, False - інакше
+        """
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._file = open(self.journal_file, 'ab')
+
+                lines = []
+                seq = self._seq
+                for record in records:
+                    seq += 1
+                    record = dict(record, seq=seq)
+                    lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+
+                self._file.write(('\n'.join(lines) + '\n').encode('utf-8'))
+                self._file.flush()
+                if self.sync:
+                    os.fsync(self._file.fileno())
+
+                self._seq = seq
+                self._pending += len(records)
+                return True
+            except Exception as e:
+                logger.error(f"Помилка запису в журнал: {e}")
+                return False
+
+    def compact(self, snapshot_provider):
+        """
+        Згортання журналу у знімок
+
+        Знімок серіалізується під блокуванням, а записується на диск поза
+        ним, тому зміни не чекають на повільний запис файлу. Записи,
+        додані під час запису знімка, залишаються в журналі.
+
+        :param snapshot_provider: Функція, що повертає поточні дані задач
+        :return: True, якщо ущільнення успішне, False - інакше
+        """
+        with self._lock:
+            if not self._pending:
+                return True
+
+            data = dict(snapshot_provider())
+            data[SNAPSHOT_SEQ_KEY] = self._seq
+            payload = self.encoder(data)
+            offset = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+            pending = self._pending
+
+        try:
+            write_atomic(self.snapshot_file, payload)
+        except Exception as e:
+            logger.error(f"Помилка запису знімка задач: {e}")
+            return False
+
+        with self._lock:
+            try:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+
+                # Перенесення записів, доданих після серіалізації знімка
+                tail = b''
+                if os.path.exists(self.journal_file):
+                    with open(self.journal_file, 'rb') as f:
+                        f.seek(offset)
+                        tail = f.read()
+
+                write_atomic(self.journal_file, tail)
+
+                self._pending -= pending
+                return True
+            except Exception as e:
+                logger.error(f"Помилка ущільнення журналу: {e}")
+                return False
+
+    def start_compactor(self, snapshot_provider, interval=COMPACT_INTERVAL, threshold=COMPACT_THRESHOLD):
+        """
+        Запуск фонового потоку ущільнення
+
+        :param snapshot_provider: Функція, що повертає поточні дані задач
+        :param interval: Інтервал ущільнення в секундах
+        :param threshold: Кількість записів, після якої ущільнення запускається раніше
+        """
+        def run():
+            waited = 0
+            while not self._stop_event.wait(1):
+                waited += 1
+                if waited >= interval or self._pending >= threshold:
+                    self.compact(snapshot_provider)
+                    waited = 0
+
+        self._compactor = threading.Thread(target=run, name='task-journal-compactor')
+        self._compactor.daemon = True
+        self._compactor.start()
+
+    def close(self, snapshot_provider=None):
+        """
+        Зупинка фонового потоку та закриття журналу
+
+        :param snapshot_provider: Якщо вказано, журнал буде згорнуто перед закриттям
+        """
+        self._stop_event.set()
+        if self._compactor:
+            self._compactor.join()
+            self._compactor = None
+
+        if snapshot_provider:
+            self.compact(snapshot_provider)
+
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import mmap
+import logging
+from src.task_codec import (FLAG_COMPLETED, MAGIC, is_binary, read_layout, decode_record,
+                            decode_binary)
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Таблиця перетворення байта прапорців у 1 (виконана) або 0
+_COMPLETED_TABLE = bytes(1 if value & FLAG_COMPLETED else 0 for value in range(256))
+
+
+class LazyTaskFile:
+    """
+    Лінивий доступ до бінарного файлу задач
+
+    Файл відображається в пам'ять (mmap), а під час відкриття читаються
+    лише службові таблиці: прапорці, ID та зміщення записів. Окремі задачі
+    декодуються на вимогу, а лічильники виконаних задач рахуються за
+    байтами прапорців без декодування записів.
+    """
+
+    def __init__(self, path, file, data, layout):
+        """
+        Ініціалізація (використовуйте LazyTaskFile.open)
+
+        :param path: Шлях до файлу
+        :param file: Відкритий файл
+        :param data: Відображення файлу в пам'ять
+        :param layout: Результат read_layout
+        """
+        self.path = path
+        self._file = file
+        self._data = data
+        self._layout = layout
+        self._positions = None
+        self.meta = {key: value for key, value in layout['meta'].items() if key != 'last_id'}
+        self.count = layout['count']
+        self.completed_count = layout['flags'].translate(_COMPLETED_TABLE).count(1)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Відкриття файлу задач для лінивого читання
+
+        :param path: Шлях до файлу
+        :return: Об'єкт LazyTaskFile або None, якщо файл не підтримує лінивий режим
+                 (JSON, бінарний формат версії 1 або задачі без ID)
+        """
+        if not os.path.exists(path) or os.path.getsize(path) < len(MAGIC):
+            return None
+
+        f = open(path, 'rb')
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            f.close()
+            logger.warning(f"Не вдалося відобразити файл задач у пам'ять: {e}")
+            return None
+
+        try:
+            if is_binary(data):
+                layout = read_layout(data)
+                if layout['ids'] is not None and 0 not in layout['ids']:
+                    return cls(path, f, data, layout)
+        except Exception as e:
+            logger.warning(f"Не вдалося прочитати таблиці файлу задач: {e}")
+
+        data.close()
+        f.close()
+        return None
+
+    @property
+    def last_id(self):
+        """
+        Останній виданий ID задачі
+
+        :return: ID
+        """
+        ids = self._layout['ids']
+        return max(self._layout['meta'].get('last_id') or 0, max(ids) if ids else 0)
+
+    def get(self, task_id):
+        """
+        Задача за ID
+
+        :param task_id: ID задачі
+        :return: Задача або None, якщо задачу не знайдено
+        """
+        if self._positions is None:
+            self._positions = {task_id: position for position, task_id in enumerate(self._layout['ids'])}
+
+        position = self._positions.get(task_id)
+        if position is None:
+            return None
+        return decode_record(self._data, self._layout, position)
+
+    def filter_completed(self, completed=True):
+        """
+        Задачі з вказаним статусом виконання
+
+        Декодуються лише записи, відібрані за байтами прапорців.
+
+        :param completed: Статус виконання
+        :return: Список задач у порядку ID
+        """
+        flags = self._layout['flags'].translate(_COMPLETED_TABLE)
+        wanted = 1 if completed else 0
+        tasks = []
+        position = flags.find(wanted)
+        while position != -1:
+            tasks.append(decode_record(self._data, self._layout, position))
+            position = flags.find(wanted, position + 1)
+        return tasks
+
+    def load_all(self):
+        """
+        Декодування всього файлу
+
+        :return: Словник з задачами (формат tasks.json)
+        """
+        return decode_binary(self._data)
+
+    def close(self):
+        """Закриття відображення та файлу"""
+        self._data.close()
+        self._file.close()
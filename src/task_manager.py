@@ -2,9 +2,24 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
+import shutil
 import logging
-from datetime import datetime
+import threading
+import itertools
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from src.task_journal import TaskJournal, SNAPSHOT_SEQ_KEY, COMPACT_INTERVAL
+from src.task_index import TaskIndex, DueDateIndex, TextIndex, due_key
+from src.task_persistence import (PersistScheduler, write_atomic, DURABILITY_ALWAYS,
+                                  COMMIT_WINDOW, COMMIT_INTERVAL)
+from src.task_codec import FORMAT_JSON, encode_tasks, decode_tasks
+from src.task_lazy import LazyTaskFile
+from src.task_record import Task, parse_timestamp
+from src.task_file_cache import file_signature, file_lock
+from src.task_snapshot import TaskSnapshot
+from src.task_backup import TaskBackup, BACKUP_INTERVAL
+from src.task_archive import TaskArchive, ARCHIVE_AFTER, ARCHIVE_INTERVAL, completion_moment
+from src.task_transfer import FORMAT_NDJSON, detect_format, read_tasks, write_tasks
 
 # Налаштування логування
 logging.basicConfig(
@@ -16,68 +31,688 @@ logger = logging.getLogger(__name__)
 # Шлях до файлу задач
 TASKS_FILE = 'tasks.json'
 
+# Режими зберігання задач
+STORAGE_JSON = 'json'        # Повний перезапис файлу при кожній зміні
+STORAGE_JOURNAL = 'journal'  # Журнал змін + періодичне ущільнення у знімок
+
+# Інтервал перевірки, чи не чекає читач на завершення пакетної зміни (секунди)
+PUBLISH_WAIT = 0.01
+
+
+class TaskBatch:
+    """Стан пакетної зміни задач"""
+    
+    def __init__(self):
+        self.records = []
+        self.committed = False
+
 class TaskManager:
-    """Клас для управління задачами"""
+    """
+    Клас для управління задачами
+    
+    Кожна задача має стабільний числовий ID, який не змінюється після
+    видалення інших задач. Задачі зберігаються у словнику "ID -> задача",
+    порядок якого відповідає порядку створення.
     
-    def __init__(self, tasks_file=TASKS_FILE):
+    Читання виконується з опублікованого знімка (TaskSnapshot), тому звіти
+    та списки не чекають на запис файлу. Знімок публікується ліниво: зміна
+    лише позначає стан зміненим, а новий знімок створюється під час
+    наступного читання. Перша зміна після публікації копіює словники задач
+    і назв, а в індексах - лише зачеплені кошики (copy-on-write), тому
+    послідовні зміни без читань між ними не копіюють нічого.
+    """
+    
+    def __init__(self, tasks_file=TASKS_FILE, storage=STORAGE_JSON, compact_interval=COMPACT_INTERVAL,
+                 normalize_names=False, durability=DURABILITY_ALWAYS, commit_window=COMMIT_WINDOW,
+                 commit_interval=COMMIT_INTERVAL, file_format=FORMAT_JSON, lazy=False,
+                 compact=False, shared=False, backup_dir=None, backup_interval=BACKUP_INTERVAL,
+                 archive_dir=None, archive_after=ARCHIVE_AFTER, archive_interval=ARCHIVE_INTERVAL):
         """
         Ініціалізація менеджера задач
         
         :param tasks_file: Шлях до файлу з задачами
+        :param storage: Режим зберігання (json, journal)
+        :param compact_interval: Інтервал ущільнення журналу в секундах
+        :param normalize_names: Порівнювати назви без урахування регістру та зайвих пробілів
+        :param durability: Політика збереження файлу задач (always, group, interval)
+        :param commit_window: Вікно об'єднання записів для політики group (секунди)
+        :param commit_interval: Інтервал запису для політики interval (секунди)
+        :param file_format: Формат запису файлу задач (json, binary); читаються обидва
+        :param lazy: Лінивий режим: задачі бінарного файлу декодуються лише тоді, коли потрібні
+        :param compact: Зберігати задачі в пам'яті компактними записами Task замість словників
+        :param shared: Файл задач спільний з іншими процесами: зміни інших процесів
+                       підхоплюються під час читання та об'єднуються під час запису
+        :param backup_dir: Каталог інкрементних резервних копій (None - без резервного копіювання)
+        :param backup_interval: Інтервал фонового резервного копіювання в секундах
+        :param archive_dir: Каталог архіву виконаних задач (None - без архівування)
+        :param archive_after: Вік виконаної задачі (дні), після якого вона переноситься до архіву
+        :param archive_interval: Інтервал фонового архівування в секундах
         """
         self.tasks_file = tasks_file
-        self.tasks = self.load_tasks()
+        self.storage = storage
+        self.file_format = file_format
+        self.compact = compact
+        self.normalize_names = normalize_names
+        self.journal = None
+        self.backup = TaskBackup(backup_dir) if backup_dir else None
+        self.archive = TaskArchive(archive_dir) if archive_dir else None
+        self.archive_after = archive_after
+        self._lock = threading.RLock()
+        self._tasks = {}
+        self._meta = {}
+        self._last_id = 0
+        self._name_index = {}
+        self._index = TaskIndex()
+        self._due_index = DueDateIndex()
+        self._text_index = TextIndex()
+        self._batch = None
+        self.version = 0
+        self._snapshot = None
+        self._published = False
+        self._dirty = False
+        self.shared = shared
+        self._unsynced = []
+        self._file_signature = None
+        
+        if shared and storage != STORAGE_JSON:
+            logger.warning("Спільний доступ до файлу задач підтримується лише в режимі json")
+            self.shared = False
+        if self.shared and lazy:
+            logger.info("Лінивий режим недоступний для спільного файлу задач")
+            lazy = False
+        
+        self._lazy = LazyTaskFile.open(tasks_file) if lazy else None
+        if self._lazy:
+            self._meta = dict(self._lazy.meta)
+            self._last_id = self._lazy.last_id
+        else:
+            if lazy:
+                logger.info("Лінивий режим доступний лише для бінарного файлу задач, задачі завантажено повністю")
+            self._file_signature = file_signature(tasks_file)
+            self.tasks = self.load_tasks()
+        self._persist = PersistScheduler(self._write_tasks_file, policy=durability,
+                                         window=commit_window, interval=commit_interval)
+        
+        if storage == STORAGE_JOURNAL:
+            self.journal = TaskJournal(tasks_file, lock=self._lock, encoder=self._encode_tasks)
+            after_seq = self._meta.pop(SNAPSHOT_SEQ_KEY, 0)
+            for record in self.journal.replay(after_seq):
+                self._ensure_loaded()
+                self._apply_record(record)
+            if self._lazy is None:
+                self._publish()
+            self.journal.start_compactor(self._snapshot_data, interval=compact_interval)
+        
+        if self.backup is not None:
+            self.backup.start(self._published_snapshot, interval=backup_interval)
+        if self.archive is not None:
+            self.archive.start(self.archive_completed, interval=archive_interval)
     
     def load_tasks(self):
         """
         Завантаження задач з файлу
         
+        Формат файлу (JSON або бінарний) визначається автоматично.
+        
         :return: Словник з задачами
         """
         try:
             if os.path.exists(self.tasks_file):
-                with open(self.tasks_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.tasks_file, 'rb') as f:
+                    return decode_tasks(f.read())
             return {"tasks": []}
         except Exception as e:
             logger.error(f"Помилка завантаження задач: {e}")
+            self._preserve_corrupt_file()
+            if self.backup is not None:
+                logger.warning("Задачі можна відновити з резервної копії: restore_backup()")
             return {"tasks": []}
     
-    def save_tasks(self):
+    def _ensure_loaded(self):
+        """
+        Повне завантаження задач у лінивому режимі
+        
+        Викликається перед будь-якою операцією, якій потрібні всі задачі
+        або індекси. Метадані та останній ID зберігаються з поточного стану.
+        Для спільного файлу спочатку підхоплюються зміни інших процесів.
+        """
+        self._refresh()
+        if self._lazy is None:
+            return
+        
+        with self._lock:
+            lazy = self._lazy
+            if lazy is None:
+                return
+            
+            meta, last_id = self._meta, self._last_id
+            self.tasks = lazy.load_all()
+            self._meta = meta
+            self._last_id = max(self._last_id, last_id)
+    
+    def _refresh(self):
+        """Підхоплення змін спільного файлу задач, зроблених іншими процесами"""
+        if not self.shared or file_signature(self.tasks_file) == self._file_signature:
+            return
+        
+        with self._lock:
+            # Під час пакетної зміни стан не оновлюється, щоб не зламати відкат
+            if self._batch is None:
+                self._merge_external_changes()
+    
+    def _merge_external_changes(self):
+        """
+        Об'єднання змін з диска з незбереженими змінами цього процесу
+        
+        Задачі перечитуються з файлу, після чого незбережені зміни
+        застосовуються поверх них. Нові задачі отримують вільні ID, якщо їхні
+        ID вже зайняв інший процес; задача з назвою, яку інший процес уже
+        додав, не дублюється. Викликається під блокуванням.
+        
+        :return: True, якщо файл змінився, False - інакше
+        """
+        signature = file_signature(self.tasks_file)
+        if signature == self._file_signature:
+            return False
+        
+        pending = self._unsynced
+        self.tasks = self.load_tasks()
+        self._file_signature = signature
+        
+        remap = {}
+        replayed = []
+        for record in pending:
+            record = dict(record)
+            if 'id' in record:
+                record['id'] = remap.get(record['id'], record['id'])
+            
+            op = record.get('op')
+            if op == 'add':
+                task = dict(record['task'])
+                existing = self._find_by_name(task.get('name'))
+                if existing is not None:
+                    logger.warning(f"Задачу '{task.get('name')}' вже додано іншим процесом")
+                    remap[task.get('id')] = existing['id']
+                    continue
+                
+                if task.get('id') in self._tasks or (task.get('id') or 0) <= self._last_id:
+                    remap[task.get('id')] = self._last_id + 1
+                    task['id'] = self._last_id + 1
+                record['task'] = task
+            elif op in ('update', 'delete') and record.get('id') not in self._tasks:
+                # Задачу видалено іншим процесом
+                continue
+            
+            self._apply_record(record)
+            replayed.append(record)
+        
+        self._unsynced = replayed
+        self._publish()
+        return True
+    
+    def _preserve_corrupt_file(self):
+        """Збереження копії пошкодженого файлу задач, щоб наступний запис її не затер"""
+        try:
+            corrupt_file = f"{self.tasks_file}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            shutil.copy2(self.tasks_file, corrupt_file)
+            logger.warning(f"Копію пошкодженого файлу задач збережено: {corrupt_file}")
+        except Exception as e:
+            logger.error(f"Не вдалося зберегти копію пошкодженого файлу задач: {e}")
+    
+    def save_tasks(self, wait=False):
         """
         Збереження задач у файл
         
-        :return: True, якщо збереження успішне, False - інакше
+        Запис виконується відповідно до політики збереження: одразу (always)
+        або разом з іншими змінами у фоновому потоці (group, interval).
+        У режимі журналу замість повного перезапису журнал згортається у знімок.
+        
+        :param wait: Чекати, доки зміни буде записано на диск
+        :return: True, якщо збереження успішне (або заплановане), False - інакше
+        """
+        if self.journal:
+            return self.journal.compact(self._snapshot_data)
+        
+        return self._persist.request(wait=wait)
+    
+    def flush(self, timeout=None):
+        """
+        Очікування запису всіх змін на диск
+        
+        :param timeout: Максимальний час очікування в секундах
+        :return: True, якщо всі зміни записано, False - інакше
+        """
+        return self._persist.flush(timeout)
+    
+    def _write_tasks_file(self):
+        """
+        Атомарний запис поточного стану задач у файл
+        
+        Серіалізується опублікований знімок, тому запис не тримає
+        блокування і не заважає ні змінам, ні читанню задач.
+        
+        :return: True, якщо запис успішний, False - інакше
         """
         try:
-            with open(self.tasks_file, 'w', encoding='utf-8') as f:
-                json.dump(self.tasks, f, ensure_ascii=False, indent=2)
+            if self.shared:
+                return self._write_shared_tasks_file()
+            
+            write_atomic(self.tasks_file, self._encode_tasks(self.tasks))
             return True
         except Exception as e:
             logger.error(f"Помилка збереження задач: {e}")
             return False
     
+    def _write_shared_tasks_file(self):
+        """
+        Запис спільного файлу задач з об'єднанням змін інших процесів
+        
+        Під рекомендаційним блокуванням файлу спочатку підхоплюються зміни,
+        записані іншими процесами, а потім записується об'єднаний стан.
+        
+        :return: True, якщо запис успішний
+        """
+        with file_lock(self.tasks_file):
+            with self._lock:
+                self._merge_external_changes()
+                write_atomic(self.tasks_file, self._encode_tasks(self.tasks))
+                self._file_signature = file_signature(self.tasks_file)
+                self._unsynced = []
+        return True
+    
+    def _encode_tasks(self, data):
+        """
+        Кодування даних задач у формат файлу
+        
+        :param data: Словник з задачами
+        :return: Байти
+        """
+        return encode_tasks(data, self.file_format)
+    
+    @property
+    def tasks(self):
+        """
+        Дані задач у форматі файлу tasks.json
+        
+        :return: Словник з задачами
+        """
+        snapshot = self.snapshot()
+        data = dict(snapshot.meta)
+        if self.compact:
+            data['tasks'] = [task.to_dict() for task in snapshot.tasks.values()]
+        else:
+            data['tasks'] = snapshot.get_all_tasks()
+        data['last_id'] = snapshot.last_id
+        return data
+    
+    @tasks.setter
+    def tasks(self, data):
+        """
+        Заміна всіх задач даними у форматі файлу tasks.json
+        
+        Задачі без ID (старий формат файлу) отримують нові ID у порядку
+        розташування у файлі.
+        
+        :param data: Словник з задачами
+        """
+        with self._lock:
+            if self._lazy is not None:
+                self._lazy.close()
+                self._lazy = None
+            
+            self._meta = {key: value for key, value in data.items() if key not in ('tasks', 'last_id')}
+            self._last_id = data.get('last_id') or 0
+            self._tasks = {}
+            
+            without_id = []
+            for task in data.get('tasks', []):
+                task = self._new_task(task)
+                task_id = task.get('id')
+                if isinstance(task_id, int) and task_id not in self._tasks:
+                    self._tasks[task_id] = task
+                    self._last_id = max(self._last_id, task_id)
+                else:
+                    without_id.append(task)
+            
+            for task in without_id:
+                self._last_id += 1
+                task['id'] = self._last_id
+                self._tasks[self._last_id] = task
+            
+            self._tasks = dict(sorted(self._tasks.items()))
+            self._rebuild_indexes()
+            self.version += 1
+            self._publish()
+    
+    def snapshot(self):
+        """
+        Поточний незмінний знімок задач
+        
+        Кілька запитів до одного знімка (наприклад, списки та статистика для
+        одного звіту) узгоджені між собою навіть під час паралельних змін.
+        Якщо після попередньої публікації були зміни, знімок публікується
+        зараз; під час пакетної зміни в іншому потоці повертається знімок,
+        опублікований на її початку.
+        
+        :return: TaskSnapshot
+        """
+        self._ensure_loaded()
+        if self._dirty:
+            self._publish_pending()
+        return self._snapshot
+    
+    def _published_snapshot(self):
+        """
+        Актуальний знімок без завантаження задач
+        
+        :return: TaskSnapshot або None у лінивому режимі до завантаження задач
+        """
+        if self._dirty:
+            self._publish_pending()
+        return self._snapshot
+    
+    def _publish_pending(self):
+        """Публікація змін, зроблених після попереднього знімка"""
+        while not self._lock.acquire(timeout=PUBLISH_WAIT):
+            # Пакетна зміна тримає блокування довго; її початок уже опублікував попередні зміни
+            if self._batch is not None:
+                return
+        try:
+            if self._dirty and self._batch is None:
+                self._publish()
+        finally:
+            self._lock.release()
+    
+    def _publish(self):
+        """
+        Публікація поточного стану як нового знімка
+        
+        Структури передаються знімку без копіювання; наступна зміна спершу
+        відокремить їх (_detach). Викликається під блокуванням.
+        """
+        self._snapshot = TaskSnapshot(self.version, self._tasks, dict(self._meta), self._last_id,
+                                      self._name_index, self._index, self._due_index, self._text_index,
+                                      self._name_key)
+        self._published = True
+        self._dirty = False
+    
+    def _detach(self):
+        """
+        Відокремлення структур, спільних з опублікованим знімком, перед їх зміною
+        
+        Копіюються лише словники задач та назв; індекси копіюють свої
+        кошики під час першої зміни кожного з них.
+        """
+        if not self._published:
+            return
+        
+        self._tasks = self._tasks.copy()
+        self._name_index = self._name_index.copy()
+        self._index = self._index.copy()
+        self._due_index = self._due_index.copy()
+        self._text_index = self._text_index.copy()
+        self._published = False
+    
+    def _new_task(self, data):
+        """
+        Задача у поточному представленні (словник або компактний запис)
+        
+        :param data: Словник з полями задачі
+        :return: Задача
+        """
+        if self.compact:
+            return Task(data)
+        return data
+    
+    def _snapshot_data(self):
+        """
+        Поточні дані задач для запису знімка
+        
+        :return: Словник з задачами
+        """
+        return self.tasks
+    
+    def _commit(self, record):
+        """
+        Збереження зміни відповідно до режиму зберігання
+        
+        :param record: Опис зміни
+        :return: True, якщо збереження успішне, False - інакше
+        """
+        if self._batch is not None:
+            self._batch.records.append(record)
+            return True
+        if self.journal:
+            return self.journal.append(record)
+        if self.shared:
+            self._unsynced.append(record)
+        return self.save_tasks()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Пакетна зміна задач з одним збереженням
+        
+        Усі зміни всередині блоку застосовуються в пам'яті, а на диск
+        записуються один раз при виході з блоку. Якщо блок завершився
+        винятком або збереження не вдалося, усі зміни скасовуються.
+        Вкладені блоки приєднуються до зовнішнього. Читачі бачать зміни
+        блоку лише після його завершення.
+        
+        Приклад:
+            with task_manager.batch() as batch:
+                task_manager.add_task("Задача 1")
+                task_manager.add_task("Задача 2")
+            if not batch.committed:
+                ...
+        
+        :return: Об'єкт TaskBatch
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if self._batch is not None:
+                yield self._batch
+                return
+            
+            batch = TaskBatch()
+            # Знімок для відкату та для читачів з інших потоків під час пакета
+            if self._dirty:
+                self._publish()
+            backup = self._snapshot
+            self._batch = batch
+            try:
+                yield batch
+            except BaseException:
+                self._batch = None
+                self._rollback(backup)
+                raise
+            
+            self._batch = None
+            unsynced = list(self._unsynced)
+            self._publish()
+            if not batch.records:
+                batch.committed = True
+            elif self.journal:
+                batch.committed = self.journal.append_many(batch.records)
+            else:
+                if self.shared:
+                    self._unsynced.extend(batch.records)
+                batch.committed = self.save_tasks()
+            
+            if not batch.committed:
+                logger.error("Пакетну зміну задач скасовано: помилка збереження")
+                self._rollback(backup)
+                if self.shared:
+                    # Стан після відкату не враховує файл на диску - його буде перечитано
+                    self._unsynced = unsynced
+                    self._file_signature = None
+    
+    def _rollback(self, backup):
+        """
+        Відновлення стану задач після невдалої пакетної зміни
+        
+        Знімок, опублікований до початку пакета, не змінювався, тому його
+        структури повертаються без копіювання.
+        
+        :param backup: Знімок стану до пакетної зміни
+        """
+        self._tasks = backup.tasks
+        self._meta = dict(backup.meta)
+        self._last_id = backup.last_id
+        self._name_index = backup.name_index
+        self._index = backup.index
+        self._due_index = backup.due_index
+        self._text_index = backup.text_index
+        self.version += 1
+        self._publish()
+    
+    def _name_key(self, name):
+        """
+        Ключ індексу назв
+        
+        :param name: Назва задачі
+        :return: Назва або її нормалізована форма
+        """
+        if self.normalize_names and isinstance(name, str):
+            return ' '.join(name.split()).casefold()
+        return name
+    
+    def _find_by_name(self, name):
+        """
+        Пошук задачі за назвою у поточному (ще не опублікованому) стані
+        
+        Використовується під час змін під блокуванням.
+        
+        :param name: Назва задачі
+        :return: Задача або None
+        """
+        return self._name_index.get(self._name_key(name))
+    
+    def _index_task(self, task):
+        """Додавання задачі до індексів"""
+        self._name_index.setdefault(self._name_key(task.get('name')), task)
+        self._index.add(task['id'], task)
+        self._due_index.add(task['id'], task)
+        self._text_index.add(task['id'], task)
+    
+    def _unindex_task(self, task):
+        """Видалення задачі з індексів"""
+        key = self._name_key(task.get('name'))
+        if self._name_index.get(key) is task:
+            del self._name_index[key]
+        
+        self._index.remove(task['id'], task)
+        self._due_index.remove(task['id'], task)
+        self._text_index.remove(task['id'], task)
+    
+    def _rebuild_indexes(self):
+        """Повна побудова індексів після завантаження задач"""
+        self._name_index = {}
+        self._index = TaskIndex()
+        self._due_index = DueDateIndex()
+        self._text_index = TextIndex()
+        self._published = False
+        for task in self._tasks.values():
+            self._name_index.setdefault(self._name_key(task.get('name')), task)
+            self._index.add(task['id'], task)
+        self._due_index.build(self._tasks)
+        self._text_index.build(self._tasks)
+    
+    def _record_task(self, record):
+        """
+        Пошук задачі, до якої відноситься зміна
+        
+        :param record: Опис зміни
+        :return: Задача
+        """
+        if 'id' in record:
+            return self._tasks[record['id']]
+        
+        # Записи журналу, створені до появи стабільних ID
+        if 'index' in record:
+            return list(self._tasks.values())[record['index']]
+        return self._name_index[self._name_key(record['name'])]
+    
+    def _apply_record(self, record):
+        """
+        Застосування зміни до задач у пам'яті
+        
+        Використовується як для нових змін, так і для відтворення журналу.
+        Задачі опублікованого знімка не змінюються: оновлена задача
+        замінюється новим об'єктом.
+        
+        :param record: Опис зміни (op: add, update, delete, clear)
+        """
+        op = record.get('op')
+        self._detach()
+        self.version += 1
+        self._dirty = True
+        
+        if op == 'add':
+            task = self._new_task(dict(record['task']))
+            if 'id' not in task:
+                task['id'] = self._last_id + 1
+            self._last_id = max(self._last_id, task['id'])
+            self._tasks[task['id']] = task
+            self._index_task(task)
+        elif op == 'update':
+            task = self._record_task(record)
+            self._unindex_task(task)
+            task = self._new_task(task.copy())
+            task.update(record['fields'])
+            self._tasks[task['id']] = task
+            self._index_task(task)
+        elif op == 'delete':
+            task = self._record_task(record)
+            self._unindex_task(task)
+            del self._tasks[task['id']]
+        elif op == 'clear':
+            if record.get('completed_only'):
+                for task in [self._tasks[task_id] for task_id in self._index.lookup('completed', True)]:
+                    self._unindex_task(task)
+                    del self._tasks[task['id']]
+            else:
+                self._tasks = {}
+                self._rebuild_indexes()
+        else:
+            logger.error(f"Невідомий тип зміни: {op}")
+    
+    def close(self):
+        """Запис накопичених змін, зупинка фонових потоків та ущільнення журналу"""
+        if self.archive is not None:
+            self.archive.close()
+        self._persist.close()
+        if self.journal:
+            self.journal.close(self._snapshot_data)
+        if self.backup is not None:
+            self.backup.close(self._published_snapshot)
+        
+        with self._lock:
+            if self._lazy is not None:
+                self._lazy.close()
+                self._lazy = None
+    
     def get_all_tasks(self):
         """
         Отримання всіх задач
         
         :return: Список всіх задач
         """
-        return self.tasks.get('tasks', [])
+        return self.snapshot().get_all_tasks()
     
     def get_task_by_id(self, task_id):
         """
-        Отримання задачі за індексом
+        Отримання задачі за ID
         
-        :param task_id: Індекс задачі
+        :param task_id: ID задачі
         :return: Задача або None, якщо задачу не знайдено
         """
-        tasks = self.tasks.get('tasks', [])
-        
-        if 0 <= task_id < len(tasks):
-            return tasks[task_id]
-        
-        return None
+        self._refresh()
+        if self._lazy is not None:
+            with self._lock:
+                if self._lazy is not None:
+                    return self._lazy.get(task_id)
+        return self.snapshot().get_task_by_id(task_id)
     
     def get_task_by_name(self, name):
         """
@@ -86,13 +721,7 @@ class TaskManager:
         :param name: Назва задачі
         :return: Задача або None, якщо задачу не знайдено
         """
-        tasks = self.tasks.get('tasks', [])
-        
-        for task in tasks:
-            if task.get('name') == name:
-                return task
-        
-        return None
+        return self.snapshot().get_task_by_name(name)
     
     def add_task(self, name, completed=False, due_date=None, priority=None, category=None):
         """
@@ -109,75 +738,120 @@ class TaskManager:
             logger.error("Назва задачі не може бути пустою")
             return False
         
-        # Перевірка на дублікати
-        existing_task = self.get_task_by_name(name)
-        if existing_task:
-            logger.warning(f"Задача з назвою '{name}' вже існує")
-            return False
-        
-        # Створення нової задачі
-        new_task = {
-            'name': name,
-            'completed': completed,
-            'created_at': datetime.now().strftime('%d.%m.%Y %H:%M:%S')
-        }
-        
-        # Додавання опціональних полів
-        if due_date:
-            new_task['due_date'] = due_date
-        
-        if priority:
-            new_task['priority'] = priority
-        
-        if category:
-            new_task['category'] = category
-        
-        # Додавання задачі в список
-        if 'tasks' not in self.tasks:
-            self.tasks['tasks'] = []
-        
-        self.tasks['tasks'].append(new_task)
-        
-        # Збереження змін
-        return self.save_tasks()
+        self._ensure_loaded()
+        with self._lock:
+            # Перевірка на дублікати
+            if self._find_by_name(name):
+                logger.warning(f"Задача з назвою '{name}' вже існує")
+                return False
+            
+            # Створення нової задачі
+            new_task = {
+                'id': self._last_id + 1,
+                'name': name,
+                'completed': completed,
+                'created_at': datetime.now().strftime('%d.%m.%Y %H:%M:%S')
+            }
+            
+            # Додавання опціональних полів
+            if due_date:
+                new_task['due_date'] = due_date
+            
+            if priority:
+                new_task['priority'] = priority
+            
+            if category:
+                new_task['category'] = category
+            
+            if completed:
+                new_task['completed_at'] = new_task['created_at']
+            
+            # Додавання задачі та збереження змін
+            record = {'op': 'add', 'task': new_task}
+            self._apply_record(record)
+            return self._commit(record)
     
     def update_task(self, task_id, **kwargs):
         """
         Оновлення існуючої задачі
         
-        :param task_id: Індекс задачі
+        :param task_id: ID задачі
         :param kwargs: Поля для оновлення (name, completed, due_date, priority, category)
         :return: True, якщо оновлення успішне, False - інакше
         """
-        task = self.get_task_by_id(task_id)
+        self._ensure_loaded()
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task:
+                logger.error(f"Задачу з ID {task_id} не знайдено")
+                return False
+            
+            return self._update(task, {'op': 'update', 'id': task_id}, kwargs)
+    
+    def update_task_by_name(self, task_name, **kwargs):
+        """
+        Оновлення існуючої задачі за назвою
         
-        if not task:
-            logger.error(f"Задачу з ID {task_id} не знайдено")
-            return False
+        :param task_name: Назва задачі
+        :param kwargs: Поля для оновлення (name, completed, due_date, priority, category)
+        :return: True, якщо оновлення успішне, False - інакше
+        """
+        self._ensure_loaded()
+        with self._lock:
+            task = self._find_by_name(task_name)
+            if not task:
+                logger.error(f"Задачу з назвою '{task_name}' не знайдено")
+                return False
+            
+            return self._update(task, {'op': 'update', 'id': task['id']}, kwargs)
+    
+    def _update(self, task, record, kwargs):
+        """
+        Оновлення полів задачі (під блокуванням)
+        
+        :param task: Задача для оновлення
+        :param record: Опис зміни з посиланням на задачу
+        :param kwargs: Поля для оновлення
+        :return: True, якщо оновлення успішне, False - інакше
+        """
+        # Перейменування не повинно створювати дублікатів
+        new_name = kwargs.get('name')
+        if new_name is not None:
+            existing_task = self._find_by_name(new_name)
+            if existing_task is not None and existing_task is not task:
+                logger.warning(f"Задача з назвою '{new_name}' вже існує")
+                return False
         
         # Оновлення полів
+        fields = {}
         for key, value in kwargs.items():
             if key in ['name', 'completed', 'due_date', 'priority', 'category']:
-                task[key] = value
+                fields[key] = value
         
-        # Додавання часу оновлення
-        task['updated_at'] = datetime.now().strftime('%d.%m.%Y %H:%M:%S')
+        # Додавання часу оновлення та часу виконання
+        now = datetime.now().strftime('%d.%m.%Y %H:%M:%S')
+        fields['updated_at'] = now
+        if 'completed' in fields and bool(fields['completed']) != bool(task.get('completed')):
+            fields['completed_at'] = now if fields['completed'] else None
         
         # Збереження змін
-        return self.save_tasks()
+        record['fields'] = fields
+        self._apply_record(record)
+        return self._commit(record)
     
     def delete_task(self, task_id):
         """
         Видалення задачі
         
-        :param task_id: Індекс задачі
+        :param task_id: ID задачі
         :return: True, якщо видалення успішне, False - інакше
         """
-        tasks = self.tasks.get('tasks', [])
-        
-        if 0 <= task_id < len(tasks):
-            del tasks[task_id]
-            return self.save_tasks()
+        self._ensure_loaded()
+        with self._lock:
+            if task_id in self._tasks:
+                record = {'op': 'delete', 'id': task_id}
+                self._apply_record(record)
+                return self._commit(record)
         
         logger.error(f"Задачу з ID {task_id} не знайдено")
         return False
@@ -186,7 +860,7 @@ class TaskManager:
         """
         Позначення задачі як виконаної/невиконаної
         
-        :param task_id: Індекс задачі
+        :param task_id: ID задачі
         :param completed: Статус виконання
         :return: True, якщо оновлення успішне, False - інакше
         """
@@ -198,8 +872,12 @@ class TaskManager:
         
         :return: Список виконаних задач
         """
-        tasks = self.tasks.get('tasks', [])
-        return [task for task in tasks if task.get('completed')]
+        self._refresh()
+        if self._lazy is not None:
+            with self._lock:
+                if self._lazy is not None:
+                    return self._lazy.filter_completed(True)
+        return self.snapshot().get_completed_tasks()
     
     def get_pending_tasks(self):
         """
@@ -207,8 +885,12 @@ class TaskManager:
         
         :return: Список невиконаних задач
         """
-        tasks = self.tasks.get('tasks', [])
-        return [task for task in tasks if not task.get('completed')]
+        self._refresh()
+        if self._lazy is not None:
+            with self._lock:
+                if self._lazy is not None:
+                    return self._lazy.filter_completed(False)
+        return self.snapshot().get_pending_tasks()
     
     def filter_tasks_by_category(self, category):
         """
@@ -217,8 +899,7 @@ class TaskManager:
         :param category: Категорія для фільтрації
         :return: Список задач у вказаній категорії
         """
-        tasks = self.tasks.get('tasks', [])
-        return [task for task in tasks if task.get('category') == category]
+        return self.snapshot().filter_tasks('category', category)
     
     def filter_tasks_by_priority(self, priority):
         """
@@ -227,8 +908,7 @@ class TaskManager:
         :param priority: Пріоритет для фільтрації
         :return: Список задач з вказаним пріоритетом
         """
-        tasks = self.tasks.get('tasks', [])
-        return [task for task in tasks if task.get('priority') == priority]
+        return self.snapshot().filter_tasks('priority', priority)
     
     def filter_tasks_by_due_date(self, due_date):
         """
@@ -237,8 +917,96 @@ class TaskManager:
         :param due_date: Дата для фільтрації (формат: "DD.MM.YYYY")
         :return: Список задач з вказаною датою виконання
         """
-        tasks = self.tasks.get('tasks', [])
-        return [task for task in tasks if task.get('due_date') == due_date]
+        return self.snapshot().filter_tasks('due_date', due_date)
+    
+    def query_tasks(self, **criteria):
+        """
+        Складений запит до задач
+        
+        Приклад: query_tasks(completed=False, priority='high', category='Робота')
+        
+        :param criteria: Умови (completed, category, priority, due_date)
+        :return: Список задач, що задовольняють усі умови
+        """
+        return self.snapshot().query_tasks(**criteria)
+    
+    def list_tasks(self, cursor=None, limit=20, sort='id', **filters):
+        """
+        Посторінковий перегляд задач
+        
+        Сторінка будується з відсортованих індексів за O(log n + limit), тому
+        перегляд великого списку не перебирає всі задачі. Курсори сторінки
+        непрозорі: їх потрібно передавати назад без змін.
+        
+        Приклад:
+            page = task_manager.list_tasks(limit=10, completed=False)
+            page = task_manager.list_tasks(page['next_cursor'], limit=10, completed=False)
+        
+        :param cursor: next_cursor або prev_cursor попередньої сторінки (None - перша сторінка)
+        :param limit: Кількість задач на сторінці
+        :param sort: Порядок: id (порядок створення), -id (спершу нові), due_date (за датою виконання)
+        :param filters: Умови (completed, category, priority, due_date)
+        :return: Словник {tasks, next_cursor, prev_cursor}; курсор None, якщо сторінки немає
+        """
+        return self.snapshot().list_tasks(cursor, limit, sort, **filters)
+    
+    def search_tasks(self, query, limit=None):
+        """
+        Повнотекстовий пошук задач за назвою та категорією
+        
+        Пошук не залежить від регістру, а кожне слово запиту збігається як
+        префікс, тому підходить для підказок під час введення.
+        
+        Приклад: search_tasks('звіт квар') знайде "Квартальний звіт"
+        
+        :param query: Слова для пошуку
+        :param limit: Максимальна кількість задач (None - усі)
+        :return: Список задач у порядку створення
+        """
+        return self.snapshot().search_tasks(query, limit)
+    
+    def tasks_due_between(self, start=None, end=None, pending_only=False):
+        """
+        Задачі з датою виконання в діапазоні (межі включно)
+        
+        Межі приймаються як рядки ("DD.MM.YYYY", ISO), date або datetime.
+        Дата без часу як нижня межа означає початок дня, як верхня - кінець дня.
+        
+        Приклад: tasks_due_between('10.03.2025', '16.03.2025')
+        
+        :param start: Нижня межа (None - без обмеження)
+        :param end: Верхня межа (None - без обмеження)
+        :param pending_only: Лише невиконані задачі
+        :return: Список задач у порядку дат виконання
+        """
+        start_key = due_key(start, end_of_day=False) if start is not None else None
+        end_key = due_key(end) if end is not None else None
+        if (start is not None and start_key is None) or (end is not None and end_key is None):
+            logger.error(f"Невірний формат дати: {start if start_key is None else end}")
+            return []
+        
+        return self.snapshot().tasks_due_between(start_key, end_key, pending_only)
+    
+    def overdue(self, now=None):
+        """
+        Прострочені невиконані задачі
+        
+        Задача з датою без часу вважається простроченою після завершення цього дня.
+        
+        :param now: Поточний момент (за замовчуванням - datetime.now())
+        :return: Список задач у порядку дат виконання
+        """
+        return self.snapshot().overdue(due_key(now or datetime.now()))
+    
+    def next_due(self, k=5, now=None):
+        """
+        Найближчі невиконані задачі за датою виконання
+        
+        :param k: Кількість задач
+        :param now: Поточний момент (за замовчуванням - datetime.now())
+        :return: Список задач у порядку дат виконання
+        """
+        return self.snapshot().next_due(due_key(now or datetime.now()), k)
     
     def get_tasks_count(self):
         """
@@ -246,7 +1014,12 @@ class TaskManager:
         
         :return: Загальна кількість задач
         """
-        return len(self.tasks.get('tasks', []))
+        self._refresh()
+        if self._lazy is not None:
+            with self._lock:
+                if self._lazy is not None:
+                    return self._lazy.count
+        return self.snapshot().get_tasks_count()
     
     def get_completed_count(self):
         """
@@ -254,7 +1027,12 @@ class TaskManager:
         
         :return: Кількість виконаних задач
         """
-        return len(self.get_completed_tasks())
+        self._refresh()
+        if self._lazy is not None:
+            with self._lock:
+                if self._lazy is not None:
+                    return self._lazy.completed_count
+        return self.snapshot().get_completed_count()
     
     def get_pending_count(self):
         """
@@ -262,28 +1040,23 @@ class TaskManager:
         
         :return: Кількість невиконаних задач
         """
-        return len(self.get_pending_tasks())
+        self._refresh()
+        if self._lazy is not None:
+            with self._lock:
+                if self._lazy is not None:
+                    return self._lazy.count - self._lazy.completed_count
+        return self.snapshot().get_pending_count()
     
     def get_stats(self):
         """
         Отримання статистики по задачам
         
-        :return: Словник зі статистикою
-        """
-        total = self.get_tasks_count()
-        completed = self.get_completed_count()
-        pending = self.get_pending_count()
-        
-        completion_rate = 0
-        if total > 0:
-            completion_rate = round((completed / total) * 100, 2)
+        Лічильники підтримуються індексами, тому статистика не перебирає задачі.
+        Усі значення обчислюються з одного знімка і узгоджені між собою.
         
-        return {
-            'total': total,
-            'completed': completed,
-            'pending': pending,
-            'completion_rate': completion_rate
-        }
+        :return: Словник зі статистикою, включно з розподілом за категоріями та пріоритетами
+        """
+        return self.snapshot().get_stats()
     
     def clear_completed_tasks(self):
         """
@@ -291,11 +1064,13 @@ class TaskManager:
         
         :return: True, якщо видалення успішне, False - інакше
         """
-        tasks = self.tasks.get('tasks', [])
-        new_tasks = [task for task in tasks if not task.get('completed')]
-        
-        self.tasks['tasks'] = new_tasks
-        return self.save_tasks()
+        self._ensure_loaded()
+        record = {'op': 'clear', 'completed_only': True}
+        with self._lock:
+            if self.backup is not None:
+                self.backup.request(self._published_snapshot())
+            self._apply_record(record)
+            return self._commit(record)
     
     def clear_all_tasks(self):
         """
@@ -303,8 +1078,203 @@ class TaskManager:
         
         :return: True, якщо видалення успішне, False - інакше
         """
-        self.tasks['tasks'] = []
-        return self.save_tasks()
+        self._ensure_loaded()
+        record = {'op': 'clear', 'completed_only': False}
+        with self._lock:
+            # Стан до очищення потрапляє до резервної копії
+            if self.backup is not None:
+                self.backup.request(self._published_snapshot())
+            self._apply_record(record)
+            return self._commit(record)
+    
+    def restore_backup(self, moment=None):
+        """
+        Відновлення задач з резервної копії на вказаний момент
+        
+        Поточний стан спершу потрапляє до резервної копії, тому відновлення
+        можна скасувати. Відновлення записується як звичайна пакетна зміна
+        (очищення та додавання задач) і працює в усіх режимах зберігання.
+        
+        :param moment: Момент часу (datetime або "DD.MM.YYYY HH:MM:SS"); None - остання копія
+        :return: True, якщо відновлення успішне, False - інакше
+        """
+        if self.backup is None:
+            logger.error("Резервне копіювання не налаштовано (backup_dir)")
+            return False
+        
+        data = self.backup.restore_data(moment)
+        if data is None:
+            logger.error("Резервну копію не знайдено")
+            return False
+        
+        self.backup.backup(self.snapshot())
+        with self.batch() as batch:
+            records = [{'op': 'clear', 'completed_only': False}]
+            records.extend({'op': 'add', 'task': task} for task in data.get('tasks', []))
+            for record in records:
+                self._apply_record(record)
+                self._commit(record)
+        
+        if batch.committed:
+            logger.info(f"Відновлено {len(data.get('tasks', []))} задач з резервної копії")
+        return batch.committed
+
+    def import_tasks(self, source, file_format=None):
+        """
+        Потоковий імпорт задач з NDJSON або CSV
+        
+        Файл читається по рядку, дублікати (за назвою, зокрема всередині
+        самого файлу) відкидаються через індекс назв, а всі задачі
+        додаються однією пакетною зміною з одним збереженням. Рядки з
+        невірними типами полів пропускаються і не скасовують імпорт. ID
+        задачам призначаються заново.
+        
+        :param source: Шлях до файлу або відкритий текстовий файл
+        :param file_format: Формат (ndjson, csv; None - за розширенням файлу)
+        :return: Словник {added, skipped, invalid} або None у разі помилки
+        """
+        if file_format is None:
+            file_format = detect_format(source) if isinstance(source, str) else FORMAT_NDJSON
+        
+        added = skipped = invalid = 0
+        self._ensure_loaded()
+        try:
+            f = open(source, 'r', encoding='utf-8', newline='') if isinstance(source, str) else source
+            try:
+                with self.batch() as batch:
+                    now = datetime.now().strftime('%d.%m.%Y %H:%M:%S')
+                    for task in read_tasks(f, file_format):
+                        if task is None:
+                            invalid += 1
+                            continue
+                        if self._find_by_name(task['name']):
+                            skipped += 1
+                            continue
+                        
+                        task.setdefault('created_at', now)
+                        if task['completed']:
+                            task.setdefault('completed_at', task['created_at'])
+                        task['id'] = self._last_id + 1
+                        
+                        record = {'op': 'add', 'task': task}
+                        self._apply_record(record)
+                        self._commit(record)
+                        added += 1
+            finally:
+                if f is not source:
+                    f.close()
+        except (OSError, ValueError) as e:
+            logger.error(f"Помилка імпорту задач: {e}")
+            return None
+        
+        if not batch.committed:
+            return None
+        logger.info(f"Імпортовано {added} задач, пропущено {skipped} дублікатів та {invalid} невірних рядків")
+        return {'added': added, 'skipped': skipped, 'invalid': invalid}
+    
+    def export_tasks(self, target, file_format=None, include_archive=False, **filters):
+        """
+        Потоковий експорт задач у NDJSON або CSV
+        
+        Задачі записуються з одного знімка частинами, без побудови всього
+        файлу в пам'яті.
+        
+        :param target: Шлях до файлу або відкритий текстовий файл
+        :param file_format: Формат (ndjson, csv; None - за розширенням файлу)
+        :param include_archive: Додати задачі з архіву (лише без фільтрів)
+        :param filters: Умови (completed, category, priority, due_date)
+        :return: Кількість записаних задач або None у разі помилки
+        """
+        if file_format is None:
+            file_format = detect_format(target) if isinstance(target, str) else FORMAT_NDJSON
+        
+        tasks = self.snapshot().query_tasks(**filters)
+        if include_archive and self.archive is not None and not filters:
+            tasks = itertools.chain(self.archive.iter_tasks(), tasks)
+        
+        try:
+            if isinstance(target, str):
+                with open(target, 'w', encoding='utf-8', newline='') as f:
+                    return write_tasks(f, tasks, file_format)
+            return write_tasks(target, tasks, file_format)
+        except (OSError, ValueError) as e:
+            logger.error(f"Помилка експорту задач: {e}")
+            return None
+    
+    def archive_completed(self, older_than=None):
+        """
+        Перенесення давно виконаних задач до архіву
+        
+        Задачі вибираються під блокуванням, дописуються до сегментів архіву
+        без нього (стиснення та fsync не затримують інші зміни), а потім
+        видаляються однією пакетною зміною. Задача, змінена під час запису
+        архіву, не видаляється. Після збою між цими кроками задача
+        залишиться і в архіві, і в основному файлі; наступне архівування
+        запише її повторно, а під час читання архіву дублікати відкидаються.
+        
+        :param older_than: Мінімальний вік виконаної задачі в днях (None - archive_after)
+        :return: Кількість перенесених задач
+        """
+        if self.archive is None:
+            logger.error("Архівування не налаштовано (archive_dir)")
+            return 0
+        
+        days = self.archive_after if older_than is None else older_than
+        cutoff = parse_timestamp((datetime.now() - timedelta(days=days)).strftime('%d.%m.%Y %H:%M:%S'))
+        
+        def is_old(task):
+            moment = completion_moment(task)
+            return moment is not None and moment[0] <= cutoff
+        
+        # Перевірка за виконаними задачами не завантажує лінивий файл повністю
+        if not any(is_old(task) for task in self.get_completed_tasks()):
+            return 0
+        
+        self._ensure_loaded()
+        with self._lock:
+            tasks = [self._tasks[task_id] for task_id in self._index.lookup('completed', True)]
+            tasks = [task for task in tasks if is_old(task)]
+        if not tasks or self.archive.append(tasks) is None:
+            return 0
+        
+        with self.batch() as batch:
+            archived = [task for task in tasks if self._tasks.get(task['id']) == task]
+            for task in archived:
+                record = {'op': 'delete', 'id': task['id']}
+                self._apply_record(record)
+                self._commit(record)
+        
+        if not batch.committed:
+            return 0
+        if len(archived) < len(tasks):
+            logger.info(f"Задачі, змінені під час архівування, залишено: {len(tasks) - len(archived)}")
+        logger.info(f"До архіву перенесено {len(archived)} виконаних задач")
+        return len(archived)
+    
+    def get_archived_tasks(self, start=None, end=None):
+        """
+        Архівні задачі за місяцями виконання
+        
+        Сегменти архіву читаються лише під час цього запиту.
+        
+        :param start: Перший місяць "YYYY-MM" (включно; None - з початку)
+        :param end: Останній місяць "YYYY-MM" (включно; None - до кінця)
+        :return: Список задач
+        """
+        if self.archive is None:
+            return []
+        return list(self.archive.iter_tasks(start, end))
+    
+    def get_archived_task(self, task_id):
+        """
+        Архівна задача за ID
+        
+        :param task_id: ID задачі
+        :return: Задача або None
+        """
+        if self.archive is None:
+            return None
+        return self.archive.get_task_by_id(task_id)
 
 
 # Тестова функція для демонстрації роботи
@@ -319,12 +1289,13 @@ def main():
     
     # Відображення всіх задач
     print("Всі задачі:")
-    for i, task in enumerate(task_manager.get_all_tasks()):
+    for task in task_manager.get_all_tasks():
         status = "✅" if task.get('completed') else "❌"
-        print(f"{i}. {status} {task.get('name')} - {task.get('category', 'Без категорії')}")
+        print(f"{task['id']}. {status} {task.get('name')} - {task.get('category', 'Без категорії')}")
     
-    # Позначення задачі як виконаної
-    task_manager.mark_completed(0)
+    # Позначення першої задачі як виконаної
+    first_task = task_manager.get_all_tasks()[0]
+    task_manager.mark_completed(first_task['id'])
     
     # Отримання статистики
     stats = task_manager.get_stats()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import logging
+import tempfile
+import threading
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Політики збереження
+DURABILITY_ALWAYS = 'always'      # Кожна зміна записується одразу
+DURABILITY_GROUP = 'group'        # Зміни, що надійшли протягом вікна, записуються разом
+DURABILITY_INTERVAL = 'interval'  # Накопичені зміни записуються раз на інтервал
+
+DURABILITY_POLICIES = (DURABILITY_ALWAYS, DURABILITY_GROUP, DURABILITY_INTERVAL)
+
+# Параметри за замовчуванням
+COMMIT_WINDOW = 0.05
+COMMIT_INTERVAL = 1.0
+
+
+def write_atomic(path, data):
+    """
+    Атомарний запис файлу: тимчасовий файл + fsync + перейменування
+
+    Після збою на диску залишається або старий, або новий вміст файлу,
+    але ніколи не частково записаний.
+
+    :param path: Шлях до файлу
+    :param data: Вміст файлу (str або bytes)
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Збереження запису про перейменування в каталозі (лише POSIX)
+    if hasattr(os, 'O_DIRECTORY'):
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+
+class PersistScheduler:
+    """
+    Планувальник збереження з об'єднанням записів (group commit)
+
+    Запити на збереження нумеруються. Фоновий потік виконує один запис,
+    що покриває всі запити, які надійшли до його початку, тому серія змін
+    від кількох чатів перетворюється на один запис файлу.
+    """
+
+    def __init__(self, write_fn, policy=DURABILITY_ALWAYS, window=COMMIT_WINDOW, interval=COMMIT_INTERVAL):
+        """
+        Ініціалізація планувальника
+
+        :param write_fn: Функція запису, що повертає True у разі успіху
+        :param policy: Політика збереження (always, group, interval)
+        :param window: Вікно об'єднання записів для політики group (секунди)
+        :param interval: Інтервал запису для політики interval (секунди)
+        """
+        if policy not in DURABILITY_POLICIES:
+            raise ValueError(f"Невідома політика збереження: {policy}")
+
+        self.write_fn = write_fn
+        self.policy = policy
+        self.window = window
+        self.interval = interval
+        self.writes = 0
+        self._write_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._requested = 0
+        self._durable = 0
+        self._urgent = False
+        self._closing = False
+        self._thread = None
+
+        if policy != DURABILITY_ALWAYS:
+            self._thread = threading.Thread(target=self._run, name='task-persist-scheduler')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _write(self):
+        """
+        Виконання одного запису
+
+        :return: True, якщо запис успішний, False - інакше
+        """
+        with self._write_lock:
+            try:
+                ok = self.write_fn()
+            except Exception as e:
+                logger.error(f"Помилка збереження задач: {e}")
+                ok = False
+            self.writes += 1
+            return ok
+
+    def request(self, wait=False):
+        """
+        Запит на збереження поточного стану
+
+        :param wait: Чекати, доки зміни буде записано на диск
+        :return: True, якщо зміни записано (або заплановано без очікування)
+        """
+        if self.policy == DURABILITY_ALWAYS:
+            return self._write()
+
+        with self._cond:
+            self._requested += 1
+            self._cond.notify_all()
+
+        if wait:
+            return self.flush()
+        return True
+
+    def flush(self, timeout=None):
+        """
+        Очікування запису всіх запитаних змін
+
+        :param timeout: Максимальний час очікування в секундах
+        :return: True, якщо всі зміни записано, False - інакше
+        """
+        if self.policy == DURABILITY_ALWAYS:
+            return True
+
+        with self._cond:
+            target = self._requested
+            if self._durable >= target:
+                return True
+
+            self._urgent = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._durable >= target, timeout)
+
+    def _run(self):
+        """Цикл фонового запису"""
+        delay = self.window if self.policy == DURABILITY_GROUP else self.interval
+
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._requested > self._durable or self._closing)
+                if self._requested <= self._durable and self._closing:
+                    return
+
+                # Очікування нових запитів протягом вікна об'єднання
+                if not self._urgent and not self._closing:
+                    self._cond.wait_for(lambda: self._urgent or self._closing, delay)
+
+                target = self._requested
+                self._urgent = False
+
+            ok = self._write()
+
+            with self._cond:
+                if ok:
+                    self._durable = max(self._durable, target)
+                    self._cond.notify_all()
+
+            if not ok:
+                # Повторна спроба після паузи, щоб не навантажувати диск
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closing, delay or COMMIT_WINDOW)
+                    if self._closing:
+                        return
+
+    def close(self, timeout=None):
+        """
+        Запис накопичених змін та зупинка фонового потоку
+
+        :param timeout: Максимальний час очікування в секундах
+        :return: True, якщо всі зміни записано, False - інакше
+        """
+        if self._thread is None:
+            return True
+
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+
+        self._thread.join(timeout)
+        self._thread = None
+
+        with self._cond:
+            return self._durable >= self._requested
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+from datetime import date
+from collections.abc import MutableMapping
+
+# Формат позначок часу задач (created_at, updated_at, completed_at)
+TIMESTAMP_FORMAT = '%d.%m.%Y %H:%M:%S'
+
+# Поля, що зберігаються у слотах (решта - у словнику додаткових полів)
+TASK_FIELDS = ('id', 'name', 'completed', 'due_date', 'priority', 'category', 'created_at', 'updated_at',
+               'completed_at')
+INTERNED_FIELDS = ('priority', 'category')
+TIMESTAMP_FIELDS = ('created_at', 'updated_at', 'completed_at')
+_FIELD_SET = frozenset(TASK_FIELDS)
+
+# Порядковий номер дня 01.01.1970 для перетворення дат у секунди
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Позначка відсутнього поля
+_MISSING = object()
+
+
+def parse_timestamp(value):
+    """
+    Перетворення позначки часу "DD.MM.YYYY HH:MM:SS" у ціле число секунд
+
+    Час зберігається без урахування часового поясу, тому перетворення
+    назад повертає той самий рядок.
+
+    :param value: Рядок позначки часу
+    :return: Ціле число або початкове значення, якщо формат невідомий
+    """
+    if not isinstance(value, str) or len(value) != len('01.01.2000 00:00:00'):
+        return value
+
+    digits = value[0:2] + value[3:5] + value[6:10] + value[11:13] + value[14:16] + value[17:19]
+    separators = value[2] + value[5] + value[10] + value[13] + value[16]
+    if not (digits.isascii() and digits.isdigit()) or separators != '.. ::':
+        return value
+
+    try:
+        day = date(int(value[6:10]), int(value[3:5]), int(value[0:2]))
+    except ValueError:
+        return value
+
+    hour, minute, second = int(value[11:13]), int(value[14:16]), int(value[17:19])
+    if hour > 23 or minute > 59 or second > 59:
+        return value
+    return (day.toordinal() - _EPOCH_ORDINAL) * 86400 + hour * 3600 + minute * 60 + second
+
+
+def format_timestamp(value):
+    """
+    Перетворення цілого числа секунд у рядок "DD.MM.YYYY HH:MM:SS"
+
+    :param value: Ціле число (або рядок, що зберігся без перетворення)
+    :return: Рядок позначки часу
+    """
+    if isinstance(value, int):
+        return time.strftime(TIMESTAMP_FORMAT, time.gmtime(value))
+    return value
+
+
+class Task(MutableMapping):
+    """
+    Компактний запис задачі
+
+    Основні поля зберігаються у слотах замість словника, значення
+    пріоритету та категорії інтернуються, а позначки часу зберігаються
+    цілими числами. Для сумісності запис поводиться як словник:
+    task['name'], task.get('due_date'), task.update(...), dict(task).
+    """
+
+    __slots__ = TASK_FIELDS + ('_extra',)
+
+    def __init__(self, data=None):
+        """
+        Ініціалізація запису
+
+        :param data: Словник з полями задачі
+        """
+        self.id = self.name = self.completed = self.due_date = _MISSING
+        self.priority = self.category = self.created_at = self.updated_at = self.completed_at = _MISSING
+        self._extra = None
+        if data:
+            for key, value in data.items():
+                if key not in _FIELD_SET:
+                    self[key] = value
+                    continue
+                if key in TIMESTAMP_FIELDS:
+                    value = parse_timestamp(value)
+                elif key in INTERNED_FIELDS and isinstance(value, str):
+                    value = sys.intern(value)
+                setattr(self, key, value)
+
+    def __getitem__(self, key):
+        if key in TASK_FIELDS:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            if key in TIMESTAMP_FIELDS:
+                return format_timestamp(value)
+            return value
+
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if value is _MISSING:
+                return default
+            if key in TIMESTAMP_FIELDS:
+                return format_timestamp(value)
+            return value
+
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __setitem__(self, key, value):
+        if key in TASK_FIELDS:
+            if key in INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            elif key in TIMESTAMP_FIELDS:
+                value = parse_timestamp(value)
+            setattr(self, key, value)
+            return
+
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in TASK_FIELDS:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            setattr(self, key, _MISSING)
+            return
+
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+        if not self._extra:
+            self._extra = None
+
+    def __iter__(self):
+        for field in TASK_FIELDS:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        count = sum(1 for field in TASK_FIELDS if getattr(self, field) is not _MISSING)
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __contains__(self, key):
+        if key in TASK_FIELDS:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+    def to_dict(self):
+        """
+        Звичайний словник з полями задачі (для серіалізації)
+
+        :return: Словник
+        """
+        data = {}
+        for field in TASK_FIELDS:
+            value = getattr(self, field)
+            if value is not _MISSING:
+                data[field] = format_timestamp(value) if field in TIMESTAMP_FIELDS else value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def copy(self):
+        """
+        Копія задачі у вигляді словника
+
+        :return: Словник
+        """
+        return self.to_dict()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from src.task_manager import TaskManager
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Каталог файлів задач окремих чатів
+SHARDS_DIR = 'shards'
+
+# Максимальна кількість одночасно відкритих сховищ
+MAX_OPEN_SHARDS = 64
+
+SHARD_SUFFIX = '.json'
+
+
+class _Shard:
+    """Відкрите сховище чату"""
+
+    __slots__ = ('task_manager', 'loaded', 'error', 'pins')
+
+    def __init__(self):
+        self.task_manager = None
+        self.loaded = threading.Event()  # Файл задач завантажено (або сталася помилка)
+        self.error = None
+        self.pins = 0                    # Кількість блоків use(), що зараз використовують сховище
+
+
+class TaskShards:
+    """
+    Сховища задач, розділені за чатами (користувачами)
+
+    Кожен чат має власний файл задач у каталозі сховищ і власний
+    TaskManager, тому зміни одного чату не перезаписують дані інших і не
+    чекають на їхнє блокування. Сховища відкриваються під час першого
+    звернення, а найдавніше використані закриваються, коли кількість
+    відкритих перевищує ліміт (LRU).
+
+    Загальне блокування захищає лише таблицю сховищ: файли завантажуються
+    та записуються під час закриття без нього, тому повільний диск одного
+    чату не затримує інші. Поки сховище завантажується, інші звернення до
+    того ж чату чекають на нього, а поки закривається - не відкривають
+    його повторно.
+    """
+
+    def __init__(self, shards_dir=SHARDS_DIR, max_open=MAX_OPEN_SHARDS, on_close=None, **manager_options):
+        """
+        Ініціалізація сховищ
+
+        :param shards_dir: Каталог файлів задач чатів
+        :param max_open: Максимальна кількість відкритих сховищ
+        :param on_close: Функція, що отримує кожен закритий менеджер задач (наприклад, для очищення кешів)
+        :param manager_options: Параметри TaskManager для кожного сховища (storage, durability тощо);
+                                резервні копії та архів кожного сховища зберігаються
+                                в окремих підкаталогах backup_dir та archive_dir
+        """
+        self.shards_dir = shards_dir
+        self.max_open = max_open
+        self.on_close = on_close
+        self.manager_options = manager_options
+        self._open = OrderedDict()
+        self._closing = {}  # Ключ -> подія завершення закриття сховища
+        self._lock = threading.Lock()
+        os.makedirs(shards_dir, exist_ok=True)
+
+    @staticmethod
+    def shard_key(tenant):
+        """
+        Ключ сховища, придатний для імені файлу
+
+        :param tenant: Ідентифікатор чату або користувача
+        :return: Рядок
+        """
+        return re.sub(r'[^0-9A-Za-z_.-]', '_', str(tenant))
+
+    def shard_file(self, tenant):
+        """
+        Шлях до файлу задач чату
+
+        :param tenant: Ідентифікатор чату або користувача
+        :return: Шлях до файлу
+        """
+        return os.path.join(self.shards_dir, self.shard_key(tenant) + SHARD_SUFFIX)
+
+    def _open_manager(self, key, tenant):
+        """
+        Створення менеджера задач чату (без блокування)
+
+        :param key: Ключ сховища
+        :param tenant: Ідентифікатор чату або користувача
+        :return: TaskManager
+        """
+        options = dict(self.manager_options)
+        for option in ('backup_dir', 'archive_dir'):
+            if options.get(option):
+                options[option] = os.path.join(options[option], key)
+        return TaskManager(self.shard_file(tenant), **options)
+
+    @contextmanager
+    def use(self, tenant):
+        """
+        Менеджер задач чату на час виконання блоку
+
+        Поки блок виконується, сховище не буде закрите під час витіснення.
+
+        Приклад:
+            with shards.use(chat_id) as task_manager:
+                task_manager.add_task("Задача")
+
+        :param tenant: Ідентифікатор чату або користувача
+        :return: TaskManager
+        """
+        key = self.shard_key(tenant)
+
+        while True:
+            with self._lock:
+                closing = self._closing.get(key)
+                if closing is None:
+                    shard = self._open.get(key)
+                    load = shard is None
+                    if load:
+                        shard = self._open[key] = _Shard()
+                    else:
+                        self._open.move_to_end(key)
+                    shard.pins += 1
+                    evicted = self._evict()
+                    break
+            # Попередній менеджер цього чату ще записує зміни
+            closing.wait()
+
+        self._close_shards(evicted)
+
+        if load:
+            try:
+                shard.task_manager = self._open_manager(key, tenant)
+            except Exception as e:
+                shard.error = e
+            finally:
+                shard.loaded.set()
+        else:
+            shard.loaded.wait()
+
+        try:
+            if shard.error is not None:
+                raise shard.error
+            yield shard.task_manager
+        finally:
+            with self._lock:
+                shard.pins -= 1
+                if shard.error is not None and self._open.get(key) is shard:
+                    del self._open[key]
+                evicted = self._evict()
+            self._close_shards(evicted)
+
+    def _evict(self):
+        """
+        Вибір найдавніше використаних сховищ понад ліміт (під блокуванням)
+
+        Сховища, що зараз використовуються або завантажуються,
+        пропускаються. Вибрані сховища видаляються з таблиці та
+        позначаються як такі, що закриваються, тому до завершення
+        _close_shards їх не буде відкрито повторно.
+
+        :return: Список пар (ключ, сховище) для _close_shards
+        """
+        excess = len(self._open) - self.max_open
+        if excess <= 0:
+            return []
+
+        evicted = []
+        for key, shard in list(self._open.items()):
+            if excess <= 0:
+                break
+            if shard.pins:
+                continue
+            del self._open[key]
+            self._closing[key] = threading.Event()
+            evicted.append((key, shard))
+            excess -= 1
+        return evicted
+
+    def _close_shards(self, evicted):
+        """
+        Закриття витіснених сховищ (без блокування, запис накопичених змін)
+
+        :param evicted: Список пар (ключ, сховище) з _evict
+        """
+        for key, shard in evicted:
+            try:
+                self._close_manager(shard.task_manager)
+            finally:
+                with self._lock:
+                    self._closing.pop(key).set()
+
+    def _close_manager(self, task_manager):
+        """
+        Закриття менеджера задач
+
+        :param task_manager: Менеджер задач (None, якщо сховище не завантажилось)
+        """
+        if task_manager is None:
+            return
+        try:
+            task_manager.close()
+        except Exception as e:
+            logger.error(f"Помилка закриття сховища задач {task_manager.tasks_file}: {e}")
+        if self.on_close is not None:
+            self.on_close(task_manager)
+
+    def tenants(self):
+        """
+        Ключі всіх наявних сховищ (включно з закритими)
+
+        :return: Відсортований список ключів
+        """
+        keys = set(self._open)
+        for filename in os.listdir(self.shards_dir):
+            if filename.endswith(SHARD_SUFFIX):
+                keys.add(filename[:-len(SHARD_SUFFIX)])
+        return sorted(keys)
+
+    def open_count(self):
+        """
+        Кількість відкритих сховищ
+
+        :return: Кількість
+        """
+        return len(self._open)
+
+    def close(self):
+        """Закриття всіх відкритих сховищ"""
+        with self._lock:
+            shards = list(self._open.values())
+            self._open.clear()
+        for shard in shards:
+            shard.loaded.wait()
+            self._close_manager(shard.task_manager)
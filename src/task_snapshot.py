@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from bisect import bisect_left, bisect_right
+from src.task_index import INDEXED_FIELDS, TaskIndex
+
+# Порядки сортування для посторінкового перегляду
+SORT_ID = 'id'              # У порядку створення
+SORT_ID_DESC = '-id'        # Спершу нові
+SORT_DUE_DATE = 'due_date'  # За датою виконання, задачі без дати - в кінці
+SORT_ORDERS = (SORT_ID, SORT_ID_DESC, SORT_DUE_DATE)
+
+# Напрямки курсора: сторінка після або перед вказаною позицією
+CURSOR_NEXT = '>'
+CURSOR_PREV = '<'
+
+
+class TaskSnapshot:
+    """
+    Незмінний знімок стану задач
+
+    TaskManager публікує новий знімок під час першого читання після змін.
+    Структури знімка (словник задач та індекси) більше не змінюються:
+    наступна зміна працює з їхніми копіями (індекси копіюють кошики лише
+    під час першої зміни кожного), а змінені задачі замінює новими
+    об'єктами. Тому всі запити до одного знімка узгоджені між собою і не
+    чекають на запис.
+
+    Повернені задачі спільні для всіх читачів і не повинні змінюватися.
+    """
+
+    def __init__(self, version, tasks, meta, last_id, name_index, index, due_index, text_index, name_key):
+        """
+        Ініціалізація знімка
+
+        :param version: Версія стану задач
+        :param tasks: Словник "ID -> задача"
+        :param meta: Метадані файлу задач
+        :param last_id: Останній виданий ID
+        :param name_index: Індекс назв
+        :param index: Вторинні індекси (TaskIndex)
+        :param due_index: Індекс дат виконання (DueDateIndex)
+        :param text_index: Повнотекстовий індекс (TextIndex)
+        :param name_key: Функція ключа індексу назв
+        """
+        self.version = version
+        self.tasks = tasks
+        self.meta = meta
+        self.last_id = last_id
+        self.name_index = name_index
+        self.index = index
+        self.due_index = due_index
+        self.text_index = text_index
+        self._name_key = name_key
+
+    def _tasks_for(self, task_ids):
+        """
+        Задачі за списком ID
+
+        :param task_ids: ID задач з індексу
+        :return: Список задач
+        """
+        tasks = self.tasks
+        return [tasks[task_id] for task_id in task_ids]
+
+    def get_all_tasks(self):
+        """
+        Усі задачі
+
+        :return: Список задач
+        """
+        return list(self.tasks.values())
+
+    def get_task_by_id(self, task_id):
+        """
+        Задача за ID
+
+        :param task_id: ID задачі
+        :return: Задача або None
+        """
+        return self.tasks.get(task_id)
+
+    def get_task_by_name(self, name):
+        """
+        Задача за назвою
+
+        :param name: Назва задачі
+        :return: Задача або None
+        """
+        return self.name_index.get(self._name_key(name))
+
+    def get_completed_tasks(self):
+        """
+        Виконані задачі
+
+        :return: Список задач
+        """
+        return self._tasks_for(self.index.lookup('completed', True))
+
+    def get_pending_tasks(self):
+        """
+        Невиконані задачі
+
+        :return: Список задач
+        """
+        return self._tasks_for(self.index.lookup('completed', False))
+
+    def filter_tasks(self, field, value):
+        """
+        Задачі з вказаним значенням індексованого поля
+
+        :param field: Назва поля (completed, category, priority, due_date)
+        :param value: Значення поля
+        :return: Список задач
+        """
+        return self._tasks_for(self.index.lookup(field, value))
+
+    def query_tasks(self, **criteria):
+        """
+        Складений запит до задач
+
+        :param criteria: Умови (completed, category, priority, due_date)
+        :return: Список задач, що задовольняють усі умови
+        """
+        if not criteria:
+            return self.get_all_tasks()
+        return self._tasks_for(self.index.query(**criteria))
+
+    def search_tasks(self, query, limit=None):
+        """
+        Задачі, назва або категорія яких містить усі слова запиту (як префікси)
+
+        :param query: Слова для пошуку
+        :param limit: Максимальна кількість задач (None - усі)
+        :return: Список задач у порядку створення
+        """
+        return self._tasks_for(self.text_index.search(query, limit))
+
+    def list_tasks(self, cursor=None, limit=20, sort=SORT_ID, **filters):
+        """
+        Сторінка задач для посторінкового перегляду
+
+        Задачі перебираються з відсортованого індексу від позиції курсора,
+        тому сторінка будується за O(log n + розмір сторінки). Якщо вказано
+        кілька фільтрів, перебирається найменший кошик, а решта умов
+        перевіряється для кожної задачі.
+
+        :param cursor: Курсор next_cursor або prev_cursor попередньої сторінки (None - перша сторінка)
+        :param limit: Кількість задач на сторінці
+        :param sort: Порядок (id, -id, due_date)
+        :param filters: Умови (completed, category, priority, due_date)
+        :return: Словник {tasks, next_cursor, prev_cursor}; курсор None, якщо сторінки немає
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"Невідомий порядок сортування: {sort}")
+        for field in filters:
+            if field not in INDEXED_FIELDS:
+                raise ValueError(f"Поле '{field}' не індексується")
+
+        checks = dict(filters)
+        if sort == SORT_DUE_DATE:
+            pending_only = 'completed' in checks and not checks['completed']
+            entries = self.due_index.entries(pending_only)
+            if pending_only:
+                del checks['completed']
+        elif filters:
+            field = min(filters, key=lambda name: self.index.count(name, filters[name]))
+            entries = self.index.lookup(field, checks.pop(field))
+        else:
+            entries = self.index.keys()
+
+        step = -1 if sort == SORT_ID_DESC else 1
+        position = self._parse_cursor(cursor, sort)
+
+        if position is not None and cursor[0] == CURSOR_PREV:
+            items = self._scan(entries, position, -step, limit + 1, checks)
+            if len(items) > limit:
+                items = items[:limit]
+                items.reverse()
+                return self._page(items, sort, has_prev=True, has_next=True)
+            # Попередніх задач менше за сторінку - показується перша сторінка
+            position = None
+
+        items = self._scan(entries, position, step, limit + 1, checks)
+        return self._page(items[:limit], sort, has_prev=position is not None, has_next=len(items) > limit)
+
+    def _scan(self, entries, position, step, count, checks):
+        """
+        Перебір відсортованого індексу від позиції курсора
+
+        :param entries: Відсортований список ID або пар (ключ дати, ID)
+        :param position: Позиція курсора (ID або пара; сама позиція не включається) або None - з початку
+        :param step: Напрямок перебору списку (1 або -1)
+        :param count: Кількість задач, яку потрібно зібрати
+        :param checks: Умови, що перевіряються для кожної задачі
+        :return: Список пар (запис індексу, задача) у порядку перебору
+        """
+        if position is None:
+            index = 0 if step > 0 else len(entries) - 1
+        elif step > 0:
+            index = bisect_right(entries, position)
+        else:
+            index = bisect_left(entries, position) - 1
+
+        tasks = self.tasks
+        items = []
+        while 0 <= index < len(entries) and len(items) < count:
+            entry = entries[index]
+            task = tasks[entry[1] if isinstance(entry, tuple) else entry]
+            if all(TaskIndex.field_value(task, field) == (bool(value) if field == 'completed' else value)
+                   for field, value in checks.items()):
+                items.append((entry, task))
+            index += step
+        return items
+
+    @staticmethod
+    def _parse_cursor(cursor, sort):
+        """
+        Позиція в індексі за курсором
+
+        :param cursor: Курсор сторінки
+        :param sort: Порядок сортування
+        :return: ID, пара (ключ дати, ID) або None
+        """
+        if not cursor:
+            return None
+        try:
+            if cursor[0] not in (CURSOR_NEXT, CURSOR_PREV):
+                raise ValueError(cursor)
+            if sort == SORT_DUE_DATE:
+                due, task_id = cursor[1:].split('.')
+                return (int(due), int(task_id))
+            return int(cursor[1:])
+        except ValueError:
+            raise ValueError(f"Невірний курсор: {cursor}")
+
+    @staticmethod
+    def _page(items, sort, has_prev, has_next):
+        """
+        Сторінка задач з курсорами сусідніх сторінок
+
+        :param items: Пари (запис індексу, задача) у порядку сторінки
+        :param sort: Порядок сортування
+        :param has_prev: Чи є попередня сторінка
+        :param has_next: Чи є наступна сторінка
+        :return: Словник {tasks, next_cursor, prev_cursor}
+        """
+        def encode(entry):
+            if sort == SORT_DUE_DATE:
+                return f"{entry[0]}.{entry[1]}"
+            return str(entry)
+
+        return {
+            'tasks': [task for _, task in items],
+            'next_cursor': CURSOR_NEXT + encode(items[-1][0]) if items and has_next else None,
+            'prev_cursor': CURSOR_PREV + encode(items[0][0]) if items and has_prev else None
+        }
+
+    def tasks_due_between(self, start_key, end_key, pending_only=False):
+        """
+        Задачі з ключем дати виконання в діапазоні (межі включно)
+
+        :param start_key: Нижня межа (ключ дати або None)
+        :param end_key: Верхня межа (ключ дати або None)
+        :param pending_only: Лише невиконані задачі
+        :return: Список задач у порядку дат виконання
+        """
+        return self._tasks_for(self.due_index.between(start_key, end_key, pending_only))
+
+    def overdue(self, moment):
+        """
+        Невиконані задачі з терміном раніше вказаного моменту
+
+        :param moment: Ключ дати
+        :return: Список задач у порядку дат виконання
+        """
+        return self._tasks_for(self.due_index.before(moment))
+
+    def next_due(self, moment, k):
+        """
+        Найближчі невиконані задачі, починаючи з вказаного моменту
+
+        :param moment: Ключ дати
+        :param k: Кількість задач
+        :return: Список задач у порядку дат виконання
+        """
+        return self._tasks_for(self.due_index.next_after(moment, k))
+
+    def get_tasks_count(self):
+        """
+        Кількість задач
+
+        :return: Кількість
+        """
+        return len(self.tasks)
+
+    def get_completed_count(self):
+        """
+        Кількість виконаних задач
+
+        :return: Кількість
+        """
+        return self.index.count('completed', True)
+
+    def get_pending_count(self):
+        """
+        Кількість невиконаних задач
+
+        :return: Кількість
+        """
+        return self.index.count('completed', False)
+
+    def get_stats(self):
+        """
+        Статистика по задачам
+
+        :return: Словник зі статистикою, включно з розподілом за категоріями та пріоритетами
+        """
+        total = self.get_tasks_count()
+        completed = self.get_completed_count()
+
+        completion_rate = 0
+        if total > 0:
+            completion_rate = round((completed / total) * 100, 2)
+
+        return {
+            'total': total,
+            'completed': completed,
+            'pending': total - completed,
+            'completion_rate': completion_rate,
+            'by_category': self.index.breakdown('category'),
+            'by_priority': self.index.breakdown('priority')
+        }
+
+
+def _read_throughput(task_manager, readers, duration):
+    """
+    Пропускна здатність читання під час безперервних змін
+
+    Один потік перемикає стан виконання задач, а readers потоків читають
+    статистику та списки виконаних і невиконаних задач з одного знімка.
+
+    :param task_manager: TaskManager з задачами
+    :param readers: Кількість потоків читання
+    :param duration: Тривалість вимірювання в секундах
+    :return: Кортеж (читань за секунду, кількість неузгоджених читань)
+    """
+    task_ids = [task['id'] for task in task_manager.get_all_tasks()]
+    stop = threading.Event()
+    counts = []
+
+    def write():
+        position = 0
+        while not stop.is_set():
+            task_id = task_ids[position % len(task_ids)]
+            task_manager.mark_completed(task_id, not task_manager.get_task_by_id(task_id)['completed'])
+            position += 1
+
+    def read():
+        reads = torn = 0
+        while not stop.is_set():
+            snapshot = task_manager.snapshot()
+            stats = snapshot.get_stats()
+            completed = snapshot.get_completed_tasks()
+            pending = snapshot.get_pending_tasks()
+            if len(completed) != stats['completed'] or len(completed) + len(pending) != stats['total']:
+                torn += 1
+            reads += 1
+        counts.append((reads, torn))
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return sum(reads for reads, _ in counts) / duration, sum(torn for _, torn in counts)
+
+
+def main():
+    """Пропускна здатність читання знімків для 1, 2, 4 та 8 потоків під час безперервного запису"""
+    import os
+    import sys
+    import tempfile
+    from src.task_manager import TaskManager
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    with tempfile.TemporaryDirectory() as directory:
+        task_manager = TaskManager(os.path.join(directory, 'tasks.json'))
+        with task_manager.batch():
+            for number in range(count):
+                task_manager.add_task(f"Задача {number}", completed=number % 3 == 0,
+                                      category=f"Категорія {number % 10}", priority=number % 4)
+
+        print(f"Задач: {count}, один потік запису (durability=always), {duration:g} с на вимірювання")
+        print("Потоків читання   Читань/с   Неузгоджених")
+        for readers in (1, 2, 4, 8):
+            rate, torn = _read_throughput(task_manager, readers, duration)
+            print(f"{readers:>16}   {rate:>8.0f}   {torn:>12}")
+        task_manager.close()
+
+
+if __name__ == "__main__":
+    main()
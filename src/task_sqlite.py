@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Шляхи до файлів бази даних та старого JSON сховища
+DB_FILE = 'tasks.db'
+TASKS_FILE = 'tasks.json'
+
+# Поля задачі, що зберігаються в окремих колонках
+TASK_COLUMNS = ['id', 'name', 'completed', 'due_date', 'priority', 'category', 'created_at', 'updated_at']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    due_date TEXT,
+    priority TEXT,
+    category TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Назви задач унікальні, як і в TaskManager
+NAME_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_name ON tasks(name)"
+
+
+class SQLiteTaskManager:
+    """
+    Менеджер задач з зберіганням у SQLite
+
+    Повторює публічний інтерфейс TaskManager, але фільтри виконуються
+    через індекси, а кожна зміна зачіпає лише один рядок таблиці.
+    Стабільним ID задачі є первинний ключ таблиці, а унікальність назв
+    забезпечує унікальний індекс.
+    """
+
+    def __init__(self, db_file=DB_FILE, json_file=None):
+        """
+        Ініціалізація менеджера задач
+
+        :param db_file: Шлях до файлу бази даних
+        :param json_file: Файл задач у форматі JSON для одноразової міграції
+        """
+        self.db_file = db_file
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+        self._ensure_unique_names()
+
+        if json_file:
+            self.migrate_from_json(json_file)
+
+    def _ensure_unique_names(self):
+        """Заміна неунікального індексу назв з попередніх версій схеми на унікальний"""
+        with self._lock:
+            for row in self.conn.execute("PRAGMA index_list(tasks)").fetchall():
+                if row['name'] == 'idx_tasks_name' and row['unique']:
+                    return
+
+            try:
+                with self.conn:
+                    self.conn.execute("DROP INDEX IF EXISTS idx_tasks_name")
+                    self.conn.execute(NAME_INDEX)
+            except sqlite3.IntegrityError as e:
+                # Дублікати у старій базі: залишається звичайний індекс, нові дублікати відсікає перевірка назви
+                logger.error(f"Назви задач у {self.db_file} не унікальні: {e}")
+                with self.conn:
+                    self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_name ON tasks(name)")
+
+    def close(self):
+        """Закриття з'єднання з базою даних"""
+        with self._lock:
+            self.conn.close()
+
+    def _row_to_task(self, row):
+        """
+        Перетворення рядка таблиці у словник задачі (формат tasks.json)
+
+        :param row: Рядок таблиці
+        :return: Словник задачі
+        """
+        task = {
+            'id': row['id'],
+            'name': row['name'],
+            'completed': bool(row['completed']),
+        }
+
+        if row['created_at']:
+            task['created_at'] = row['created_at']
+
+        for key in ['due_date', 'priority', 'category', 'updated_at']:
+            if row[key] is not None:
+                task[key] = row[key]
+
+        if row['extra']:
+            task.update(json.loads(row['extra']))
+
+        return task
+
+    def _task_to_row(self, task):
+        """
+        Перетворення словника задачі у значення колонок
+
+        :param task: Словник задачі
+        :return: Кортеж значень у порядку TASK_COLUMNS + extra (id None - призначить база)
+        """
+        extra = {key: value for key, value in task.items() if key not in TASK_COLUMNS}
+        return (
+            task.get('id'),
+            task.get('name'),
+            1 if task.get('completed') else 0,
+            task.get('due_date'),
+            task.get('priority'),
+            task.get('category'),
+            task.get('created_at'),
+            task.get('updated_at'),
+            json.dumps(extra, ensure_ascii=False) if extra else None
+        )
+
+    def _query(self, where='', params=()):
+        """
+        Вибірка задач з бази даних
+
+        :param where: Умова SQL (без ключового слова WHERE)
+        :param params: Параметри умови
+        :return: Список задач
+        """
+        sql = "SELECT * FROM tasks"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._row_to_task(row) for row in rows]
+
+    def migrate_from_json(self, json_file=TASKS_FILE):
+        """
+        Одноразова міграція задач з файлу tasks.json
+
+        Повторний виклик для того самого файлу нічого не змінює.
+
+        :param json_file: Шлях до файлу задач у форматі JSON
+        :return: Кількість перенесених задач або -1 у разі помилки
+        """
+        if not os.path.exists(json_file):
+            return 0
+
+        source = os.path.abspath(json_file)
+
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated_from'").fetchone()
+            if row and row['value'] == source:
+                return 0
+
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                tasks = data.get('tasks', [])
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT INTO tasks (id, name, completed, due_date, priority, category, "
+                        "created_at, updated_at, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [self._task_to_row(task) for task in tasks]
+                    )
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)", (source,)
+                    )
+            except Exception as e:
+                logger.error(f"Помилка міграції задач з {json_file}: {e}")
+                return -1
+
+        logger.info(f"Перенесено {len(tasks)} задач з {json_file} до {self.db_file}")
+        return len(tasks)
+
+    def get_all_tasks(self):
+        """
+        Отримання всіх задач
+
+        :return: Список всіх задач
+        """
+        return self._query()
+
+    def get_task_by_id(self, task_id):
+        """
+        Отримання задачі за ID
+
+        :param task_id: ID задачі
+        :return: Задача або None, якщо задачу не знайдено
+        """
+        tasks = self._query("id = ?", (task_id,))
+        return tasks[0] if tasks else None
+
+    def get_task_by_name(self, name):
+        """
+        Отримання задачі за назвою
+
+        :param name: Назва задачі
+        :return: Задача або None, якщо задачу не знайдено
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM tasks WHERE name = ? ORDER BY id LIMIT 1", (name,)
+            ).fetchone()
+        return self._row_to_task(row) if row else None
+
+    def add_task(self, name, completed=False, due_date=None, priority=None, category=None):
+        """
+        Додавання нової задачі
+
+        :param name: Назва задачі
+        :param completed: Статус виконання
+        :param due_date: Дата виконання (формат: "DD.MM.YYYY")
+        :param priority: Пріоритет задачі (high, medium, low)
+        :param category: Категорія задачі
+        :return: True, якщо додавання успішне, False - інакше
+        """
+        if not name:
+            logger.error("Назва задачі не може бути пустою")
+            return False
+
+        created_at = datetime.now().strftime('%d.%m.%Y %H:%M:%S')
+        new_task = {
+            'name': name,
+            'completed': completed,
+            'created_at': created_at,
+            'due_date': due_date,
+            'priority': priority,
+            'category': category
+        }
+        if completed:
+            new_task['completed_at'] = created_at
+
+        try:
+            with self._lock:
+                # Перевірка на дублікати
+                if self.get_task_by_name(name):
+                    logger.warning(f"Задача з назвою '{name}' вже існує")
+                    return False
+
+                with self.conn:
+                    self.conn.execute(
+                        "INSERT INTO tasks (id, name, completed, due_date, priority, category, "
+                        "created_at, updated_at, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        self._task_to_row(new_task)
+                    )
+            return True
+        except sqlite3.IntegrityError:
+            logger.warning(f"Задача з назвою '{name}' вже існує")
+            return False
+        except sqlite3.Error as e:
+            logger.error(f"Помилка збереження задачі: {e}")
+            return False
+
+    def update_task(self, task_id, **kwargs):
+        """
+        Оновлення існуючої задачі
+
+        :param task_id: ID задачі
+        :param kwargs: Поля для оновлення (name, completed, due_date, priority, category)
+        :return: True, якщо оновлення успішне, False - інакше
+        """
+        fields = {}
+        for key, value in kwargs.items():
+            if key in ['name', 'completed', 'due_date', 'priority', 'category']:
+                fields[key] = (1 if value else 0) if key == 'completed' else value
+
+        now = datetime.now().strftime('%d.%m.%Y %H:%M:%S')
+        fields['updated_at'] = now
+
+        try:
+            with self._lock:
+                task = self.get_task_by_id(task_id)
+                if task is None:
+                    logger.error(f"Задачу з ID {task_id} не знайдено")
+                    return False
+
+                # Перейменування не повинно створювати дублікатів
+                new_name = fields.get('name')
+                if new_name is not None:
+                    existing_task = self.get_task_by_name(new_name)
+                    if existing_task is not None and existing_task['id'] != task_id:
+                        logger.warning(f"Задача з назвою '{new_name}' вже існує")
+                        return False
+
+                # Час виконання змінюється разом зі статусом, як у TaskManager
+                if 'completed' in fields and bool(fields['completed']) != task['completed']:
+                    task['completed_at'] = now if fields['completed'] else None
+                    fields['extra'] = self._task_to_row(task)[-1]
+
+                assignments = ', '.join(f"{key} = ?" for key in fields)
+                with self.conn:
+                    self.conn.execute(
+                        f"UPDATE tasks SET {assignments} WHERE id = ?",
+                        list(fields.values()) + [task_id]
+                    )
+            return True
+        except sqlite3.IntegrityError:
+            logger.warning(f"Задача з назвою '{fields.get('name')}' вже існує")
+            return False
+        except sqlite3.Error as e:
+            logger.error(f"Помилка збереження задачі: {e}")
+            return False
+
+    def delete_task(self, task_id):
+        """
+        Видалення задачі
+
+        :param task_id: ID задачі
+        :return: True, якщо видалення успішне, False - інакше
+        """
+        try:
+            with self._lock, self.conn:
+                cursor = self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            if not cursor.rowcount:
+                logger.error(f"Задачу з ID {task_id} не знайдено")
+                return False
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Помилка видалення задачі: {e}")
+            return False
+
+    def mark_completed(self, task_id, completed=True):
+        """
+        Позначення задачі як виконаної/невиконаної
+
+        :param task_id: ID задачі
+        :param completed: Статус виконання
+        :return: True, якщо оновлення успішне, False - інакше
+        """
+        return self.update_task(task_id, completed=completed)
+
+    def get_completed_tasks(self):
+        """
+        Отримання виконаних задач
+
+        :return: Список виконаних задач
+        """
+        return self._query("completed = 1")
+
+    def get_pending_tasks(self):
+        """
+        Отримання невиконаних задач
+
+        :return: Список невиконаних задач
+        """
+        return self._query("completed = 0")
+
+    def filter_tasks_by_category(self, category):
+        """
+        Фільтрація задач за категорією
+
+        :param category: Категорія для фільтрації
+        :return: Список задач у вказаній категорії
+        """
+        return self._query("category = ?", (category,))
+
+    def filter_tasks_by_priority(self, priority):
+        """
+        Фільтрація задач за пріоритетом
+
+        :param priority: Пріоритет для фільтрації
+        :return: Список задач з вказаним пріоритетом
+        """
+        return self._query("priority = ?", (priority,))
+
+    def filter_tasks_by_due_date(self, due_date):
+        """
+        Фільтрація задач за датою виконання
+
+        :param due_date: Дата для фільтрації (формат: "DD.MM.YYYY")
+        :return: Список задач з вказаною датою виконання
+        """
+        return self._query("due_date = ?", (due_date,))
+
+    def _count(self, where='', params=()):
+        """
+        Підрахунок задач без їх вибірки
+
+        :param where: Умова SQL (без ключового слова WHERE)
+        :param params: Параметри умови
+        :return: Кількість задач
+        """
+        sql = "SELECT COUNT(*) FROM tasks"
+        if where:
+            sql += f" WHERE {where}"
+
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()[0]
+
+    def get_tasks_count(self):
+        """
+        Отримання кількості задач
+
+        :return: Загальна кількість задач
+        """
+        return self._count()
+
+    def get_completed_count(self):
+        """
+        Отримання кількості виконаних задач
+
+        :return: Кількість виконаних задач
+        """
+        return self._count("completed = 1")
+
+    def get_pending_count(self):
+        """
+        Отримання кількості невиконаних задач
+
+        :return: Кількість невиконаних задач
+        """
+        return self._count("completed = 0")
+
+    def _breakdown(self, column):
+        """
+        Розподіл задач за значеннями колонки
+
+        :param column: Назва колонки (category, priority)
+        :return: Словник "значення -> {total, completed, pending}"
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {column} AS value, COUNT(*) AS total, SUM(completed) AS completed "
+                f"FROM tasks GROUP BY {column}"
+            ).fetchall()
+
+        return {
+            row['value']: {
+                'total': row['total'],
+                'completed': row['completed'],
+                'pending': row['total'] - row['completed']
+            }
+            for row in rows
+        }
+
+    def get_stats(self):
+        """
+        Отримання статистики по задачам
+
+        :return: Словник зі статистикою, включно з розподілом за категоріями та пріоритетами
+        """
+        total = self.get_tasks_count()
+        completed = self.get_completed_count()
+        pending = total - completed
+
+        completion_rate = 0
+        if total > 0:
+            completion_rate = round((completed / total) * 100, 2)
+
+        return {
+            'total': total,
+            'completed': completed,
+            'pending': pending,
+            'completion_rate': completion_rate,
+            'by_category': self._breakdown('category'),
+            'by_priority': self._breakdown('priority')
+        }
+
+    def clear_completed_tasks(self):
+        """
+        Видалення всіх виконаних задач
+
+        :return: True, якщо видалення успішне, False - інакше
+        """
+        try:
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM tasks WHERE completed = 1")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Помилка видалення задач: {e}")
+            return False
+
+    def clear_all_tasks(self):
+        """
+        Видалення всіх задач
+
+        :return: True, якщо видалення успішне, False - інакше
+        """
+        try:
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM tasks")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Помилка видалення задач: {e}")
+            return False
+
+
+# Одноразова міграція з tasks.json
+def main():
+    """Міграція задач з JSON файлу до бази даних SQLite"""
+    import sys
+
+    json_file = sys.argv[1] if len(sys.argv) > 1 else TASKS_FILE
+    db_file = sys.argv[2] if len(sys.argv) > 2 else DB_FILE
+
+    task_manager = SQLiteTaskManager(db_file)
+    migrated = task_manager.migrate_from_json(json_file)
+
+    if migrated < 0:
+        print("Помилка міграції")
+        sys.exit(1)
+
+    stats = task_manager.get_stats()
+    print(f"Перенесено {migrated} задач. У базі: {stats['total']} задач, виконано {stats['completed']}")
+    task_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import csv
+import sys
+import json
+import logging
+from src.task_index import due_key
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Формати імпорту та експорту
+FORMAT_NDJSON = 'ndjson'  # Одна задача JSON на рядок
+FORMAT_CSV = 'csv'
+TRANSFER_FORMATS = (FORMAT_NDJSON, FORMAT_CSV)
+
+# Розширення файлів для визначення формату
+FORMAT_EXTENSIONS = {
+    '.ndjson': FORMAT_NDJSON,
+    '.jsonl': FORMAT_NDJSON,
+    '.csv': FORMAT_CSV
+}
+
+# Колонки CSV (інші поля задач у CSV не експортуються)
+CSV_FIELDS = ('id', 'name', 'completed', 'due_date', 'priority', 'category',
+              'created_at', 'updated_at', 'completed_at')
+
+# Поля, що приймаються під час імпорту (ID призначаються заново)
+IMPORT_FIELDS = CSV_FIELDS[1:]
+
+# Поля, що мають бути рядками
+STRING_FIELDS = ('name', 'category', 'created_at', 'updated_at', 'completed_at')
+
+# Рядкові значення completed (без урахування регістру)
+COMPLETED_VALUES = {'true': True, 'false': False, '1': True, '0': False}
+
+# Кількість рядків, що записуються за раз
+CHUNK_SIZE = 1000
+
+
+def detect_format(path, default=FORMAT_NDJSON):
+    """
+    Формат файлу за розширенням
+
+    :param path: Шлях до файлу
+    :param default: Формат для невідомого розширення
+    :return: Формат (ndjson, csv)
+    """
+    return FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), default)
+
+
+def _csv_row(row):
+    """
+    Поля задачі з рядка CSV
+
+    :param row: Словник рядка CSV
+    :return: Словник полів (порожні значення пропускаються)
+    """
+    return {field: value for field, value in row.items()
+            if field is not None and value is not None and value != ''}
+
+
+def parse_completed(value):
+    """
+    Строгий розбір ознаки виконання
+
+    :param value: true/false, 1/0 або рядки "true", "false", "1", "0"
+    :return: True або False
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in COMPLETED_VALUES:
+        return COMPLETED_VALUES[value.strip().lower()]
+    raise ValueError(f"невірне значення completed: {value!r}")
+
+
+def validate_task(row):
+    """
+    Перевірка та нормалізація полів задачі для імпорту
+
+    :param row: Словник полів з файлу
+    :return: Задача з полями IMPORT_FIELDS
+    """
+    task = {field: row[field] for field in IMPORT_FIELDS if row.get(field) is not None}
+
+    for field in STRING_FIELDS:
+        if field in task and not isinstance(task[field], str):
+            raise ValueError(f"поле {field} має бути рядком")
+    if not task.get('name', '').strip():
+        raise ValueError("задача без назви")
+
+    priority = task.get('priority')
+    if priority is not None and (isinstance(priority, bool) or not isinstance(priority, (int, str))):
+        raise ValueError("поле priority має бути рядком або числом")
+
+    due_date = task.get('due_date')
+    if due_date is not None and (not isinstance(due_date, str) or due_key(due_date) is None):
+        raise ValueError(f"невірна дата виконання: {due_date!r}")
+
+    task['completed'] = parse_completed(task.get('completed', False))
+    return task
+
+
+def read_tasks(f, file_format):
+    """
+    Потокове читання задач
+
+    Рядки читаються по одному, тому пам'ять не залежить від розміру файлу.
+    Кожен рядок перевіряється (validate_task); замість невірних рядків
+    повертається None з попередженням у журналі.
+
+    :param f: Текстовий файл (для CSV відкритий з newline='')
+    :param file_format: Формат (ndjson, csv)
+    :return: Генератор задач (None для невірних рядків)
+    """
+    if file_format == FORMAT_CSV:
+        rows = ((line_number, _csv_row(row)) for line_number, row in enumerate(csv.DictReader(f), 2))
+    else:
+        rows = _ndjson_rows(f)
+
+    for line_number, row in rows:
+        try:
+            if not isinstance(row, dict):
+                raise ValueError("очікувався об'єкт задачі")
+            yield validate_task(row)
+        except ValueError as e:
+            logger.warning(f"Рядок {line_number} пропущено: {e}")
+            yield None
+
+
+def _ndjson_rows(f):
+    """
+    Розібрані рядки NDJSON
+
+    :param f: Текстовий файл
+    :return: Генератор пар (номер рядка, значення або None, якщо рядок не розібрано)
+    """
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            logger.warning(f"Рядок {line_number}: {e}")
+            yield line_number, None
+
+
+def write_tasks(f, tasks, file_format):
+    """
+    Потоковий запис задач
+
+    :param f: Текстовий файл (для CSV відкритий з newline='')
+    :param tasks: Ітерований набір задач
+    :param file_format: Формат (ndjson, csv)
+    :return: Кількість записаних задач
+    """
+    count = 0
+    if file_format == FORMAT_CSV:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        chunk = []
+        for task in tasks:
+            chunk.append(task)
+            if len(chunk) >= CHUNK_SIZE:
+                writer.writerows(chunk)
+                count += len(chunk)
+                chunk = []
+        writer.writerows(chunk)
+        return count + len(chunk)
+
+    chunk = []
+    for task in tasks:
+        chunk.append(json.dumps(dict(task), ensure_ascii=False, separators=(',', ':')))
+        if len(chunk) >= CHUNK_SIZE:
+            f.write('\n'.join(chunk) + '\n')
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        f.write('\n'.join(chunk) + '\n')
+    return count + len(chunk)
+
+
+# Імпорт та експорт задач з командного рядка
+def main():
+    """Імпорт задач з NDJSON/CSV до файлу задач або експорт з нього"""
+    from src.task_manager import TaskManager
+
+    if len(sys.argv) < 4 or sys.argv[1] not in ('import', 'export'):
+        print("Використання: python -m src.task_transfer import|export <файл задач> <файл ndjson/csv> [ndjson|csv]")
+        sys.exit(1)
+
+    command, tasks_file, path = sys.argv[1], sys.argv[2], sys.argv[3]
+    file_format = sys.argv[4] if len(sys.argv) > 4 else detect_format(path)
+    if file_format not in TRANSFER_FORMATS:
+        print(f"Невідомий формат: {file_format}")
+        sys.exit(1)
+
+    task_manager = TaskManager(tasks_file)
+    try:
+        if command == 'import':
+            result = task_manager.import_tasks(path, file_format)
+            if result is None:
+                sys.exit(1)
+            print(f"Імпортовано {result['added']} задач, пропущено {result['skipped']} дублікатів "
+                  f"та {result['invalid']} невірних рядків")
+        else:
+            count = task_manager.export_tasks(path, file_format)
+            if count is None:
+                sys.exit(1)
+            print(f"Експортовано {count} задач у {path}")
+    finally:
+        task_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import asyncio
+import logging
+import functools
+from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from src.http_transport import shared_transport, CONNECT_TIMEOUT, LONG_POLL_MARGIN
+from src.update_poller import chat_key
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# httpx - необов'язкова залежність для асинхронних HTTP запитів
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Помилки мережі та HTTP, після яких запит вважається невдалим
+REQUEST_ERRORS = (requests.RequestException,) + ((httpx.HTTPError,) if httpx is not None else ())
+
+# URL шаблон для API Telegram
+API_URL = 'https://api.telegram.org/bot{token}/{method}'
+
+# Параметри асинхронного циклу за замовчуванням
+WORKERS = 8            # Потоки для синхронних обробників
+MAX_IN_FLIGHT = 1000   # Кількість оновлень, що обробляються одночасно
+POLL_TIMEOUT = 30      # Тайм-аут довгого опитування getUpdates (секунди)
+RETRY_DELAY = 1        # Пауза після невдалого опитування (секунди)
+
+# Типи оновлень та методи бота, що їх обробляють
+UPDATE_HANDLERS = (
+    ('message', 'handle_message'),
+    ('callback_query', 'handle_callback_query'),
+    ('inline_query', 'handle_inline_query')
+)
+
+
+class AsyncTelegramClient:
+    """
+    Асинхронний клієнт Telegram Bot API
+
+    Якщо встановлено httpx, запити виконуються через httpx.AsyncClient з
+    пулом keep-alive з'єднань. Інакше запити спільного транспорту
+    (http_transport) виконуються в потоках: довге опитування - в окремому
+    потоці, щоб не займати потоки обробників.
+    """
+
+    def __init__(self, token_provider, api_url=API_URL, executor=None):
+        """
+        Ініціалізація клієнта
+
+        :param token_provider: Функція, що повертає поточний токен бота
+        :param api_url: URL шаблон API з полями {token} та {method}
+        :param executor: Пул потоків для запитів без httpx (None - пул за замовчуванням)
+        """
+        self.token_provider = token_provider
+        self.api_url = api_url
+        self._executor = executor
+        self._poll_executor = ThreadPoolExecutor(1, thread_name_prefix='telegram-poll')
+        self._client = None
+        if httpx is not None:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(POLL_TIMEOUT, connect=CONNECT_TIMEOUT))
+
+    async def request(self, method, data=None, timeout=None):
+        """
+        Виконання запиту до Telegram API
+
+        :param method: Метод API
+        :param data: Дані для запиту
+        :param timeout: Тайм-аут відповіді в секундах (None - тайм-аут за замовчуванням)
+        :return: Дані відповіді або None у разі помилки
+        """
+        token = self.token_provider()
+        if not token:
+            logger.error("Запит не виконано: токен не налаштовано")
+            return None
+
+        url = self.api_url.format(token=token, method=method)
+
+        try:
+            if self._client is not None:
+                response = await self._client.post(url, json=data, timeout=timeout or httpx.USE_CLIENT_DEFAULT)
+                if response.status_code >= 400:
+                    logger.error(f"Помилка запиту: HTTP {response.status_code}")
+                    return None
+            else:
+                executor = self._poll_executor if method == 'getUpdates' else self._executor
+                response = await asyncio.get_running_loop().run_in_executor(
+                    executor, functools.partial(shared_transport().post, url, json=data, timeout=timeout))
+                response.raise_for_status()
+
+            result = response.json()
+            if not result.get('ok'):
+                logger.error(f"API помилка: {result.get('description')}")
+                return None
+
+            return result.get('result')
+        except REQUEST_ERRORS as e:
+            logger.error(f"Помилка запиту: {e}")
+            return None
+
+    async def get_updates(self, offset=0, timeout=POLL_TIMEOUT, allowed_updates=None):
+        """
+        Довге опитування оновлень
+
+        :param offset: ID останнього отриманого оновлення + 1
+        :param timeout: Час очікування в секундах
+        :param allowed_updates: Типи оновлень (None - усі)
+        :return: Список оновлень або None у разі помилки
+        """
+        data = {'offset': offset, 'timeout': timeout}
+        if allowed_updates:
+            data['allowed_updates'] = list(allowed_updates)
+        return await self.request('getUpdates', data, timeout=timeout + LONG_POLL_MARGIN)
+
+    async def send_message(self, chat_id, text, parse_mode=None, reply_markup=None):
+        """
+        Відправка повідомлення
+
+        :param chat_id: ID чату
+        :param text: Текст повідомлення
+        :param parse_mode: Режим форматування (HTML, Markdown)
+        :param reply_markup: Розмітка клавіатури
+        :return: Відправлене повідомлення
+        """
+        data = {'chat_id': chat_id, 'text': text}
+
+        if parse_mode:
+            data['parse_mode'] = parse_mode
+
+        if reply_markup:
+            data['reply_markup'] = reply_markup
+
+        return await self.request('sendMessage', data)
+
+    async def close(self):
+        """Закриття з'єднань клієнта"""
+        if self._client is not None:
+            await self._client.aclose()
+        self._poll_executor.shutdown(wait=False)
+
+
+class AsyncBotRunner:
+    """
+    Асинхронний цикл оновлень для Telegram ботів
+
+    Оновлення отримуються довгим опитуванням без пауз між запитами, а кожне
+    оновлення обробляється окремою задачею asyncio, тому повільний обробник
+    (синхронізація з Google Calendar, очікування sendMessage) не затримує
+    інші чати. Оновлення одного чату обробляються по черзі, у порядку
+    надходження.
+
+    Синхронні обробники бота (handle_message, handle_callback_query,
+    handle_inline_query) виконуються в пулі з кількох потоків; асинхронні
+    обробники, зареєстровані через on(), - безпосередньо в циклі подій.
+    """
+
+    def __init__(self, bot, workers=WORKERS, max_in_flight=MAX_IN_FLIGHT, poll_timeout=POLL_TIMEOUT,
+                 api_url=API_URL):
+        """
+        Ініціалізація циклу
+
+        :param bot: Бот (TelegramBotAPI, TelegramBotExtended) з атрибутами token та last_update_id
+        :param workers: Кількість потоків для синхронних обробників
+        :param max_in_flight: Максимальна кількість оновлень, що обробляються одночасно
+        :param poll_timeout: Тайм-аут довгого опитування в секундах
+        :param api_url: URL шаблон API
+        """
+        self.bot = bot
+        self.poll_timeout = poll_timeout
+        self.max_in_flight = max_in_flight
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='bot-handler')
+        self.client = AsyncTelegramClient(lambda: self.bot.token, api_url=api_url, executor=self.executor)
+        self.handlers = {}
+        for update_type, method_name in UPDATE_HANDLERS:
+            handler = getattr(bot, method_name, None)
+            if handler is not None:
+                self.handlers[update_type] = handler
+
+        self._chat_locks = {}
+        self._tasks = set()
+        self._slots = None
+        self._stopping = False
+
+    def on(self, update_type, handler):
+        """
+        Реєстрація обробника типу оновлень
+
+        :param update_type: Тип оновлення (message, callback_query, inline_query...)
+        :param handler: Функція або корутинна функція, що приймає об'єкт оновлення
+        """
+        self.handlers[update_type] = handler
+
+    async def dispatch(self, update):
+        """
+        Обробка одного оновлення
+
+        :param update: Оновлення Telegram
+        """
+        for update_type, handler in self.handlers.items():
+            if update_type in update:
+                payload = update[update_type]
+                break
+        else:
+            return
+
+        key = chat_key({update_type: payload})
+        entry = self._chat_locks.get(key)
+        if entry is None:
+            entry = self._chat_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                if asyncio.iscoroutinefunction(handler):
+                    await handler(payload)
+                else:
+                    await asyncio.get_running_loop().run_in_executor(self.executor, handler, payload)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._chat_locks[key]
+
+    async def _handle(self, update):
+        """
+        Обробка оновлення з обліком одночасних задач
+
+        :param update: Оновлення Telegram
+        """
+        try:
+            await self.dispatch(update)
+        except Exception as e:
+            logger.error(f"Помилка обробки оновлення {update.get('update_id')}: {e}")
+        finally:
+            self._slots.release()
+
+    async def run(self):
+        """Цикл довгого опитування та обробки оновлень"""
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        logger.info("Початок асинхронного опитування")
+
+        try:
+            while not self._stopping:
+                updates = await self.client.get_updates(self.bot.last_update_id + 1, self.poll_timeout,
+                                                        allowed_updates=self.handlers)
+                if updates is None:
+                    await asyncio.sleep(RETRY_DELAY)
+                    continue
+
+                for update in updates:
+                    update_id = update.get('update_id')
+                    if update_id > self.bot.last_update_id:
+                        self.bot.last_update_id = update_id
+
+                    # Зворотний тиск: нові оновлення не беруться, поки зайняті всі місця
+                    await self._slots.acquire()
+                    task = asyncio.create_task(self._handle(update))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+        finally:
+            await self.close()
+
+    def stop(self):
+        """Завершення циклу після поточного опитування"""
+        self._stopping = True
+
+    async def close(self):
+        """Очікування незавершених обробників та звільнення ресурсів"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.client.close()
+        self.executor.shutdown(wait=True)
+
+
+def main():
+    """Запуск Telegram бота з асинхронним циклом оновлень"""
+    from src.telegram_bot_api import TelegramBotAPI
+    from src.telegram_bot_extended import TelegramBotExtended
+
+    bots = {'extended': TelegramBotExtended, 'api': TelegramBotAPI}
+    name = sys.argv[1] if len(sys.argv) > 1 else 'extended'
+    if name not in bots:
+        print("Використання: python -m src.telegram_async [extended|api]")
+        sys.exit(1)
+
+    bot = bots[name]()
+    if not bot.token:
+        logger.warning("Токен не налаштовано. Бот буде чекати на налаштування через повідомлення.")
+
+    # Запуск планувальника у окремому потоці
+    scheduler_thread = Thread(target=bot.run_scheduler)
+    scheduler_thread.daemon = True
+    scheduler_thread.start()
+
+    try:
+        asyncio.run(AsyncBotRunner(bot).run())
+    except KeyboardInterrupt:
+        logger.info("Бот зупинено користувачем")
+    except Exception as e:
+        logger.error(f"Критична помилка: {e}")
+
+
+if __name__ == "__main__":
+    main()
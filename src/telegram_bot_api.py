@@ -8,7 +8,11 @@ import logging
 import requests
 import schedule
 from datetime import datetime
-from threading import Thread
+from threading import Thread, RLock
+from src.task_file_cache import shared_cache, file_lock
+from src.task_persistence import write_atomic
+from src.http_transport import shared_transport, configure_transport, MultipartBody, LONG_POLL_MARGIN
+from src.update_poller import UpdatePoller, WORKERS
 
 # Налаштування логування
 logging.basicConfig(
@@ -41,6 +45,10 @@ class TelegramBotAPI:
         :param fallback_token: Резервний токен, якщо в конфігурації відсутній
         """
         self.config = self.load_config()
+        self._config_lock = RLock()  # Зміни та запис конфігурації з потоків обробників
+        if self.config.get('http'):
+            # Параметри спільного HTTP транспорту (pool_maxsize, connect_timeout, read_timeout, http2)
+            configure_transport(**self.config['http'])
         self.token = self.config.get('token') or fallback_token
         self.chat_id = self.config.get('chat_id')
         self.webhook_url = self.config.get('webhook_url')
@@ -63,39 +71,43 @@ class TelegramBotAPI:
             return {}
     
     def save_config(self):
-        """Збереження конфігурації у файл"""
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Помилка збереження конфігурації: {e}")
+        """
+        Збереження конфігурації у файл
+        
+        Обробники оновлень працюють у кількох потоках, тому зміни конфігурації
+        виконуються під блокуванням _config_lock, а файл записується атомарно.
+        """
+        with self._config_lock:
+            try:
+                write_atomic(CONFIG_FILE, json.dumps(self.config, ensure_ascii=False, indent=2))
+            except Exception as e:
+                logger.error(f"Помилка збереження конфігурації: {e}")
     
     def load_tasks(self):
-        """Завантаження задач з файлу"""
-        try:
-            if os.path.exists(TASKS_FILE):
-                with open(TASKS_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {"tasks": []}
-        except Exception as e:
-            logger.error(f"Помилка завантаження задач: {e}")
-            return {"tasks": []}
+        """
+        Завантаження задач з файлу
+        
+        Файл перечитується лише після його зміни; повернені дані спільні
+        для всіх читачів процесу і не повинні змінюватися.
+        """
+        return shared_cache(TASKS_FILE).get()
     
     def save_tasks(self, tasks_data):
         """Збереження задач у файл"""
         try:
-            with open(TASKS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(tasks_data, f, ensure_ascii=False, indent=2)
+            with file_lock(TASKS_FILE):
+                write_atomic(TASKS_FILE, json.dumps(tasks_data, ensure_ascii=False, indent=2))
         except Exception as e:
             logger.error(f"Помилка збереження задач: {e}")
     
-    def api_request(self, method, data=None, files=None):
+    def api_request(self, method, data=None, files=None, timeout=None):
         """
         Виконання запиту до Telegram API
         
         :param method: Метод API
         :param data: Дані для запиту
         :param files: Файли для відправки
+        :param timeout: Тайм-аут відповіді в секундах (None - тайм-аут транспорту)
         :return: Дані відповіді або None у разі помилки
         """
         if not self.token:
@@ -106,9 +118,13 @@ class TelegramBotAPI:
         
         try:
             if files:
-                response = requests.post(url, data=data, files=files, timeout=30)
+                body = MultipartBody(data, files)
+                response = shared_transport().post(url, data=body, timeout=timeout, headers={
+                    'Content-Type': body.content_type,
+                    'Content-Length': str(len(body))
+                })
             else:
-                response = requests.post(url, json=data, timeout=30)
+                response = shared_transport().post(url, json=data, timeout=timeout)
             
             response.raise_for_status()
             result = response.json()
@@ -122,12 +138,13 @@ class TelegramBotAPI:
             logger.error(f"Помилка запиту: {e}")
             return None
     
-    def get_updates(self, offset=0, timeout=30):
+    def get_updates(self, offset=0, timeout=30, limit=None):
         """
         Отримання оновлень від Telegram API
         
         :param offset: ID останнього отриманого оновлення + 1
         :param timeout: Час очікування в секундах
+        :param limit: Максимальна кількість оновлень (None - за замовчуванням Telegram, 100)
         :return: Список оновлень
         """
         data = {
@@ -135,7 +152,9 @@ class TelegramBotAPI:
             'timeout': timeout,
             'allowed_updates': ['message', 'callback_query']
         }
-        return self.api_request('getUpdates', data)
+        if limit:
+            data['limit'] = limit
+        return self.api_request('getUpdates', data, timeout=timeout + LONG_POLL_MARGIN)
     
     def set_webhook(self, url):
         """
@@ -147,9 +166,10 @@ class TelegramBotAPI:
         data = {'url': url}
         result = self.api_request('setWebhook', data)
         if result:
-            self.webhook_url = url
-            self.config['webhook_url'] = url
-            self.save_config()
+            with self._config_lock:
+                self.webhook_url = url
+                self.config['webhook_url'] = url
+                self.save_config()
         return result
     
     def delete_webhook(self):
@@ -160,9 +180,10 @@ class TelegramBotAPI:
         """
         result = self.api_request('deleteWebhook')
         if result:
-            self.webhook_url = None
-            self.config.pop('webhook_url', None)
-            self.save_config()
+            with self._config_lock:
+                self.webhook_url = None
+                self.config.pop('webhook_url', None)
+                self.save_config()
         return result
     
     def get_webhook_info(self):
@@ -254,19 +275,22 @@ class TelegramBotAPI:
         
         # Якщо chat_id ще не збережено, зберігаємо
         if not self.chat_id and chat_id:
-            self.chat_id = chat_id
-            self.config['chat_id'] = chat_id
-            self.save_config()
-            logger.info(f"Збережено chat_id: {chat_id}")
+            with self._config_lock:
+                if not self.chat_id:
+                    self.chat_id = chat_id
+                    self.config['chat_id'] = chat_id
+                    self.save_config()
+                    logger.info(f"Збережено chat_id: {chat_id}")
         
         # Перевірка стану користувача
         user_state = self.user_states.get(user_id, STATE_NONE)
         
         # Обробка стану очікування токена
         if user_state == STATE_WAITING_TOKEN:
-            self.token = text.strip()
-            self.config['token'] = self.token
-            self.save_config()
+            with self._config_lock:
+                self.token = text.strip()
+                self.config['token'] = self.token
+                self.save_config()
             self.send_message(chat_id, "✅ Токен успішно збережено!")
             self.user_states[user_id] = STATE_NONE
             return
@@ -313,25 +337,29 @@ class TelegramBotAPI:
             if update_id > self.last_update_id:
                 self.last_update_id = update_id
             
-            if 'message' in update:
-                self.handle_message(update['message'])
+            self.handle_update(update)
         
         return True
     
-    def polling(self, interval=1):
+    def handle_update(self, update):
+        """
+        Обробка одного оновлення
+        
+        :param update: Оновлення Telegram
+        """
+        if 'message' in update:
+            self.handle_message(update['message'])
+    
+    def polling(self, workers=WORKERS):
         """
         Циклічне опитування API на наявність оновлень
         
-        :param interval: Інтервал між запитами в секундах
+        Наступний запит getUpdates виконується одразу, поки пул потоків
+        обробляє попередній пакет; пауза робиться лише після помилок.
+        
+        :param workers: Кількість потоків обробників
         """
-        logger.info("Початок циклічного опитування")
-        while True:
-            try:
-                self.process_updates()
-            except Exception as e:
-                logger.error(f"Помилка під час опитування: {e}")
-            
-            time.sleep(interval)
+        UpdatePoller(self, workers=workers).run()
     
     def run_scheduler(self):
         """Запуск планувальника для щоденних звітів"""
@@ -353,19 +381,20 @@ def add_task(name, completed=False):
     :param completed: Статус виконання
     """
     try:
-        if os.path.exists(TASKS_FILE):
-            with open(TASKS_FILE, 'r', encoding='utf-8') as f:
-                tasks_data = json.load(f)
-        else:
-            tasks_data = {"tasks": []}
-        
-        tasks_data['tasks'].append({
-            'name': name,
-            'completed': completed
-        })
-        
-        with open(TASKS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(tasks_data, f, ensure_ascii=False, indent=2)
+        # Читання та запис під блокуванням, щоб не затерти зміни інших процесів
+        with file_lock(TASKS_FILE):
+            if os.path.exists(TASKS_FILE):
+                with open(TASKS_FILE, 'r', encoding='utf-8') as f:
+                    tasks_data = json.load(f)
+            else:
+                tasks_data = {"tasks": []}
+            
+            tasks_data['tasks'].append({
+                'name': name,
+                'completed': completed
+            })
+            
+            write_atomic(TASKS_FILE, json.dumps(tasks_data, ensure_ascii=False, indent=2))
         
         return True
     except Exception as e:
@@ -1,16 +1,26 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
 import os
 import json
 import time
 import logging
+import tempfile
 import requests
 import schedule
 from datetime import datetime
-from threading import Thread
+from threading import Thread, RLock
+from contextlib import contextmanager
 from src.task_manager import TaskManager
+from src.task_persistence import write_atomic
+from src.task_transfer import FORMAT_CSV, FORMAT_NDJSON
+from src.task_analytics import TaskAnalytics
+from src.task_shards import TaskShards
 from src.google_calendar_integration import GoogleCalendarIntegration
+from src.http_transport import shared_transport, configure_transport, MultipartBody, LONG_POLL_MARGIN
+from src.update_poller import UpdatePoller, WORKERS
+from src.outbound_queue import OutboundQueue, RateLimited, retry_after_from, PRIORITY_INTERACTIVE, PRIORITY_BULK
 
 # Налаштування логування
 logging.basicConfig(
@@ -34,21 +44,53 @@ STATE_WAITING_TASK_DUE_DATE = 3
 STATE_WAITING_TASK_PRIORITY = 4
 STATE_WAITING_TASK_CATEGORY = 5
 
+# Кількість задач на сторінці списку та в результатах пошуку
+PAGE_SIZE = 10
+SEARCH_LIMIT = 10
+
+# Довші назви задач скорочуються, щоб сторінка не перевищила ліміт повідомлення (4096 символів)
+MAX_TASK_NAME_LENGTH = 150
+
+# Формати експорту задач командою /export
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_NDJSON)
+
+# Дані кнопок дій із задачами: "v2:дія:ID". Кнопки без версії ("complete_3")
+# містили позицію задачі у списку, тому після змін списку вони застаріли
+TASK_ACTION_VERSION = 'v2'
+TASK_ACTIONS = ('complete', 'uncomplete', 'delete')
+
+
 class TelegramBotExtended:
     """Розширений клас для роботи з Telegram Bot API через прямі HTTP запити"""
     
-    def __init__(self, fallback_token=None):
+    def __init__(self, fallback_token=None, shards_dir=None):
         """
         Ініціалізація бота з додатковим резервним токеном
         
         :param fallback_token: Резервний токен, якщо в конфігурації відсутній
+        :param shards_dir: Каталог окремих файлів задач для кожного чату
+                           (за замовчуванням - ключ shards_dir конфігурації; без нього всі чати
+                           використовують спільний tasks.json)
         """
         self.config = self.load_config()
+        self._config_lock = RLock()  # Зміни та запис конфігурації з потоків обробників
+        if self.config.get('http'):
+            # Параметри спільного HTTP транспорту (pool_maxsize, connect_timeout, read_timeout, http2)
+            configure_transport(**self.config['http'])
         self.token = self.config.get('token') or fallback_token
         self.chat_id = self.config.get('chat_id')
         self.user_states = {}
         self.last_update_id = 0
-        self.task_manager = TaskManager()
+        # Черга вихідних повідомлень з лімітами Telegram (global_rate, chat_rate, group_rate)
+        self.outbox = OutboundQueue(**self.config.get('outbound', {}))
+        shards_dir = shards_dir or self.config.get('shards_dir')
+        backup_dir = self.config.get('backup_dir') or self.config.get('tasks', {}).get('backup_dir')
+        archive_dir = self.config.get('archive_dir') or self.config.get('tasks', {}).get('archive_dir')
+        self.shards = TaskShards(shards_dir, on_close=self.drop_analytics, shared=True, backup_dir=backup_dir,
+                                 archive_dir=archive_dir) if shards_dir else None
+        self.task_manager = None if self.shards else TaskManager(shared=True, backup_dir=backup_dir,
+                                                                 archive_dir=archive_dir)
+        self.analytics = {}  # Менеджер задач -> аналітика (сховища чатів видаляються після закриття)
         self.temp_task_data = {}  # Для тимчасового зберігання даних при створенні задачі
         
         # Перевірка наявності токена
@@ -67,20 +109,27 @@ class TelegramBotExtended:
             return {}
     
     def save_config(self):
-        """Збереження конфігурації у файл"""
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Помилка збереження конфігурації: {e}")
+        """
+        Збереження конфігурації у файл
+        
+        Обробники оновлень працюють у кількох потоках, тому зміни конфігурації
+        виконуються під блокуванням _config_lock, а файл записується атомарно.
+        """
+        with self._config_lock:
+            try:
+                write_atomic(CONFIG_FILE, json.dumps(self.config, ensure_ascii=False, indent=2))
+            except Exception as e:
+                logger.error(f"Помилка збереження конфігурації: {e}")
     
-    def api_request(self, method, data=None, files=None):
+    def api_request(self, method, data=None, files=None, timeout=None, raise_rate_limit=False):
         """
         Виконання запиту до Telegram API
         
         :param method: Метод API
         :param data: Дані для запиту
         :param files: Файли для відправки
+        :param timeout: Тайм-аут відповіді в секундах (None - тайм-аут транспорту)
+        :param raise_rate_limit: Піднімати RateLimited на відповідь 429 (для черги вихідних повідомлень)
         :return: Дані відповіді або None у разі помилки
         """
         if not self.token:
@@ -91,10 +140,16 @@ class TelegramBotExtended:
         
         try:
             if files:
-                response = requests.post(url, data=data, files=files, timeout=30)
+                body = MultipartBody(data, files)
+                response = shared_transport().post(url, data=body, timeout=timeout, headers={
+                    'Content-Type': body.content_type,
+                    'Content-Length': str(len(body))
+                })
             else:
-                response = requests.post(url, json=data, timeout=30)
+                response = shared_transport().post(url, json=data, timeout=timeout)
             
+            if response.status_code == 429 and raise_rate_limit:
+                raise RateLimited(retry_after_from(response))
             response.raise_for_status()
             result = response.json()
             
@@ -107,22 +162,59 @@ class TelegramBotExtended:
             logger.error(f"Помилка запиту: {e}")
             return None
     
-    def get_updates(self, offset=0, timeout=30):
+    def get_updates(self, offset=0, timeout=30, limit=None):
         """
         Отримання оновлень від Telegram API
         
         :param offset: ID останнього отриманого оновлення + 1
         :param timeout: Час очікування в секундах
+        :param limit: Максимальна кількість оновлень (None - за замовчуванням Telegram, 100)
         :return: Список оновлень
         """
         data = {
             'offset': offset,
             'timeout': timeout,
-            'allowed_updates': ['message', 'callback_query']
+            'allowed_updates': ['message', 'callback_query', 'inline_query']
         }
-        return self.api_request('getUpdates', data)
+        if limit:
+            data['limit'] = limit
+        return self.api_request('getUpdates', data, timeout=timeout + LONG_POLL_MARGIN)
+    
+    def send_queued(self, chat_id, method, data, files=None, priority=PRIORITY_INTERACTIVE, wait=False):
+        """
+        Виконання запиту через чергу вихідних повідомлень
+        
+        Запит чекає на ліміти Telegram для бота та чату і повторюється після
+        відповіді 429 через вказаний у ній retry_after. Обробник не чекає на
+        відправку: повідомлення одного чату все одно надсилаються в порядку
+        постановки в чергу. Чекати (wait=True) потрібно, лише якщо потрібне
+        саме надіслане повідомлення або файли закриваються після виклику.
+        
+        :param chat_id: ID чату
+        :param method: Метод API
+        :param data: Дані для запиту
+        :param files: Файли для відправки
+        :param priority: Пріоритет (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+        :param wait: Чекати на відправку
+        :return: Дані відповіді або None у разі помилки (якщо wait), інакше Future з ними
+        """
+        # Повтор після 429 надсилає файли з тієї ж позиції
+        positions = []
+        for value in (files or {}).values():
+            f = value[1] if isinstance(value, (tuple, list)) else value
+            if hasattr(f, 'seek'):
+                positions.append((f, f.tell()))
+        
+        def request():
+            for f, position in positions:
+                f.seek(position)
+            return self.api_request(method, data, files=files, raise_rate_limit=True)
+        
+        future = self.outbox.submit(chat_id, request, priority)
+        return future.result() if wait else future
     
-    def send_message(self, chat_id, text, parse_mode=None, reply_markup=None):
+    def send_message(self, chat_id, text, parse_mode=None, reply_markup=None, priority=PRIORITY_INTERACTIVE,
+                     wait=False):
         """
         Відправка повідомлення користувачу
         
@@ -130,10 +222,56 @@ class TelegramBotExtended:
         :param text: Текст повідомлення
         :param parse_mode: Режим форматування (HTML, Markdown)
         :param reply_markup: Розмітка клавіатури
-        :return: Відправлене повідомлення
+        :param priority: Пріоритет (PRIORITY_INTERACTIVE - відповідь, PRIORITY_BULK - звіт)
+        :param wait: Чекати на відправку
+        :return: Відправлене повідомлення (якщо wait) або Future з ним
+        """
+        data = {
+            'chat_id': chat_id,
+            'text': text
+        }
+        
+        if parse_mode:
+            data['parse_mode'] = parse_mode
+        
+        if reply_markup:
+            data['reply_markup'] = reply_markup
+        
+        return self.send_queued(chat_id, 'sendMessage', data, priority=priority, wait=wait)
+    
+    def send_document(self, chat_id, document, filename, caption=None, wait=False):
+        """
+        Відправка файлу
+        
+        :param chat_id: ID чату
+        :param document: Двійковий файл, що читається з поточної позиції
+        :param filename: Ім'я файлу для отримувача
+        :param caption: Підпис до файлу
+        :param wait: Чекати на відправку (обов'язково, якщо файл закривається після виклику)
+        :return: Відправлене повідомлення (якщо wait) або Future з ним
+        """
+        data = {'chat_id': chat_id}
+        
+        if caption:
+            data['caption'] = caption
+        
+        return self.send_queued(chat_id, 'sendDocument', data, files={'document': (filename, document)}, wait=wait)
+    
+    def edit_message_text(self, chat_id, message_id, text, parse_mode=None, reply_markup=None, wait=False):
+        """
+        Редагування надісланого повідомлення
+        
+        :param chat_id: ID чату
+        :param message_id: ID повідомлення
+        :param text: Новий текст повідомлення
+        :param parse_mode: Режим форматування (HTML, Markdown)
+        :param reply_markup: Розмітка inline клавіатури
+        :param wait: Чекати на відправку
+        :return: Відредаговане повідомлення (якщо wait) або Future з ним
         """
         data = {
             'chat_id': chat_id,
+            'message_id': message_id,
             'text': text
         }
         
@@ -143,7 +281,7 @@ class TelegramBotExtended:
         if reply_markup:
             data['reply_markup'] = reply_markup
         
-        return self.api_request('sendMessage', data)
+        return self.send_queued(chat_id, 'editMessageText', data, wait=wait)
     
     def get_keyboard_markup(self, buttons, one_time=False):
         """
@@ -170,22 +308,76 @@ class TelegramBotExtended:
             'inline_keyboard': buttons
         }
     
-    def get_daily_report(self):
+    @contextmanager
+    def tasks_for(self, chat_id):
+        """
+        Менеджер задач чату
+        
+        Якщо задачі розділено за чатами, повертається сховище цього чату,
+        інакше - спільний менеджер задач.
+        
+        :param chat_id: ID чату
+        :return: TaskManager
+        """
+        if self.shards is None:
+            yield self.task_manager
+            return
+        
+        with self.shards.use(chat_id) as task_manager:
+            yield task_manager
+    
+    def get_analytics(self, task_manager):
+        """
+        Аналітика сховища задач (з кешем колонок між викликами)
+        
+        Кеш ведеться для кожного менеджера задач, тому без розділення за
+        чатами всі чати користуються однією аналітикою.
+        
+        :param task_manager: Менеджер задач чату
+        :return: TaskAnalytics
+        """
+        analytics = self.analytics.get(task_manager)
+        if analytics is None:
+            analytics = self.analytics.setdefault(task_manager, TaskAnalytics(task_manager, include_archive=True))
+        return analytics
+    
+    def drop_analytics(self, task_manager):
+        """
+        Видалення аналітики закритого сховища задач
+        
+        :param task_manager: Закритий менеджер задач
+        """
+        self.analytics.pop(task_manager, None)
+    
+    def get_daily_report(self, chat_id=None):
         """
         Формування щоденного звіту з задач
         
+        :param chat_id: ID чату (за замовчуванням - чат зі звітами з конфігурації)
         :return: Текст звіту
         """
-        tasks = self.task_manager.get_all_tasks()
+        with self.tasks_for(chat_id or self.chat_id) as task_manager:
+            return self._format_daily_report(task_manager)
+    
+    def _format_daily_report(self, task_manager):
+        """
+        Текст щоденного звіту для сховища задач
         
+        Усі частини звіту беруться з одного знімка задач, тому списки та
+        статистика узгоджені навіть під час паралельних змін.
+        
+        :param task_manager: Менеджер задач
+        :return: Текст звіту
+        """
         today = datetime.now().strftime('%d.%m.%Y')
         report = f"📅 Звіт за день ({today}):\n\n"
         
-        if not tasks:
+        snapshot = task_manager.snapshot()
+        if not snapshot.get_tasks_count():
             return report + "За сьогодні задач не було"
         
-        completed_tasks = self.task_manager.get_completed_tasks()
-        pending_tasks = self.task_manager.get_pending_tasks()
+        completed_tasks = snapshot.get_completed_tasks()
+        pending_tasks = snapshot.get_pending_tasks()
         
         if completed_tasks:
             report += "✅ Виконані задачі:\n"
@@ -199,7 +391,7 @@ class TelegramBotExtended:
             for task in pending_tasks:
                 report += f"- {task.get('name')}\n"
         
-        stats = self.task_manager.get_stats()
+        stats = snapshot.get_stats()
         report += f"\n📊 Статистика: {stats['completed']}/{stats['total']} виконано ({stats['completion_rate']}%)"
         
         return report
@@ -208,50 +400,57 @@ class TelegramBotExtended:
         """
         Надсилання звіту в чат
         
-        :return: Результат відправки
+        :return: Future з результатом відправки
         """
         if not self.chat_id:
             logger.warning("Неможливо надіслати звіт: chat_id не вказано")
             return None
         
-        report = self.get_daily_report()
-        return self.send_message(self.chat_id, report)
+        report = self.get_daily_report(self.chat_id)
+        return self.send_message(self.chat_id, report, priority=PRIORITY_BULK)
     
-    def show_task_list(self, chat_id, filter_type=None):
+    def show_task_list(self, chat_id, filter_type=None, cursor=None, message_id=None):
         """
-        Відображення списку задач
+        Відображення сторінки списку задач
+        
+        Сторінка будується курсором TaskManager.list_tasks, тому довгий список
+        не перевищує ліміт довжини повідомлення. Кнопки навігації та фільтрів
+        редагують те саме повідомлення замість надсилання нового.
         
         :param chat_id: ID чату
         :param filter_type: Тип фільтра (completed, pending, all)
+        :param cursor: Курсор сторінки (None - перша сторінка)
+        :param message_id: ID повідомлення для редагування (None - нове повідомлення)
         :return: Результат відправки
         """
         if filter_type == 'completed':
-            tasks = self.task_manager.get_completed_tasks()
+            filters = {'completed': True}
             title = "✅ Виконані задачі:"
         elif filter_type == 'pending':
-            tasks = self.task_manager.get_pending_tasks()
+            filters = {'completed': False}
             title = "❌ Невиконані задачі:"
         else:
-            tasks = self.task_manager.get_all_tasks()
+            filter_type = 'all'
+            filters = {}
             title = "📋 Всі задачі:"
         
+        with self.tasks_for(chat_id) as task_manager:
+            try:
+                page = task_manager.list_tasks(cursor, limit=PAGE_SIZE, **filters)
+            except ValueError as e:
+                logger.warning(f"Невірний курсор сторінки, показується перша сторінка: {e}")
+                page = task_manager.list_tasks(limit=PAGE_SIZE, **filters)
+        
+        tasks = page['tasks']
         if not tasks:
+            if message_id:
+                return self.edit_message_text(chat_id, message_id, "Задач не знайдено")
             return self.send_message(chat_id, "Задач не знайдено")
         
         message = title + "\n\n"
         
         for i, task in enumerate(tasks):
-            status = "✅" if task.get('completed') else "❌"
-            due_date = f" (до {task.get('due_date')})" if task.get('due_date') else ""
-            priority = ""
-            if task.get('priority') == 'high':
-                priority = " 🔴"
-            elif task.get('priority') == 'medium':
-                priority = " 🟡"
-            elif task.get('priority') == 'low':
-                priority = " 🟢"
-            
-            message += f"{i+1}. {status} {task.get('name')}{due_date}{priority}\n"
+            message += f"{i+1}. {self.format_task(task)}\n"
         
         # Додавання inline кнопок для дій з задачами
         buttons = []
@@ -268,30 +467,167 @@ class TelegramBotExtended:
         if filter_row:
             buttons.append(filter_row)
         
-        # Кнопки для дій з конкретними задачами
-        for i in range(min(5, len(tasks))):
+        buttons.extend(self.task_action_buttons(tasks))
+        
+        # Кнопки переходу між сторінками
+        page_row = []
+        if page['prev_cursor']:
+            page_row.append({'text': '◀️ Назад', 'callback_data': f"page_{filter_type}_{page['prev_cursor']}"})
+        if page['next_cursor']:
+            page_row.append({'text': 'Далі ▶️', 'callback_data': f"page_{filter_type}_{page['next_cursor']}"})
+        
+        if page_row:
+            buttons.append(page_row)
+        
+        # Кнопка для додавання нової задачі
+        buttons.append([{'text': '➕ Додати задачу', 'callback_data': 'add_task'}])
+        
+        keyboard = self.get_inline_keyboard_markup(buttons)
+        
+        if message_id:
+            return self.edit_message_text(chat_id, message_id, message, reply_markup=keyboard)
+        return self.send_message(chat_id, message, reply_markup=keyboard)
+    
+    @staticmethod
+    def format_task(task):
+        """
+        Рядок задачі для списку: статус, назва, термін та пріоритет
+        
+        :param task: Задача
+        :return: Рядок
+        """
+        status = "✅" if task.get('completed') else "❌"
+        name = str(task.get('name'))
+        if len(name) > MAX_TASK_NAME_LENGTH:
+            name = name[:MAX_TASK_NAME_LENGTH - 1] + "…"
+        due_date = f" (до {task.get('due_date')})" if task.get('due_date') else ""
+        priority = ""
+        if task.get('priority') == 'high':
+            priority = " 🔴"
+        elif task.get('priority') == 'medium':
+            priority = " 🟡"
+        elif task.get('priority') == 'low':
+            priority = " 🟢"
+        
+        return f"{status} {name}{due_date}{priority}"
+    
+    @staticmethod
+    def task_action_buttons(tasks):
+        """
+        Кнопки дій для кожної задачі сторінки
+        
+        :param tasks: Список задач сторінки
+        :return: Рядки inline кнопок
+        """
+        buttons = []
+        
+        # Кнопки для дій з конкретними задачами (callback містить версію та стабільний ID задачі)
+        for i, task in enumerate(tasks):
+            task_id = task.get('id')
             task_row = []
             task_row.append({
                 'text': f"✅ Задача {i+1}",
-                'callback_data': f"complete_{i}"
+                'callback_data': TelegramBotExtended.task_action_data('complete', task_id)
             })
             task_row.append({
                 'text': f"❌ Задача {i+1}",
-                'callback_data': f"uncomplete_{i}"
+                'callback_data': TelegramBotExtended.task_action_data('uncomplete', task_id)
             })
             task_row.append({
                 'text': f"🗑️ Задача {i+1}",
-                'callback_data': f"delete_{i}"
+                'callback_data': TelegramBotExtended.task_action_data('delete', task_id)
             })
             buttons.append(task_row)
         
-        # Кнопка для додавання нової задачі
-        buttons.append([{'text': '➕ Додати задачу', 'callback_data': 'add_task'}])
+        return buttons
+    
+    @staticmethod
+    def task_action_data(action, task_id):
+        """
+        Дані кнопки дії із задачею
         
-        keyboard = self.get_inline_keyboard_markup(buttons)
+        :param action: Дія (complete, uncomplete, delete)
+        :param task_id: ID задачі
+        :return: Рядок callback_data
+        """
+        return f"{TASK_ACTION_VERSION}:{action}:{task_id}"
+    
+    @staticmethod
+    def parse_task_action(data):
+        """
+        Розбір даних кнопки дії із задачею
         
+        :param data: Рядок callback_data
+        :return: Кортеж (дія, ID задачі) або None, якщо це не кнопка дії поточної версії
+        """
+        parts = data.split(':')
+        if len(parts) != 3 or parts[0] != TASK_ACTION_VERSION or parts[1] not in TASK_ACTIONS:
+            return None
+        try:
+            return parts[1], int(parts[2])
+        except ValueError:
+            return None
+    
+    def show_search_results(self, chat_id, query):
+        """
+        Відображення задач, знайдених за словами з назви або категорії
+        
+        :param chat_id: ID чату
+        :param query: Слова для пошуку (можна вводити початок слова)
+        :return: Результат відправки
+        """
+        if not query.strip():
+            return self.send_message(chat_id, "🔍 Вкажіть слова для пошуку, наприклад: /find звіт")
+        
+        with self.tasks_for(chat_id) as task_manager:
+            tasks = task_manager.search_tasks(query, limit=SEARCH_LIMIT + 1)
+        
+        if not tasks:
+            return self.send_message(chat_id, f"🔍 За запитом «{query}» задач не знайдено")
+        
+        message = f"🔍 Знайдено за запитом «{query}»:\n\n"
+        for i, task in enumerate(tasks[:SEARCH_LIMIT]):
+            message += f"{i+1}. {self.format_task(task)}\n"
+        if len(tasks) > SEARCH_LIMIT:
+            message += f"\nПоказано перші {SEARCH_LIMIT} задач, уточніть запит"
+        
+        keyboard = self.get_inline_keyboard_markup(self.task_action_buttons(tasks[:SEARCH_LIMIT]))
         return self.send_message(chat_id, message, reply_markup=keyboard)
     
+    def handle_inline_query(self, inline_query):
+        """
+        Підказки задач під час введення (inline режим, "@бот слова")
+        
+        Inline режим потрібно увімкнути для бота через @BotFather (/setinline).
+        
+        :param inline_query: Об'єкт inline query
+        """
+        query = inline_query.get('query', '')
+        user_id = inline_query.get('from', {}).get('id')
+        
+        tasks = []
+        if query.strip():
+            # Задачі особистого чату користувача (ID чату збігається з ID користувача)
+            with self.tasks_for(user_id) as task_manager:
+                tasks = task_manager.search_tasks(query, limit=SEARCH_LIMIT)
+        
+        results = []
+        for task in tasks:
+            results.append({
+                'type': 'article',
+                'id': str(task.get('id')),
+                'title': task.get('name'),
+                'description': self.format_task(task),
+                'input_message_content': {'message_text': self.format_task(task)}
+            })
+        
+        self.api_request('answerInlineQuery', {
+            'inline_query_id': inline_query.get('id'),
+            'results': results,
+            'cache_time': 0,
+            'is_personal': True
+        })
+    
     def start_adding_task(self, chat_id, user_id):
         """
         Початок процесу додавання нової задачі
@@ -308,6 +644,32 @@ class TelegramBotExtended:
             "Додавання нової задачі\n\nВведіть назву задачі:"
         )
     
+    def send_tasks_export(self, chat_id, file_format=FORMAT_CSV):
+        """
+        Експорт задач чату файлом
+        
+        Задачі записуються у тимчасовий файл на диску, який потім
+        надсилається частинами, тому розмір експорту не обмежений пам'яттю.
+        
+        :param chat_id: ID чату
+        :param file_format: Формат (csv, ndjson)
+        :return: Результат відправки
+        """
+        with tempfile.TemporaryFile() as raw:
+            text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+            with self.tasks_for(chat_id) as task_manager:
+                count = task_manager.export_tasks(text, file_format)
+            text.flush()
+            text.detach()
+            
+            if count is None:
+                return self.send_message(chat_id, "❌ Помилка експорту задач")
+            
+            raw.seek(0)
+            filename = f"tasks-{datetime.now().strftime('%Y%m%d')}.{file_format}"
+            # Тимчасовий файл закривається після виходу з блоку, тому відправка чекає на нього
+            return self.send_document(chat_id, raw, filename, caption=f"📦 Експортовано задач: {count}", wait=True)
+    
     def sync_with_google_calendar(self, chat_id):
         """
         Синхронізація задач з Google Calendar
@@ -315,19 +677,20 @@ class TelegramBotExtended:
         :param chat_id: ID чату
         :return: Результат відправки
         """
-        calendar_integration = GoogleCalendarIntegration()
-        
         self.send_message(chat_id, "🔄 Починаю синхронізацію з Google Calendar...")
         
         try:
-            if not calendar_integration.authenticate():
-                return self.send_message(
-                    chat_id,
-                    "❌ Помилка аутентифікації в Google Calendar.\n\n"
-                    "Перевірте наявність файлу credentials.json в директорії проекту."
-                )
-            
-            added_count = calendar_integration.sync_calendar_to_tasks()
+            with self.tasks_for(chat_id) as task_manager:
+                calendar_integration = GoogleCalendarIntegration(task_manager=task_manager)
+                
+                if not calendar_integration.authenticate():
+                    return self.send_message(
+                        chat_id,
+                        "❌ Помилка аутентифікації в Google Calendar.\n\n"
+                        "Перевірте наявність файлу credentials.json в директорії проекту."
+                    )
+                
+                added_count = calendar_integration.sync_calendar_to_tasks()
             
             if added_count >= 0:
                 return self.send_message(
@@ -360,19 +723,22 @@ class TelegramBotExtended:
         
         # Якщо chat_id ще не збережено, зберігаємо
         if not self.chat_id and chat_id:
-            self.chat_id = chat_id
-            self.config['chat_id'] = chat_id
-            self.save_config()
-            logger.info(f"Збережено chat_id: {chat_id}")
+            with self._config_lock:
+                if not self.chat_id:
+                    self.chat_id = chat_id
+                    self.config['chat_id'] = chat_id
+                    self.save_config()
+                    logger.info(f"Збережено chat_id: {chat_id}")
         
         # Перевірка стану користувача
         user_state = self.user_states.get(user_id, STATE_NONE)
         
         # Обробка стану очікування токена
         if user_state == STATE_WAITING_TOKEN:
-            self.token = text.strip()
-            self.config['token'] = self.token
-            self.save_config()
+            with self._config_lock:
+                self.token = text.strip()
+                self.config['token'] = self.token
+                self.save_config()
             self.send_message(chat_id, "✅ Токен успішно збережено!")
             self.user_states[user_id] = STATE_NONE
             return
@@ -469,12 +835,15 @@ class TelegramBotExtended:
             
             # Додавання задачі
             task_data = self.temp_task_data[user_id]
-            if self.task_manager.add_task(
-                name=task_data.get('name'),
-                due_date=task_data.get('due_date'),
-                priority=task_data.get('priority'),
-                category=task_data.get('category')
-            ):
+            with self.tasks_for(chat_id) as task_manager:
+                added = task_manager.add_task(
+                    name=task_data.get('name'),
+                    due_date=task_data.get('due_date'),
+                    priority=task_data.get('priority'),
+                    category=task_data.get('category')
+                )
+            
+            if added:
                 self.send_message(chat_id, f"✅ Задачу '{task_data.get('name')}' успішно додано!")
             else:
                 self.send_message(chat_id, f"❌ Помилка при додаванні задачі. Можливо, задача з такою назвою вже існує.")
@@ -491,8 +860,8 @@ class TelegramBotExtended:
             if command == '/start':
                 # Створення меню головних команд
                 keyboard = self.get_keyboard_markup([
-                    ["/tasks", "/report"],
-                    ["/add_task", "/sync_calendar"],
+                    ["/tasks", "/find", "/report", "/stats"],
+                    ["/add_task", "/export", "/sync_calendar"],
                     ["/settings"]
                 ])
                 
@@ -501,8 +870,11 @@ class TelegramBotExtended:
                     "👋 Вітаю! Я ваш особистий бот для керування задачами.\n\n"
                     "🔹 Доступні команди:\n"
                     "/tasks - Показати список задач\n"
+                    "/find <слова> - Знайти задачі\n"
                     "/add_task - Додати нову задачу\n"
                     "/report - Отримати звіт за сьогодні\n"
+                    "/stats - Аналітика продуктивності\n"
+                    "/export [csv|ndjson] - Експорт задач файлом\n"
                     "/sync_calendar - Синхронізувати з Google Calendar\n"
                     "/settings - Налаштування бота\n\n"
                     "⚙️ Для початку роботи налаштуйте токен через /settings",
@@ -518,7 +890,16 @@ class TelegramBotExtended:
                     self.send_message(chat_id, "❌ Спочатку налаштуйте токен через /settings")
                     return
                 
-                report = self.get_daily_report()
+                report = self.get_daily_report(chat_id)
+                self.send_message(chat_id, report)
+            
+            elif command == '/stats':
+                if not self.token:
+                    self.send_message(chat_id, "❌ Спочатку налаштуйте токен через /settings")
+                    return
+                
+                with self.tasks_for(chat_id) as task_manager:
+                    report = self.get_analytics(task_manager).get_report()
                 self.send_message(chat_id, report)
             
             elif command == '/tasks':
@@ -539,6 +920,26 @@ class TelegramBotExtended:
                 
                 self.show_task_list(chat_id, filter_type)
             
+            elif command == '/find':
+                if not self.token:
+                    self.send_message(chat_id, "❌ Спочатку налаштуйте токен через /settings")
+                    return
+                
+                self.show_search_results(chat_id, text[len(text.split()[0]):].strip())
+            
+            elif command == '/export':
+                if not self.token:
+                    self.send_message(chat_id, "❌ Спочатку налаштуйте токен через /settings")
+                    return
+                
+                parts = text.split()
+                file_format = parts[1].lower() if len(parts) > 1 else FORMAT_CSV
+                if file_format not in EXPORT_FORMATS:
+                    self.send_message(chat_id, "Формат експорту: /export csv або /export ndjson")
+                    return
+                
+                self.send_tasks_export(chat_id, file_format)
+            
             elif command == '/add_task':
                 if not self.token:
                     self.send_message(chat_id, "❌ Спочатку налаштуйте токен через /settings")
@@ -561,40 +962,64 @@ class TelegramBotExtended:
         """
         query_id = callback_query.get('id')
         chat_id = callback_query.get('message', {}).get('chat', {}).get('id')
+        message_id = callback_query.get('message', {}).get('message_id')
         user_id = callback_query.get('from', {}).get('id')
         data = callback_query.get('data', '')
         
+        # Кнопки дій без версії містять позицію задачі, а не ID - виконувати їх небезпечно
+        task_action = self.parse_task_action(data)
+        outdated = task_action is None and data.split('_', 1)[0] in TASK_ACTIONS
+        
         # Відповідь на callback query
-        self.api_request('answerCallbackQuery', {'callback_query_id': query_id})
+        answer = {'callback_query_id': query_id}
+        if outdated:
+            answer['text'] = "⚠️ Кнопка застаріла. Відкрийте список задач ще раз: /tasks"
+            answer['show_alert'] = True
+        self.api_request('answerCallbackQuery', answer)
+        if outdated:
+            return
+        
+        action, task_id = task_action or (None, None)
         
         # Обробка фільтрації задач
         if data.startswith('filter_'):
             filter_type = data.split('_')[1]
-            self.show_task_list(chat_id, filter_type)
+            self.show_task_list(chat_id, filter_type, message_id=message_id)
+        
+        # Перехід між сторінками списку задач
+        elif data.startswith('page_'):
+            _, filter_type, cursor = data.split('_', 2)
+            self.show_task_list(chat_id, filter_type, cursor, message_id=message_id)
         
         # Обробка позначення задачі як виконаної
-        elif data.startswith('complete_'):
-            task_id = int(data.split('_')[1])
-            if self.task_manager.mark_completed(task_id, True):
-                self.send_message(chat_id, f"✅ Задачу #{task_id+1} позначено як виконану")
+        elif action == 'complete':
+            with self.tasks_for(chat_id) as task_manager:
+                task = task_manager.get_task_by_id(task_id)
+                done = task and task_manager.mark_completed(task_id, True)
+            if done:
+                self.send_message(chat_id, f"✅ Задачу '{task.get('name')}' позначено як виконану")
             else:
-                self.send_message(chat_id, f"❌ Помилка при оновленні задачі #{task_id+1}")
+                self.send_message(chat_id, "❌ Помилка при оновленні задачі. Можливо, її вже видалено.")
         
         # Обробка позначення задачі як невиконаної
-        elif data.startswith('uncomplete_'):
-            task_id = int(data.split('_')[1])
-            if self.task_manager.mark_completed(task_id, False):
-                self.send_message(chat_id, f"❌ Задачу #{task_id+1} позначено як невиконану")
+        elif action == 'uncomplete':
+            with self.tasks_for(chat_id) as task_manager:
+                task = task_manager.get_task_by_id(task_id)
+                done = task and task_manager.mark_completed(task_id, False)
+            if done:
+                self.send_message(chat_id, f"❌ Задачу '{task.get('name')}' позначено як невиконану")
             else:
-                self.send_message(chat_id, f"❌ Помилка при оновленні задачі #{task_id+1}")
+                self.send_message(chat_id, "❌ Помилка при оновленні задачі. Можливо, її вже видалено.")
         
         # Обробка видалення задачі
-        elif data.startswith('delete_'):
-            task_id = int(data.split('_')[1])
-            if self.task_manager.delete_task(task_id):
-                self.send_message(chat_id, f"🗑️ Задачу #{task_id+1} видалено")
+        elif action == 'delete':
+            with self.tasks_for(chat_id) as task_manager:
+                task = task_manager.get_task_by_id(task_id)
+                done = task and task_manager.delete_task(task_id)
+            if done:
+                self.send_message(chat_id, f"🗑️ Задачу '{task.get('name')}' видалено")
             else:
-                self.send_message(chat_id, f"❌ Помилка при видаленні задачі #{task_id+1}")
+                self.send_message(chat_id, "❌ Помилка при видаленні задачі. Можливо, її вже видалено.")
         
         # Обробка додавання нової задачі
         elif data == 'add_task':
@@ -615,27 +1040,33 @@ class TelegramBotExtended:
             if update_id > self.last_update_id:
                 self.last_update_id = update_id
             
-            if 'message' in update:
-                self.handle_message(update['message'])
-            elif 'callback_query' in update:
-                self.handle_callback_query(update['callback_query'])
+            self.handle_update(update)
         
         return True
     
-    def polling(self, interval=1):
+    def handle_update(self, update):
+        """
+        Обробка одного оновлення
+        
+        :param update: Оновлення Telegram
+        """
+        if 'message' in update:
+            self.handle_message(update['message'])
+        elif 'callback_query' in update:
+            self.handle_callback_query(update['callback_query'])
+        elif 'inline_query' in update:
+            self.handle_inline_query(update['inline_query'])
+    
+    def polling(self, workers=WORKERS):
         """
         Циклічне опитування API на наявність оновлень
         
-        :param interval: Інтервал між запитами в секундах
+        Наступний запит getUpdates виконується одразу, поки пул потоків
+        обробляє попередній пакет; пауза робиться лише після помилок.
+        
+        :param workers: Кількість потоків обробників
         """
-        logger.info("Початок циклічного опитування")
-        while True:
-            try:
-                self.process_updates()
-            except Exception as e:
-                logger.error(f"Помилка під час опитування: {e}")
-            
-            time.sleep(interval)
+        UpdatePoller(self, workers=workers).run()
     
     def run_scheduler(self):
         """Запуск планувальника для щоденних звітів"""
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import logging
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+# Налаштування логування
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# Параметри опитування за замовчуванням
+WORKERS = 8            # Потоки обробників оновлень
+BATCH_LIMIT = 100      # Максимальна кількість оновлень за один getUpdates (ліміт Telegram)
+POLL_TIMEOUT = 30      # Тайм-аут довгого опитування (секунди)
+MAX_PENDING = 1000     # Оновлення, отримані, але ще не оброблені
+RETRY_DELAY = 1        # Перша пауза після помилки опитування (секунди)
+MAX_RETRY_DELAY = 30   # Максимальна пауза після помилок поспіль (секунди)
+
+
+def chat_key(update):
+    """
+    Ключ черги, в якій оновлення обробляються по черзі
+
+    :param update: Оновлення Telegram
+    :return: ID чату або користувача (None, якщо їх немає)
+    """
+    for field, payload in update.items():
+        if field == 'update_id' or not isinstance(payload, dict):
+            continue
+        chat = payload.get('chat') or payload.get('message', {}).get('chat')
+        if chat:
+            return chat.get('id')
+        return payload.get('from', {}).get('id')
+    return None
+
+
+class UpdatePoller:
+    """
+    Конвеєрне довге опитування Telegram
+
+    Потік опитування надсилає наступний getUpdates одразу після отримання
+    пакета, а пакет тим часом обробляє пул потоків. Оновлення одного чату
+    обробляються по черзі, у порядку надходження; різних чатів -
+    паралельно. Якщо пакет повний (limit оновлень), наступний запит
+    виконується без очікування (timeout=0), щоб швидше забрати решту черги.
+    Пауза робиться лише після помилки опитування і зростає до
+    MAX_RETRY_DELAY при помилках поспіль.
+
+    Бот має надавати get_updates(offset, timeout, limit), handle_update(update)
+    та атрибут last_update_id.
+    """
+
+    def __init__(self, bot, workers=WORKERS, limit=BATCH_LIMIT, poll_timeout=POLL_TIMEOUT,
+                 max_pending=MAX_PENDING):
+        """
+        Ініціалізація опитування
+
+        :param bot: Бот з методами get_updates та handle_update
+        :param workers: Кількість потоків обробників
+        :param limit: Максимальна кількість оновлень за запит
+        :param poll_timeout: Тайм-аут довгого опитування в секундах
+        :param max_pending: Максимальна кількість отриманих, але не оброблених оновлень
+        """
+        self.bot = bot
+        self.limit = limit
+        self.poll_timeout = poll_timeout
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='update-worker')
+        self._chats = {}  # Ключ чату -> черга оновлень (перше - в обробці)
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max_pending)
+        self._stopping = threading.Event()
+
+    def dispatch(self, update):
+        """
+        Передача оновлення пулу обробників
+
+        :param update: Оновлення Telegram
+        """
+        key = chat_key(update)
+        with self._lock:
+            queue = self._chats.get(key)
+            if queue is not None:
+                queue.append(update)
+                return
+            self._chats[key] = deque([update])
+        self.executor.submit(self._drain, key)
+
+    def _drain(self, key):
+        """
+        Обробка черги оновлень одного чату
+
+        :param key: Ключ чату
+        """
+        with self._lock:
+            update = self._chats[key][0]
+
+        while True:
+            try:
+                self.bot.handle_update(update)
+            except Exception as e:
+                logger.error(f"Помилка обробки оновлення {update.get('update_id')}: {e}")
+            finally:
+                self._slots.release()
+
+            with self._lock:
+                queue = self._chats[key]
+                queue.popleft()
+                if not queue:
+                    del self._chats[key]
+                    return
+                update = queue[0]
+
+    def run(self):
+        """Цикл опитування (блокує до виклику stop)"""
+        logger.info("Початок конвеєрного опитування")
+        timeout = self.poll_timeout
+        delay = RETRY_DELAY
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    updates = self.bot.get_updates(offset=self.bot.last_update_id + 1, timeout=timeout,
+                                                   limit=self.limit)
+                except Exception as e:
+                    logger.error(f"Помилка під час опитування: {e}")
+                    updates = None
+
+                if updates is None:
+                    self._stopping.wait(delay)
+                    delay = min(delay * 2, MAX_RETRY_DELAY)
+                    continue
+                delay = RETRY_DELAY
+
+                for update in updates:
+                    update_id = update.get('update_id')
+                    if update_id > self.bot.last_update_id:
+                        self.bot.last_update_id = update_id
+
+                    # Зворотний тиск: нові оновлення не беруться, поки черга обробки заповнена
+                    self._slots.acquire()
+                    self.dispatch(update)
+
+                # Повний пакет - на сервері, ймовірно, є ще оновлення
+                timeout = 0 if len(updates) >= self.limit else self.poll_timeout
+        finally:
+            self.executor.shutdown(wait=True)
+
+    def stop(self):
+        """Завершення опитування після поточного запиту"""
+        self._stopping.set()
+
+
+class _BenchmarkAPI:
+    """Локальний імітатор Bot API для main(): черга оновлень, довге опитування getUpdates, sendMessage"""
+
+    def __init__(self):
+        self.updates = []
+        self.pushed = {}   # ID оновлення -> час надходження
+        self.replied = {}  # ID оновлення -> час відповіді
+        self.polls = 0
+        self._condition = threading.Condition()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Заголовки й тіло пишуться окремо; без TCP_NODELAY тіло чекає на затримане ACK (~40 мс)
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                result = api.handle(self.path.rsplit('/', 1)[-1], json.loads(body or b'{}'))
+                payload = json.dumps({'ok': True, 'result': result}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/bot/'
+
+    def push(self, chat_id):
+        """Нове повідомлення від чату"""
+        with self._condition:
+            update_id = len(self.updates) + 1
+            self.updates.append({'update_id': update_id, 'message': {'chat': {'id': chat_id}, 'text': '/start'}})
+            self.pushed[update_id] = time.perf_counter()
+            self._condition.notify_all()
+
+    def handle(self, method, data):
+        """Відповідь на метод API"""
+        if method == 'sendMessage':
+            self.replied[data['reply_to']] = time.perf_counter()
+            return {'message_id': data['reply_to']}
+
+        deadline = time.monotonic() + data.get('timeout', 0)
+        with self._condition:
+            self.polls += 1
+            while True:
+                updates = self.updates[data.get('offset', 1) - 1:][:data.get('limit') or BATCH_LIMIT]
+                if updates or time.monotonic() >= deadline:
+                    return updates
+                self._condition.wait(deadline - time.monotonic())
+
+
+class _BenchmarkBot:
+    """Бот для main(): відповідає на кожне повідомлення, у кожному десятому чаті - повільно"""
+
+    def __init__(self, api, transport):
+        self.api = api
+        self.transport = transport
+        self.last_update_id = 0
+
+    def get_updates(self, offset=0, timeout=POLL_TIMEOUT, limit=None):
+        data = {'offset': offset, 'timeout': timeout, 'limit': limit}
+        return self.transport.post(self.api.url + 'getUpdates', json=data, timeout=timeout + 10).json()['result']
+
+    def handle_update(self, update):
+        chat_id = update['message']['chat']['id']
+        if chat_id % 10 == 0:
+            time.sleep(0.3)
+        self.transport.post(self.api.url + 'sendMessage', json={'chat_id': chat_id, 'reply_to': update['update_id']})
+
+
+def main():
+    """Затримка відповідей на локальному імітаторі Bot API: цикл з паузою між запитами проти UpdatePoller"""
+    import sys
+    from src.http_transport import HttpTransport
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    chats = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    interval = 0.02  # Повідомлення надходять по одному кожні 20 мс
+
+    def sequential(bot, stop):
+        # Попередній цикл polling(): пакет обробляється послідовно, потім пауза 1 с
+        while not stop.is_set():
+            for update in bot.get_updates(offset=bot.last_update_id + 1, timeout=1) or []:
+                bot.last_update_id = max(bot.last_update_id, update['update_id'])
+                bot.handle_update(update)
+            time.sleep(1)
+
+    def pipelined(bot, stop):
+        poller = UpdatePoller(bot, poll_timeout=1)
+        threading.Thread(target=lambda: (stop.wait(), poller.stop()), daemon=True).start()
+        poller.run()
+
+    for name, loop in (("Цикл з паузою 1 с", sequential), ("UpdatePoller", pipelined)):
+        api = _BenchmarkAPI()
+        transport = HttpTransport()
+        stop = threading.Event()
+        thread = threading.Thread(target=loop, args=(_BenchmarkBot(api, transport), stop), daemon=True)
+        thread.start()
+
+        for number in range(count):
+            api.push(1 + number % chats)
+            time.sleep(interval)
+        deadline = time.monotonic() + 120
+        while len(api.replied) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stop.set()
+        thread.join(5)
+
+        latencies = sorted(api.replied[update_id] - pushed for update_id, pushed in api.pushed.items()
+                           if update_id in api.replied)
+        print(f"{name}: відповідей {len(latencies)}/{count}, "
+              f"p50 {latencies[len(latencies) // 2] * 1000:.0f} мс, "
+              f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000:.0f} мс, "
+              f"запитів getUpdates {api.polls}")
+        api.server.shutdown()
+        transport.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+from email.parser import BytesParser
+from email.policy import HTTP
+
+import pytest
+
+from src.http_transport import MultipartBody, _BenchmarkServer, _self_signed_certificate, compare_latency
+
+
+def parse(body):
+    """
+    Частини тіла multipart/form-data
+
+    :param body: MultipartBody
+    :return: Словник "поле -> (ім'я файлу, тип вмісту, байти)"
+    """
+    data = b''.join(body)
+    assert len(data) == len(body)
+    message = BytesParser(policy=HTTP).parsebytes(f'Content-Type: {body.content_type}\r\n\r\n'.encode() + data)
+    return {part.get_param('name', header='content-disposition'):
+            (part.get_filename(), part.get_content_type(), part.get_payload(decode=True))
+            for part in message.iter_parts()}
+
+
+class Unseekable(io.RawIOBase):
+    """Потік без позиції (як канал або сокет)"""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self._data.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def test_tuple_with_file(tmp_path):
+    path = tmp_path / 'report.csv'
+    path.write_bytes(b'a,b\n1,2\n')
+    with open(path, 'rb') as f:
+        parts = parse(MultipartBody({'chat_id': 1}, {'document': ('tasks.csv', f, 'text/csv')}))
+    assert parts['document'] == ('tasks.csv', 'text/csv', b'a,b\n1,2\n')
+    assert parts['chat_id'][2] == b'1'
+
+
+def test_bare_file_uses_its_name(tmp_path):
+    path = tmp_path / 'report.txt'
+    path.write_bytes(b'hello')
+    with open(path, 'rb') as f:
+        f.read(1)
+        parts = parse(MultipartBody({}, {'document': f}))
+    assert parts['document'] == ('report.txt', 'application/octet-stream', b'ello')
+
+
+@pytest.mark.parametrize('value, expected', [
+    (b'bytes', b'bytes'),
+    (bytearray(b'array'), b'array'),
+    ('текст', 'текст'.encode('utf-8')),
+    (io.BytesIO(b'stream'), b'stream'),
+    (Unseekable(b'pipe'), b'pipe')
+])
+def test_bare_content_is_named_after_field(value, expected):
+    parts = parse(MultipartBody({}, {'document': value}))
+    assert parts['document'] == ('document', 'application/octet-stream', expected)
+
+
+def test_tuple_with_stream_from_current_position():
+    stream = io.BytesIO(b'0123456789')
+    stream.seek(4)
+    parts = parse(MultipartBody({}, {'photo': ('p.jpg', stream, 'image/jpeg', {'X-Extra': '1'})}))
+    assert parts['photo'] == ('p.jpg', 'image/jpeg', b'456789')
+
+
+def test_small_reads_return_whole_body():
+    body = MultipartBody({'a': 'b'}, {'f': ('x', io.BytesIO(b'x' * 1000))})
+    chunks = []
+    while True:
+        chunk = body.read(7)
+        if not chunk:
+            break
+        assert len(chunk) <= 7
+        chunks.append(chunk)
+    assert len(b''.join(chunks)) == len(body)
+
+
+@pytest.fixture(params=['http', 'https'])
+def server(request, tmp_path):
+    """Локальний імітатор API через HTTP та HTTPS (самопідписаний сертифікат)"""
+    certificate = None
+    if request.param == 'https':
+        certificate = _self_signed_certificate(str(tmp_path))
+        if certificate is None:
+            pytest.skip("openssl недоступний")
+    mock = _BenchmarkServer(certificate)
+    mock.verify = certificate[0] if certificate else True
+    yield mock
+    mock.close()
+
+
+def test_transport_reuses_one_connection(server):
+    """Спільний транспорт виконує всі запити через одне keep-alive з'єднання"""
+    result = compare_latency(server.url, 20, verify=server.verify)
+
+    assert result['transport']['connections'] == 1
+    assert set(result['requests']) == {'avg', 'p50', 'p95'}
+    assert 0 < result['transport']['p50'] <= result['transport']['p95']
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from src.outbound_queue import OutboundQueue, RateLimited, PRIORITY_BULK, PRIORITY_INTERACTIVE
+from src.telegram_bot_extended import TelegramBotExtended
+
+
+@pytest.fixture
+def queue():
+    outbox = OutboundQueue(global_rate=1000, chat_rate=1000, chat_burst=1000)
+    yield outbox
+    outbox.close(5)
+
+
+def test_submit_does_not_wait_for_rate_limit():
+    """submit повертає Future одразу, навіть коли повідомлення чекає на ліміт чату"""
+    outbox = OutboundQueue(global_rate=1000, chat_rate=2)
+    try:
+        started = time.monotonic()
+        futures = [outbox.submit(1, lambda number=number: number) for number in range(3)]
+        assert time.monotonic() - started < 0.1
+        assert [future.result(5) for future in futures] == [0, 1, 2]
+        # Третє повідомлення чекало на два токени чату (2 на секунду)
+        assert time.monotonic() - started >= 0.9
+    finally:
+        outbox.close(5)
+
+
+def test_messages_of_one_chat_keep_order(queue):
+    sent = []
+    futures = [queue.submit(chat_id, lambda chat_id=chat_id, number=number: sent.append((chat_id, number)))
+               for number in range(20) for chat_id in (1, 2, 3)]
+    for future in futures:
+        future.result(5)
+    for chat_id in (1, 2, 3):
+        assert [number for chat, number in sent if chat == chat_id] == list(range(20))
+
+
+def test_rate_limited_message_is_retried_in_place(queue):
+    """Після 429 повідомлення повторюється через retry_after і залишається першим у черзі чату"""
+    sent = []
+    attempts = []
+
+    def limited():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RateLimited(0.2)
+        sent.append('перше')
+        return 'ok'
+
+    first = queue.submit(1, limited)
+    second = queue.submit(1, lambda: sent.append('друге'))
+    assert first.result(5) == 'ok'
+    second.result(5)
+    assert sent == ['перше', 'друге']
+    assert attempts[1] - attempts[0] >= 0.2
+
+
+def test_interactive_messages_overtake_bulk():
+    outbox = OutboundQueue(global_rate=1000, chat_rate=1000, chat_burst=1000, senders=1)
+    sent = []
+    release = threading.Event()
+    try:
+        outbox.submit(1, lambda: release.wait(5))
+        futures = [outbox.submit(1, lambda number=number: sent.append(('звіт', number)), PRIORITY_BULK)
+                   for number in range(3)]
+        futures.append(outbox.submit(1, lambda: sent.append(('відповідь', 0)), PRIORITY_INTERACTIVE))
+        release.set()
+        for future in futures:
+            future.result(5)
+        assert sent[0] == ('відповідь', 0)
+    finally:
+        outbox.close(5)
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    """Бот у тимчасовому каталозі (конфігурація та tasks.json)"""
+    monkeypatch.chdir(tmp_path)
+    telegram_bot = TelegramBotExtended(fallback_token='token')
+    yield telegram_bot
+    telegram_bot.outbox.close(5)
+    telegram_bot.task_manager.close()
+
+
+def test_send_message_does_not_block_handler(bot):
+    """Обробник отримує Future і не чекає на відповідь API"""
+    release = threading.Event()
+
+    def api_request(method, data=None, files=None, timeout=None, raise_rate_limit=False):
+        release.wait(5)
+        return {'message_id': 1, 'text': data['text']}
+
+    bot.api_request = api_request
+    started = time.monotonic()
+    future = bot.send_message(1, 'привіт')
+    assert isinstance(future, Future)
+    assert time.monotonic() - started < 0.1
+    assert not future.done()
+
+    release.set()
+    assert future.result(5) == {'message_id': 1, 'text': 'привіт'}
+    assert bot.send_message(1, 'ще раз', wait=True) == {'message_id': 1, 'text': 'ще раз'}
+
+
+def test_export_waits_for_document(bot):
+    """Експорт чекає на відправку, бо тимчасовий файл закривається після неї"""
+    documents = []
+
+    def api_request(method, data=None, files=None, timeout=None, raise_rate_limit=False):
+        if files:
+            documents.append(files['document'][1].read())
+        return {'message_id': 1}
+
+    bot.api_request = api_request
+    bot.task_manager.add_task('звіт')
+    assert bot.send_tasks_export(1, 'ndjson') == {'message_id': 1}
+    assert '"name":"звіт"'.encode('utf-8') in documents[0]
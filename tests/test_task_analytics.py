@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+
+import pytest
+
+from src import task_analytics
+from src.task_analytics import TaskAnalytics
+from src.task_manager import TaskManager
+
+NOW = datetime(2024, 3, 10, 12, 0)
+
+TASKS = [
+    # 2 години до виконання
+    {'id': 1, 'name': 'Звіт', 'category': 'робота', 'priority': 'high', 'completed': True,
+     'created_at': '01.03.2024 10:00:00', 'completed_at': '01.03.2024 12:00:00', 'due_date': '02.03.2024'},
+    {'id': 2, 'name': 'Лист', 'category': 'робота', 'priority': 'high', 'completed': False,
+     'created_at': '01.03.2024 11:00:00', 'due_date': '05.03.2024'},
+    # 24 години до виконання, без дати виконання
+    {'id': 3, 'name': 'План', 'category': 'робота', 'priority': 'low', 'completed': True,
+     'created_at': '02.03.2024 09:00:00', 'completed_at': '03.03.2024 09:00:00'},
+    # 30 хвилин до виконання
+    {'id': 4, 'name': 'Покупки', 'category': 'дім', 'priority': 'low', 'completed': True,
+     'created_at': '02.03.2024 08:00:00', 'completed_at': '02.03.2024 08:30:00', 'due_date': '20.03.2024'},
+    # Позначка часу у невідомому форматі не враховується
+    {'id': 5, 'name': 'Ремонт', 'category': 'дім', 'completed': False,
+     'created_at': '2024-03-02 08:00:00', 'due_date': '15.03.2024'},
+    # Позначка виконання без статусу виконання не враховується
+    {'id': 6, 'name': 'Прибирання', 'category': 'дім', 'priority': 'low', 'completed': False,
+     'created_at': '03.03.2024 10:00:00', 'completed_at': '03.03.2024 10:05:00', 'due_date': '2024-03-01'},
+]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = TaskManager(str(tmp_path / 'tasks.json'))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def analytics(manager):
+    pytest.importorskip('numpy')
+    manager.tasks = {'tasks': [dict(task) for task in TASKS], 'last_id': len(TASKS)}
+    return TaskAnalytics(manager)
+
+
+def test_median_completion_time(analytics):
+    """Медіана враховує лише виконані задачі з обома позначками часу"""
+    assert analytics.median_completion_time() == 7200.0
+    assert analytics.median_completion_time(by_category=True) == {'робота': 46800.0, 'дім': 1800.0}
+
+
+def test_overdue_ratio_by_priority(analytics):
+    """Простроченими є невиконані задачі з минулою датою, задачі без дати не враховуються"""
+    assert analytics.overdue_ratio_by_priority(NOW) == {
+        'high': {'total': 2, 'overdue': 1, 'ratio': 50.0},
+        'low': {'total': 2, 'overdue': 1, 'ratio': 50.0},
+        None: {'total': 1, 'overdue': 0, 'ratio': 0.0},
+    }
+    assert analytics.overdue_ratio_by_priority(datetime(2024, 3, 1, 12, 0))['low']['overdue'] == 0
+
+
+def test_completion_by_category_per_day(analytics):
+    """Задачі групуються за днем створення та категорією"""
+    assert analytics.completion_by_category_per_day() == {
+        '01.03.2024': {'робота': {'total': 2, 'completed': 1, 'rate': 50.0}},
+        '02.03.2024': {'робота': {'total': 1, 'completed': 1, 'rate': 100.0},
+                       'дім': {'total': 1, 'completed': 1, 'rate': 100.0}},
+        '03.03.2024': {'дім': {'total': 1, 'completed': 0, 'rate': 0.0}},
+    }
+    assert list(analytics.completion_by_category_per_day(days=2)) == ['02.03.2024', '03.03.2024']
+
+
+def test_report(analytics):
+    """Звіт містить усі розділи аналітики"""
+    report = analytics.get_report()
+
+    assert "Медіанний час виконання: 2 год. 0 хв." in report
+    assert "робота: 13 год. 0 хв." in report
+    assert "Без пріоритету: 1/1 (100.0%)" in report
+    assert "Недостатньо даних" not in report
+
+
+def test_empty_store_report(manager):
+    """Для порожнього сховища повертаються порожні результати та повідомлення про брак даних"""
+    pytest.importorskip('numpy')
+    analytics = TaskAnalytics(manager)
+
+    assert analytics.median_completion_time() is None
+    assert analytics.median_completion_time(by_category=True) == {}
+    assert analytics.overdue_ratio_by_priority(NOW) == {}
+    assert analytics.completion_by_category_per_day() == {}
+    assert analytics.get_report().endswith("Недостатньо даних для аналітики")
+
+
+def test_columns_are_rebuilt_after_mutation(analytics, manager):
+    """Колонки кешуються до зміни задач, після зміни будуються заново"""
+    columns = analytics.columns()
+    assert analytics.columns() is columns
+
+    manager.update_task(3, completed=False)
+    rebuilt = analytics.columns()
+    assert rebuilt is not columns
+    assert rebuilt['completed'].sum() == columns['completed'].sum() - 1
+    assert analytics.median_completion_time(by_category=True)['робота'] == 7200.0
+    assert analytics.columns() is rebuilt
+
+    assert not manager.update_task(999, completed=True)
+    assert analytics.columns() is rebuilt
+
+    manager.delete_task(1)
+    assert len(analytics.columns()['completed']) == len(TASKS) - 1
+
+
+def test_missing_numpy(manager, monkeypatch):
+    """Без numpy аналітика недоступна, а звіт повідомляє про це замість помилки"""
+    monkeypatch.setattr(task_analytics, 'np', None)
+    analytics = TaskAnalytics(manager)
+
+    assert not TaskAnalytics.available()
+    assert analytics.get_report() == "❌ Аналітика недоступна: не встановлено numpy"
+    with pytest.raises(RuntimeError):
+        analytics.columns()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import gzip
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.task_archive import TaskArchive, completion_moment
+from src.task_manager import TaskManager
+
+
+def task(task_id, completed_at, name=None):
+    return {'id': task_id, 'name': name or f'задача {task_id}', 'completed': True,
+            'created_at': '01.01.2024 09:00:00', 'completed_at': completed_at}
+
+
+def days_ago(days):
+    return (datetime.now() - timedelta(days=days)).strftime('%d.%m.%Y %H:%M:%S')
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return TaskArchive(str(tmp_path / 'archive'))
+
+
+def test_tasks_are_segmented_by_completion_month(archive):
+    assert archive.append([
+        task(1, '31.01.2024 23:59:59'),
+        task(2, '01.02.2024 00:00:00'),
+        task(3, '15.01.2024 12:00:00'),
+        # Без completed_at місяць визначається за часом створення
+        {'id': 4, 'name': 'стара', 'completed': True, 'created_at': '10.12.2023 08:00:00'},
+        # Без розпізнаних позначок часу задача пропускається
+        {'id': 5, 'name': 'без часу', 'completed': True}
+    ]) == 4
+
+    assert archive.months() == ['2023-12', '2024-01', '2024-02']
+    assert [item['id'] for item in archive.get_tasks('2024-01')] == [1, 3]
+    assert [item['id'] for item in archive.iter_tasks(start='2024-01')] == [1, 3, 2]
+    assert archive.get_task_by_id(4)['name'] == 'стара'
+    assert archive.get_task_by_id(5) is None
+    assert completion_moment({'completed_at': 'вчора'}) is None
+
+
+def test_torn_tail_is_skipped_and_repaired(archive):
+    """Обірваний останній блок пропускається під час читання і обрізається перед дописуванням"""
+    archive.append([task(1, '10.01.2024 10:00:00')])
+    path = archive._path('2024-01')
+    with open(path, 'rb') as f:
+        valid = f.read()
+    torn = gzip.compress(b'{"id":2,"name":"\xd0\xbe\xd0\xb1\xd1\x96\xd1\x80\xd0\xb2\xd0\xb0\xd0\xbd\xd0\xb0"}\n')
+    with open(path, 'ab') as f:
+        f.write(torn[:len(torn) // 2])
+
+    assert [item['id'] for item in TaskArchive(archive.archive_dir).get_tasks('2024-01')] == [1]
+
+    archive.append([task(3, '11.01.2024 10:00:00')])
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data.startswith(valid)
+    lines = gzip.decompress(data).decode('utf-8').splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [1, 3]
+    assert [item['id'] for item in archive.get_tasks('2024-01')] == [1, 3]
+
+
+def test_task_archived_twice_is_read_once(archive):
+    """Повторно заархівована задача читається один раз, з останнім станом"""
+    archive.append([task(1, '10.01.2024 10:00:00', 'перша версія'), task(2, '12.01.2024 10:00:00')])
+    archive.append([task(1, '10.01.2024 10:00:00', 'друга версія')])
+
+    tasks = archive.get_tasks('2024-01')
+    assert [item['id'] for item in tasks] == [1, 2]
+    assert tasks[0]['name'] == 'друга версія'
+
+
+def test_cache_is_refreshed_after_append(archive):
+    archive.append([task(1, '10.01.2024 10:00:00')])
+    assert len(archive.get_tasks('2024-01')) == 1
+    archive.append([task(2, '11.01.2024 10:00:00')])
+    assert len(archive.get_tasks('2024-01')) == 2
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Менеджер з виконаними задачами різного віку; архів без фонового потоку"""
+    tasks_file = tmp_path / 'tasks.json'
+    tasks_file.write_text(json.dumps({'tasks': [
+        task(1, days_ago(40)),
+        task(2, days_ago(10)),
+        dict(task(3, days_ago(60)), completed=False),
+        task(4, days_ago(31))
+    ]}, ensure_ascii=False), encoding='utf-8')
+    task_manager = TaskManager(str(tasks_file))
+    task_manager.archive = TaskArchive(str(tmp_path / 'archive'))
+    yield task_manager
+    task_manager.close()
+
+
+def test_archive_respects_older_than(manager):
+    assert manager.archive_completed(older_than=30) == 2
+    assert sorted(task['id'] for task in manager.get_all_tasks()) == [2, 3]
+    assert sorted(task['id'] for task in manager.get_archived_tasks()) == [1, 4]
+
+    assert manager.archive_completed(older_than=30) == 0
+    assert manager.archive_completed(older_than=5) == 1
+    assert sorted(task['id'] for task in manager.get_all_tasks()) == [3]
+    assert manager.get_archived_task(2)['id'] == 2
+
+
+def test_archive_write_does_not_block_writers(manager):
+    """Запис архіву виконується без блокування менеджера; задача, змінена під час запису, залишається"""
+    append = manager.archive.append
+    writing = threading.Event()
+    release = threading.Event()
+
+    def slow_append(tasks):
+        writing.set()
+        assert release.wait(5)
+        return append(tasks)
+
+    manager.archive.append = slow_append
+    result = []
+    thread = threading.Thread(target=lambda: result.append(manager.archive_completed(older_than=30)))
+    thread.start()
+    assert writing.wait(5)
+
+    # Зміни не чекають на запис архіву
+    changed = threading.Thread(target=lambda: (manager.add_task('нова'), manager.update_task(4, name='змінена')))
+    changed.start()
+    changed.join(2)
+    assert not changed.is_alive()
+
+    release.set()
+    thread.join(5)
+    assert result == [1]
+    assert sorted(task['id'] for task in manager.get_all_tasks()) == [2, 3, 4, 5]
+    assert manager.get_task_by_id(4)['name'] == 'змінена'
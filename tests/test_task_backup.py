@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src import task_backup
+from src.task_backup import TaskBackup, KIND_BASE, KIND_DELTA, parse_moment
+from src.task_manager import TaskManager
+
+
+class Clock(datetime):
+    """Керований час для імен файлів копій"""
+    current = datetime(2024, 3, 1, 10, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(task_backup, 'datetime', Clock)
+    Clock.current = datetime(2024, 3, 1, 10, 0)
+    return Clock
+
+
+@pytest.fixture
+def manager(tmp_path):
+    task_manager = TaskManager(str(tmp_path / 'tasks.json'))
+    yield task_manager
+    task_manager.close()
+
+
+def names(data):
+    """Назви та стан задач відновлених даних"""
+    return {task['id']: (task['name'], task['completed']) for task in data['tasks']}
+
+
+def current(task_manager):
+    return {task['id']: (task['name'], task['completed']) for task in task_manager.get_all_tasks()}
+
+
+def kinds(backup):
+    return [kind for _, kind, _ in backup.list_backups()]
+
+
+def test_parse_moment():
+    assert parse_moment('01.03.2024 10:30') == datetime(2024, 3, 1, 10, 30)
+    assert parse_moment('01.03.2024 10:30:15') == datetime(2024, 3, 1, 10, 30, 15)
+    # Дата без часу - кінець дня
+    assert parse_moment('01.03.2024') == datetime(2024, 3, 2) - timedelta(microseconds=1)
+    assert parse_moment('2024-03-01') is None
+
+
+def test_delta_restore_after_update_and_delete(tmp_path, manager, clock):
+    """Прирости зберігають зміни та видалення, а відновлення повертає останній стан"""
+    backup = TaskBackup(str(tmp_path / 'backup'))
+    manager.add_task('перша')
+    manager.add_task('друга')
+    manager.add_task('третя')
+    assert backup.backup(manager.snapshot())
+
+    clock.current += timedelta(minutes=1)
+    manager.mark_completed(1)
+    manager.update_task(3, name='третя (нова назва)')
+    manager.delete_task(2)
+    assert backup.backup(manager.snapshot())
+
+    clock.current += timedelta(minutes=1)
+    manager.add_task('четверта')
+    assert backup.backup(manager.snapshot())
+    # Знімок без змін не створює нової копії
+    assert backup.backup(manager.snapshot()) is None
+
+    assert kinds(backup) == [KIND_BASE, KIND_DELTA, KIND_DELTA]
+    data = backup.restore_data()
+    assert names(data) == current(manager)
+    assert data['last_id'] == 4
+    delta = TaskBackup._read(backup.list_backups()[1][2])
+    assert delta['deleted'] == [2]
+    assert sorted(task['id'] for task in delta['changed']) == [1, 3]
+
+
+def test_restore_at_past_moment(tmp_path, manager, clock):
+    """Відновлення на момент між копіями та на дату без часу"""
+    backup = TaskBackup(str(tmp_path / 'backup'))
+    manager.add_task('перша')
+    backup.backup(manager.snapshot())
+    first_state = current(manager)
+
+    clock.current = datetime(2024, 3, 1, 11, 0)
+    manager.add_task('друга')
+    backup.backup(manager.snapshot())
+    day_state = current(manager)
+
+    clock.current = datetime(2024, 3, 2, 9, 0)
+    manager.delete_task(1)
+    backup.backup(manager.snapshot())
+
+    assert names(backup.restore_data('01.03.2024 10:30')) == first_state
+    assert names(backup.restore_data('01.03.2024 11:00')) == day_state
+    assert names(backup.restore_data('01.03.2024')) == day_state
+    assert names(backup.restore_data('02.03.2024')) == current(manager)
+    # До першої повної копії відновлювати нічого
+    assert backup.restore_data('29.02.2024') is None
+    assert backup.restore_data('вчора') is None
+
+
+def test_retention_drops_old_bases_with_deltas(tmp_path, manager, clock):
+    """Старі повні копії видаляються разом з їхніми приростами"""
+    backup = TaskBackup(str(tmp_path / 'backup'), base_every=1, keep_bases=2)
+    for number in range(6):
+        clock.current += timedelta(minutes=1)
+        manager.add_task(f'задача {number}')
+        backup.backup(manager.snapshot())
+
+    backups = backup.list_backups()
+    assert [kind for _, kind, _ in backups] == [KIND_BASE, KIND_DELTA, KIND_BASE, KIND_DELTA]
+    assert backups[0][0] == datetime(2024, 3, 1, 10, 3)
+    assert names(backup.restore_data()) == current(manager)
+    # Стан до найстарішої збереженої повної копії вже недоступний
+    assert backup.restore_data('01.03.2024 10:02') is None
+    assert len(backup.restore_data('01.03.2024 10:03')['tasks']) == 3
+
+
+def test_chain_continues_after_reopen(tmp_path, manager, clock):
+    """Після перезапуску копіювання продовжує ланцюжок приростів, а не починає новий"""
+    backup_dir = str(tmp_path / 'backup')
+    backup = TaskBackup(backup_dir, base_every=2)
+    manager.add_task('перша')
+    backup.backup(manager.snapshot())
+    clock.current += timedelta(minutes=1)
+    manager.add_task('друга')
+    backup.backup(manager.snapshot())
+
+    backup = TaskBackup(backup_dir, base_every=2)
+    # Стан не змінився з останньої копії - нічого не записується
+    assert backup.backup(manager.snapshot()) is None
+
+    clock.current += timedelta(minutes=1)
+    manager.delete_task(1)
+    backup.backup(manager.snapshot())
+    assert kinds(backup) == [KIND_BASE, KIND_DELTA, KIND_DELTA]
+    assert names(backup.restore_data()) == current(manager)
+
+    # Приростів уже base_every - наступна копія повна
+    clock.current += timedelta(minutes=1)
+    manager.add_task('третя')
+    backup.backup(manager.snapshot())
+    assert kinds(backup) == [KIND_BASE, KIND_DELTA, KIND_DELTA, KIND_BASE]
+    assert names(backup.restore_data()) == current(manager)
+
+
+def test_manager_restores_backup(tmp_path):
+    """TaskManager відновлює задачі з копії, а поточний стан спершу потрапляє до копії"""
+    task_manager = TaskManager(str(tmp_path / 'tasks.json'), backup_dir=str(tmp_path / 'backup'))
+    try:
+        task_manager.add_task('перша')
+        task_manager.add_task('друга')
+        task_manager.backup.backup(task_manager.snapshot())
+        saved = current(task_manager)
+
+        task_manager.clear_all_tasks()
+        task_manager.add_task('нова')
+        assert task_manager.restore_backup()
+        assert current(task_manager) == saved
+        assert task_manager.get_task_by_name('нова') is None
+    finally:
+        task_manager.close()
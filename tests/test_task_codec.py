@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+from src import task_codec
+from src.task_codec import (
+    CODEC_JSON, CODEC_MSGPACK, FLAG_COMPLETED, FORMAT_BINARY, FORMAT_JSON,
+    decode_record, decode_tasks, encode_binary, encode_tasks, is_binary, read_layout
+)
+from src.task_manager import TaskManager
+
+CODECS = [
+    CODEC_JSON,
+    pytest.param(CODEC_MSGPACK, marks=pytest.mark.skipif(task_codec.msgpack is None,
+                                                         reason="msgpack не встановлено"))
+]
+
+
+def sample_data(count=5):
+    """Дані файлу задач з різними типами полів"""
+    tasks = []
+    for number in range(1, count + 1):
+        tasks.append({
+            'id': number,
+            'name': f'Задача №{number} "лапки" \\ ✓',
+            'completed': number % 2 == 0,
+            'created_at': '2024-01-01T10:00:00',
+            'due_date': None if number % 3 else '2024-02-01',
+            'priority': number % 4,
+            'tags': ['робота', 'дім'][:number % 3]
+        })
+    return {'tasks': tasks, 'version': 3, 'owner': 'Іван'}
+
+
+@pytest.mark.parametrize('codec', CODECS)
+@pytest.mark.parametrize('count', [0, 1, 5])
+def test_binary_round_trip(codec, count):
+    data = sample_data(count)
+    encoded = encode_binary(data, codec)
+
+    assert is_binary(encoded)
+    assert decode_tasks(encoded) == data
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_records_decode_one_by_one(codec):
+    """Кожну задачу можна прочитати окремо за таблицею зміщень"""
+    data = sample_data()
+    encoded = encode_binary(data, codec)
+    layout = read_layout(encoded)
+
+    assert layout['count'] == len(data['tasks'])
+    assert layout['meta'] == {'version': 3, 'owner': 'Іван'}
+    assert list(layout['ids']) == [task['id'] for task in data['tasks']]
+    assert [bool(flag & FLAG_COMPLETED) for flag in layout['flags']] == [task['completed'] for task in data['tasks']]
+    assert [decode_record(encoded, layout, position) for position in range(layout['count'])] == data['tasks']
+
+
+def test_tasks_without_positive_id_get_zero():
+    encoded = encode_binary({'tasks': [{'name': 'без ID'}, {'id': -1, 'name': 'від\'ємний'}]}, CODEC_JSON)
+
+    assert list(read_layout(encoded)['ids']) == [0, 0]
+
+
+def test_json_format_round_trip():
+    data = sample_data()
+    encoded = encode_tasks(data, FORMAT_JSON)
+
+    assert not is_binary(encoded)
+    assert json.loads(encoded.decode('utf-8')) == data
+    assert decode_tasks(encoded) == data
+
+
+def test_unknown_header_is_rejected():
+    encoded = bytearray(encode_binary(sample_data(), CODEC_JSON))
+    encoded[4] = 99  # Невідома версія
+
+    with pytest.raises(ValueError):
+        decode_tasks(bytes(encoded))
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_manager_reads_back_binary_file(tmp_path, lazy):
+    """Задачі, збережені у бінарному форматі, читаються назад без змін"""
+    tasks_file = str(tmp_path / 'tasks.bin')
+    task_manager = TaskManager(tasks_file, file_format=FORMAT_BINARY)
+    task_manager.add_task('перша', priority=2, category='робота')
+    task_manager.add_task('друга', due_date='2024-02-01')
+    task_manager.mark_completed(2)
+    expected = task_manager.get_all_tasks()
+    task_manager.close()
+
+    with open(tasks_file, 'rb') as f:
+        assert is_binary(f.read())
+
+    task_manager = TaskManager(tasks_file, file_format=FORMAT_BINARY, lazy=lazy)
+    try:
+        assert task_manager.get_task_by_id(2) == expected[1]
+        assert task_manager.get_all_tasks() == expected
+    finally:
+        task_manager.close()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from src.task_index import UNDATED, DueDateIndex, TextIndex, due_key, text_tokens
+
+WORDS = ['звіт', 'звітність', 'зустріч', 'задача', "п'ять", 'робота', 'Робочий', 'word', 'words', 'wordy', 'alpha']
+
+
+def brute_search(words, query, limit=None):
+    """Пошук перебором: усі слова запиту мають бути префіксами слів задачі"""
+    prefixes = text_tokens(query)
+    if not prefixes:
+        return []
+    result = [key for key in sorted(words)
+              if all(any(word.startswith(prefix) for word in words[key]) for prefix in prefixes)]
+    return result if limit is None else result[:limit]
+
+
+def random_task(rng):
+    name = ' '.join(rng.choice(WORDS) + rng.choice(['', '', str(rng.randint(0, 30))]) for _ in range(rng.randint(1, 4)))
+    return {'name': name, 'category': rng.choice([None, 'Робота', 'Особисте', 'Дім'])}
+
+
+def random_query(rng):
+    words = []
+    for _ in range(rng.randint(1, 3)):
+        word = rng.choice(WORDS + ['особ', 'дім', '1', 'x']).casefold()
+        words.append(word[:rng.randint(1, len(word))])
+    return ' '.join(words)
+
+
+def test_search_matches_brute_force():
+    """Пошук збігається з перебором після додавань, перейменувань, видалень і копій індексу"""
+    rng = random.Random(7)
+    tasks = {}
+    words = {}  # Ключ -> слова задачі для перебору
+    index = TextIndex()
+    snapshots = []
+
+    for step in range(800):
+        action = rng.random()
+        if action < 0.5 or not tasks:
+            key = max(tasks, default=0) + 1
+            tasks[key] = random_task(rng)
+            index.add(key, tasks[key])
+            words[key] = TextIndex.task_words(tasks[key])
+        elif action < 0.8:
+            key = rng.choice(list(tasks))
+            index.remove(key, tasks[key])
+            tasks[key] = random_task(rng)
+            index.add(key, tasks[key])
+            words[key] = TextIndex.task_words(tasks[key])
+        else:
+            key = rng.choice(list(tasks))
+            index.remove(key, tasks.pop(key))
+            del words[key]
+
+        if step % 50 == 0:
+            # Копія, як у знімку: подальші зміни оригіналу її не зачіпають
+            snapshots.append((dict(words), index))
+            index = index.copy()
+
+        query = random_query(rng)
+        limit = rng.choice([None, 1, 5, 11])
+        assert index.search(query, limit) == brute_search(words, query, limit), (query, limit)
+
+    for snapshot_words, snapshot_index in snapshots:
+        for _ in range(20):
+            query = random_query(rng)
+            assert snapshot_index.search(query, 11) == brute_search(snapshot_words, query, 11)
+
+    rebuilt = TextIndex()
+    rebuilt.build(tasks)
+    for _ in range(200):
+        query = random_query(rng)
+        assert rebuilt.search(query) == index.search(query) == brute_search(words, query)
+
+
+def test_search_tokens():
+    index = TextIndex()
+    index.add(1, {'name': 'Звіт за П’ять днів', 'category': 'Робота'})
+    index.add(2, {'name': 'звітність', 'category': None})
+
+    assert index.search('ЗВІТ') == [1, 2]
+    assert index.search("п'ят") == [1]
+    assert index.search('роб звіт') == [1]
+    assert index.search('звіт', limit=1) == [1]
+    assert index.search('') == []
+    assert index.search('звіт відсутнє') == []
+
+
+def test_due_key_formats():
+    """Дати DD.MM.YYYY та ISO дають однакові ключі, дата без часу - кінець або початок дня"""
+    day_end = due_key(date(2025, 3, 10))
+    day_start = due_key(date(2025, 3, 10), end_of_day=False)
+
+    assert day_end - day_start == 86399
+    assert due_key('10.03.2025') == due_key('2025-03-10') == due_key(' 10.03.2025 ') == day_end
+    assert due_key('10.03.2025', end_of_day=False) == due_key('2025-03-10', end_of_day=False) == day_start
+    assert due_key('1.3.2025') == due_key(date(2025, 3, 1))
+
+    moment = due_key(datetime(2025, 3, 10, 15, 30))
+    assert due_key('10.03.2025 15:30') == due_key('10.03.2025 15:30:00') == moment
+    assert due_key('2025-03-10T15:30:00') == due_key('2025-03-10 15:30') == moment
+    assert due_key('10.03.2025 15:30:20') == moment + 20
+    assert day_start < moment < day_end < due_key('11.03.2025 00:00')
+
+
+def test_due_key_time_zones():
+    """Момент з часовим поясом переводиться у місцевий час"""
+    moment = datetime(2025, 3, 10, 12, 0, tzinfo=timezone.utc)
+    local = moment.astimezone().replace(tzinfo=None)
+
+    assert due_key('2025-03-10T12:00:00Z') == due_key('2025-03-10T12:00:00+00:00') == due_key(local)
+    assert due_key('2025-03-10T14:00:00+02:00') == due_key(moment)
+
+
+@pytest.mark.parametrize('value', ['31.02.2025', '2025-02-30', '10.03.25', 'завтра', '10/03/2025', '', '  ',
+                                   None, 20250310])
+def test_due_key_rejects_unknown_values(value):
+    assert due_key(value) is None
+
+
+def test_due_index_ranges():
+    """Діапазони, прострочені та найближчі задачі за відсортованим індексом"""
+    tasks = {
+        1: {'due_date': '12.03.2025'},
+        2: {'due_date': '2025-03-10', 'completed': True},
+        3: {},
+        4: {'due_date': '10.03.2025 09:00'},
+        5: {'due_date': 'колись'},
+        6: {'due_date': '2025-03-11'},
+    }
+    index = DueDateIndex()
+    index.build(tasks)
+
+    start, end = due_key('10.03.2025', end_of_day=False), due_key('11.03.2025')
+    assert index.between(start, end) == [4, 2, 6]
+    assert index.between(start, end, pending_only=True) == [4, 6]
+    assert index.between(None, None) == [4, 2, 6, 1]
+    assert index.between(due_key('11.03.2025', end_of_day=False), None) == [6, 1]
+    assert index.before(due_key(datetime(2025, 3, 11, 12, 0))) == [4]
+    assert index.next_after(due_key(datetime(2025, 3, 10, 10, 0)), 5) == [6, 1]
+    assert index.next_after(0, 2) == [4, 6]
+    assert [key for _, key in index.entries()] == [4, 2, 6, 1, 3, 5]
+    assert index.entries()[-1][0] == UNDATED
+
+    # Зміни копії, як під час зміни задач після публікації знімка, не зачіпають оригінал
+    copy = index.copy()
+    copy.remove(4, tasks[4])
+    copy.add(4, {'due_date': '13.03.2025'})
+    copy.add(7, {'due_date': '09.03.2025'})
+
+    assert copy.between(None, None) == [7, 2, 6, 1, 4]
+    assert index.between(None, None) == [4, 2, 6, 1]
+    assert index.before(due_key('12.03.2025')) == [4, 6]
+
+
+def test_due_index_matches_brute_force():
+    """Запити за діапазоном збігаються з перебором після довільних змін"""
+    rng = random.Random(11)
+    first = date(2025, 3, 1)
+    tasks = {}
+    index = DueDateIndex()
+
+    def random_due():
+        day = first + timedelta(days=rng.randint(0, 20))
+        return rng.choice([None, day.strftime('%d.%m.%Y'), day.isoformat(), day.strftime('%d.%m.%Y 12:00')])
+
+    for step in range(400):
+        if rng.random() < 0.6 or not tasks:
+            key = step + 1
+            tasks[key] = {'due_date': random_due(), 'completed': rng.random() < 0.3}
+            index.add(key, tasks[key])
+        else:
+            key = rng.choice(list(tasks))
+            index.remove(key, tasks.pop(key))
+
+        start = due_key(first + timedelta(days=rng.randint(0, 20)), end_of_day=False)
+        end = due_key(first + timedelta(days=rng.randint(0, 20)))
+        pending_only = rng.random() < 0.5
+        expected = sorted((due_key(task.get('due_date')), key) for key, task in tasks.items()
+                          if task.get('due_date') and start <= due_key(task['due_date']) <= end
+                          and not (pending_only and task['completed']))
+        assert index.between(start, end, pending_only) == [key for _, key in expected]
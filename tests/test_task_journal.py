@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+
+from src.task_journal import TaskJournal, SNAPSHOT_SEQ_KEY
+from src.task_manager import TaskManager, STORAGE_JOURNAL
+
+
+def crash(task_manager):
+    """Зупинка менеджера без ущільнення журналу, як після аварійного завершення"""
+    task_manager.journal.close()
+
+
+def test_replay_drops_torn_tail(tmp_path):
+    """Обірваний останній запис відкидається, а файл обрізається до цілих записів"""
+    journal = TaskJournal(str(tmp_path / 'tasks.json'))
+    journal.append({'op': 'add', 'id': 1})
+    journal.append({'op': 'add', 'id': 2})
+    journal.close()
+    size = (tmp_path / 'tasks.json.journal').stat().st_size
+    with open(journal.journal_file, 'ab') as f:
+        f.write(b'{"op":"add","id":3,"se')
+
+    journal = TaskJournal(str(tmp_path / 'tasks.json'))
+    records = journal.replay()
+
+    assert [record['id'] for record in records] == [1, 2]
+    assert (tmp_path / 'tasks.json.journal').stat().st_size == size
+
+    # Нові записи продовжують нумерацію після останнього цілого запису
+    journal.append({'op': 'add', 'id': 3})
+    journal.close()
+    lines = (tmp_path / 'tasks.json.journal').read_bytes().splitlines()
+    assert [json.loads(line)['seq'] for line in lines] == [1, 2, 3]
+
+
+def test_replay_stops_at_corrupt_record(tmp_path):
+    """Пошкоджений запис і все, що після нього, відкидаються"""
+    journal_file = tmp_path / 'tasks.json.journal'
+    journal_file.write_bytes(b'{"op":"add","id":1,"seq":1}\n\xff\xfe garbage\n{"op":"add","id":2,"seq":2}\n')
+
+    records = TaskJournal(str(tmp_path / 'tasks.json')).replay()
+
+    assert [record['seq'] for record in records] == [1]
+    assert journal_file.read_bytes() == b'{"op":"add","id":1,"seq":1}\n'
+
+
+def test_replay_skips_records_in_snapshot(tmp_path):
+    """Записи, що вже увійшли до знімка, не застосовуються повторно"""
+    journal = TaskJournal(str(tmp_path / 'tasks.json'))
+    journal.append_many([{'op': 'add', 'id': 1}, {'op': 'add', 'id': 2}, {'op': 'add', 'id': 3}])
+    journal.close()
+
+    records = TaskJournal(str(tmp_path / 'tasks.json')).replay(after_seq=2)
+
+    assert [record['seq'] for record in records] == [3]
+
+
+def test_manager_recovers_after_crash_with_torn_tail(tmp_path):
+    """Менеджер відновлює всі цілі зміни журналу після аварійного завершення"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    task_manager = TaskManager(tasks_file, storage=STORAGE_JOURNAL)
+    task_manager.add_task('перша')
+    task_manager.add_task('друга')
+    task_manager.mark_completed(1)
+    crash(task_manager)
+    with open(tasks_file + '.journal', 'ab') as f:
+        f.write('{"op":"add","task":{"id":3,"name":"обірвана'.encode('utf-8'))
+
+    task_manager = TaskManager(tasks_file, storage=STORAGE_JOURNAL)
+    try:
+        assert [task['name'] for task in task_manager.get_all_tasks()] == ['перша', 'друга']
+        assert task_manager.get_task_by_id(1)['completed']
+        assert task_manager.add_task('третя')
+        assert task_manager.get_task_by_name('третя')['id'] == 3
+    finally:
+        task_manager.close()
+
+    # Після закриття журнал згорнуто у знімок
+    with open(tasks_file, encoding='utf-8') as f:
+        data = json.load(f)
+    assert [task['name'] for task in data['tasks']] == ['перша', 'друга', 'третя']
+    assert data[SNAPSHOT_SEQ_KEY] > 0
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+from src import task_lazy
+from src.task_codec import CODEC_JSON, FORMAT_BINARY, LENGTH, decode_tasks, encode_binary, read_layout
+from src.task_lazy import LazyTaskFile
+from src.task_manager import TaskManager
+
+
+def sample_data(count=6):
+    """Дані файлу задач: кожна третя задача виконана"""
+    tasks = [{'id': number, 'name': f'Задача {number}', 'completed': number % 3 == 0}
+             for number in range(1, count + 1)]
+    return {'tasks': tasks, 'last_id': count + 4, 'owner': 'Іван'}
+
+
+def write(path, payload):
+    with open(path, 'wb') as f:
+        f.write(payload)
+    return str(path)
+
+
+def version_1(data):
+    """Бінарний файл версії 1: без таблиці ID"""
+    encoded = bytearray(encode_binary(data, CODEC_JSON))
+    layout = read_layout(bytes(encoded))
+    ids_end = layout['records_start'] - (layout['count'] + 1) * LENGTH.size
+    del encoded[ids_end - layout['count'] * LENGTH.size:ids_end]
+    encoded[4] = 1
+    return bytes(encoded)
+
+
+@pytest.fixture
+def counted_decodes(monkeypatch):
+    """Підрахунок декодованих записів"""
+    calls = []
+    decode_record = task_lazy.decode_record
+
+    def counting(data, layout, position):
+        calls.append(position)
+        return decode_record(data, layout, position)
+
+    monkeypatch.setattr(task_lazy, 'decode_record', counting)
+    return calls
+
+
+def test_counts_and_filters_use_flag_bytes(tmp_path, counted_decodes):
+    """Лічильники рахуються без декодування, фільтр декодує лише відібрані записи"""
+    data = sample_data()
+    lazy = LazyTaskFile.open(write(tmp_path / 'tasks.bin', encode_binary(data, CODEC_JSON)))
+    try:
+        assert lazy.count == 6
+        assert lazy.completed_count == 2
+        assert lazy.meta == {'owner': 'Іван'}
+        assert lazy.last_id == 10
+        assert counted_decodes == []
+
+        assert lazy.filter_completed() == [data['tasks'][2], data['tasks'][5]]
+        assert counted_decodes == [2, 5]
+
+        del counted_decodes[:]
+        assert [task['id'] for task in lazy.filter_completed(False)] == [1, 2, 4, 5]
+        assert counted_decodes == [0, 1, 3, 4]
+        assert lazy.load_all() == data
+    finally:
+        lazy.close()
+
+
+def test_get_by_id(tmp_path, counted_decodes):
+    """Задача читається за ID окремо, відсутній ID дає None"""
+    data = sample_data()
+    lazy = LazyTaskFile.open(write(tmp_path / 'tasks.bin', encode_binary(data, CODEC_JSON)))
+    try:
+        assert lazy.get(4) == data['tasks'][3]
+        assert counted_decodes == [3]
+        assert lazy.get(999) is None
+        assert lazy.get(0) is None
+        assert counted_decodes == [3]
+    finally:
+        lazy.close()
+
+
+def test_empty_file_has_no_tasks(tmp_path):
+    lazy = LazyTaskFile.open(write(tmp_path / 'tasks.bin', encode_binary({'tasks': []}, CODEC_JSON)))
+    try:
+        assert lazy.count == lazy.completed_count == lazy.last_id == 0
+        assert lazy.filter_completed() == []
+        assert lazy.get(1) is None
+    finally:
+        lazy.close()
+
+
+@pytest.mark.parametrize('payload', [
+    json.dumps(sample_data()).encode('utf-8'),
+    version_1(sample_data()),
+    encode_binary({'tasks': [{'id': 1, 'name': 'з ID'}, {'name': 'без ID'}]}, CODEC_JSON),
+    encode_binary(sample_data(), CODEC_JSON)[:20],
+    b'NG',
+    b'',
+], ids=['json', 'version-1', 'without-id', 'truncated', 'short', 'empty'])
+def test_unsupported_files_are_not_opened(tmp_path, payload):
+    """Файли, які не можна читати ліниво, повертають None"""
+    assert LazyTaskFile.open(write(tmp_path / 'tasks.bin', payload)) is None
+
+
+def test_version_1_file_is_still_readable(tmp_path):
+    """Файл версії 1 читається менеджером повністю"""
+    data = sample_data()
+    tasks_file = write(tmp_path / 'tasks.bin', version_1(data))
+    assert decode_tasks(version_1(data)) == data
+
+    manager = TaskManager(tasks_file, file_format=FORMAT_BINARY, lazy=True)
+    try:
+        assert manager._lazy is None
+        assert manager.get_completed_count() == 2
+        assert manager.get_task_by_id(3) == data['tasks'][2]
+    finally:
+        manager.close()
+
+
+def test_missing_file(tmp_path):
+    assert LazyTaskFile.open(str(tmp_path / 'missing.bin')) is None
+
+
+def test_mutation_loads_all_tasks(tmp_path):
+    """Зміна після лінивого відкриття завантажує всі задачі та зберігає метадані й останній ID"""
+    data = sample_data()
+    tasks_file = write(tmp_path / 'tasks.bin', encode_binary(data, CODEC_JSON))
+
+    manager = TaskManager(tasks_file, file_format=FORMAT_BINARY, lazy=True)
+    try:
+        assert manager._lazy is not None
+        assert manager.get_completed_count() == 2
+        assert manager.get_pending_count() == 4
+        assert manager.get_task_by_id(6) == data['tasks'][5]
+        assert manager._lazy is not None
+
+        assert manager.add_task('Нова')
+        assert manager._lazy is None
+        assert manager.get_tasks_count() == 7
+        assert manager.get_task_by_id(11)['name'] == 'Нова'
+        assert manager.update_task(1, completed=True)
+        assert manager.get_completed_count() == 3
+    finally:
+        manager.close()
+
+    with open(tasks_file, 'rb') as f:
+        stored = decode_tasks(f.read())
+    assert stored['owner'] == 'Іван'
+    assert stored['last_id'] == 11
+    assert [task['id'] for task in stored['tasks']] == [1, 2, 3, 4, 5, 6, 11]
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import random
+import threading
+from datetime import date, datetime
+
+import pytest
+
+from src.task_index import TaskIndex, due_key
+from src.task_manager import TaskManager, STORAGE_JOURNAL
+
+CATEGORIES = [None, 'Робота', 'Дім']
+PRIORITIES = [None, 'high', 'low']
+DUE_DATES = [None, '01.03.2025', '2025-03-02', '03.03.2025 10:00']
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = TaskManager(str(tmp_path / 'tasks.json'))
+    yield manager
+    manager.close()
+
+
+def brute_query(manager, **criteria):
+    """Складений запит перебором усіх задач"""
+    return [task for task in manager.get_all_tasks()
+            if all(TaskIndex.field_value(task, field) == (bool(value) if field == 'completed' else value)
+                   for field, value in criteria.items())]
+
+
+def counted_stats(manager):
+    """Статистика, підрахована перебором усіх задач"""
+    tasks = manager.get_all_tasks()
+    completed = sum(1 for task in tasks if task.get('completed'))
+    stats = {
+        'total': len(tasks),
+        'completed': completed,
+        'pending': len(tasks) - completed,
+        'completion_rate': round(completed / len(tasks) * 100, 2) if tasks else 0
+    }
+    for field in ('category', 'priority'):
+        breakdown = stats[f'by_{field}'] = {}
+        for task in tasks:
+            counts = breakdown.setdefault(task.get(field), {'total': 0, 'completed': 0, 'pending': 0})
+            counts['total'] += 1
+            counts['completed' if task.get('completed') else 'pending'] += 1
+    return stats
+
+
+def random_changes(manager, rng, steps):
+    """Випадкові додавання, оновлення та видалення задач"""
+    for step in range(steps):
+        task_ids = [task['id'] for task in manager.get_all_tasks()]
+        action = rng.random()
+        if action < 0.5 or not task_ids:
+            manager.add_task(f'Задача {step}', completed=rng.random() < 0.3, due_date=rng.choice(DUE_DATES),
+                             priority=rng.choice(PRIORITIES), category=rng.choice(CATEGORIES))
+        elif action < 0.85:
+            field = rng.choice(['completed', 'category', 'priority', 'due_date'])
+            value = {'completed': rng.random() < 0.5, 'category': rng.choice(CATEGORIES),
+                     'priority': rng.choice(PRIORITIES), 'due_date': rng.choice(DUE_DATES)}[field]
+            manager.update_task(rng.choice(task_ids), **{field: value})
+        else:
+            manager.delete_task(rng.choice(task_ids))
+
+
+def test_duplicate_names_are_rejected(manager):
+    """Задачу з наявною назвою не можна додати або отримати перейменуванням"""
+    assert manager.add_task('Звіт')
+    assert manager.add_task('Лист')
+    assert not manager.add_task('Звіт')
+    assert manager.add_task('звіт')
+
+    assert manager.get_task_by_name('Звіт')['id'] == 1
+    assert manager.get_task_by_name('звіт')['id'] == 3
+    assert manager.get_task_by_name('Немає') is None
+
+    assert not manager.update_task(2, name='Звіт')
+    assert manager.update_task(1, name='Звіт', priority='high')
+    assert manager.get_tasks_count() == 3
+
+
+def test_renamed_and_deleted_names_are_released(manager):
+    """Після перейменування чи видалення стара назва знову вільна"""
+    manager.add_task('Звіт')
+    manager.add_task('Лист')
+
+    assert manager.update_task_by_name('Звіт', name='Квартальний звіт')
+    assert manager.get_task_by_name('Звіт') is None
+    assert manager.get_task_by_name('Квартальний звіт')['id'] == 1
+    assert manager.add_task('Звіт')
+
+    assert manager.delete_task(2)
+    assert manager.get_task_by_name('Лист') is None
+    assert manager.add_task('Лист')
+    assert not manager.update_task_by_name('Немає', completed=True)
+
+
+def test_normalized_names(tmp_path):
+    """З normalize_names назви порівнюються без урахування регістру та зайвих пробілів"""
+    manager = TaskManager(str(tmp_path / 'tasks.json'), normalize_names=True)
+    try:
+        assert manager.add_task('Квартальний  звіт')
+        assert not manager.add_task(' квартальний ЗВІТ ')
+        assert manager.get_task_by_name('КВАРТАЛЬНИЙ звіт')['name'] == 'Квартальний  звіт'
+
+        assert manager.add_task('Лист')
+        assert not manager.update_task(2, name='квартальний звіт')
+        assert manager.update_task(1, name='КВАРТАЛЬНИЙ ЗВІТ')
+        assert manager.get_task_by_name('квартальний звіт')['name'] == 'КВАРТАЛЬНИЙ ЗВІТ'
+        assert manager.update_task_by_name('  лист', completed=True)
+        assert manager.get_task_by_id(2)['completed'] is True
+    finally:
+        manager.close()
+
+
+def test_name_index_after_rollback_and_reopen(tmp_path):
+    """Індекс назв відновлюється після відкату пакета та відтворення журналу"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    manager = TaskManager(tasks_file, storage=STORAGE_JOURNAL)
+    manager.add_task('Звіт')
+
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            assert manager.add_task('Лист')
+            assert manager.update_task(1, name='Старий звіт')
+            raise RuntimeError('скасування')
+
+    assert manager.get_task_by_name('Звіт')['id'] == 1
+    assert manager.get_task_by_name('Лист') is None
+    assert manager.get_task_by_name('Старий звіт') is None
+    assert not manager.add_task('Звіт')
+    assert manager.add_task('Лист')
+    assert manager.update_task(1, name='Новий звіт')
+    # Зупинка без ущільнення: стан відновлюється відтворенням журналу
+    manager.journal.close()
+
+    reopened = TaskManager(tasks_file, storage=STORAGE_JOURNAL)
+    try:
+        assert reopened.get_task_by_name('Звіт') is None
+        assert reopened.get_task_by_name('Новий звіт')['id'] == 1
+        assert not reopened.add_task('Лист')
+    finally:
+        reopened.close()
+
+
+def test_query_tasks_matches_brute_force(manager):
+    """Складені запити за індексами збігаються з перебором після довільних змін"""
+    rng = random.Random(4)
+    random_changes(manager, rng, 300)
+
+    queries = [{}, {'completed': False}, {'completed': 1}, {'category': 'Робота'}, {'priority': None},
+               {'due_date': '2025-03-02'}, {'completed': False, 'priority': 'high'},
+               {'completed': True, 'category': 'Дім', 'priority': 'low'}, {'category': 'Немає'}]
+    for criteria in queries:
+        assert manager.query_tasks(**criteria) == brute_query(manager, **criteria), criteria
+
+    for value in CATEGORIES:
+        assert manager.filter_tasks_by_category(value) == brute_query(manager, category=value)
+    for value in PRIORITIES:
+        assert manager.filter_tasks_by_priority(value) == brute_query(manager, priority=value)
+    assert manager.get_completed_tasks() == brute_query(manager, completed=True)
+    assert manager.get_pending_tasks() == brute_query(manager, completed=False)
+
+
+def test_query_tasks_keeps_creation_order(manager):
+    """Результат запиту впорядковано за створенням, зміна задачі не переміщує її"""
+    for number in range(5):
+        manager.add_task(f'Задача {number}', priority='high')
+    manager.update_task(2, completed=True)
+    manager.update_task(2, completed=False, category='Дім')
+
+    assert [task['id'] for task in manager.query_tasks(priority='high', completed=False)] == [1, 2, 3, 4, 5]
+    assert [task['id'] for task in manager.query_tasks(category='Дім')] == [2]
+
+
+def test_query_snapshot_is_not_changed(manager):
+    """Знімок, отриманий до зміни, повертає попередні результати запитів"""
+    manager.add_task('Звіт', priority='high')
+    manager.add_task('Лист', priority='high')
+    snapshot = manager.snapshot()
+
+    manager.update_task(1, priority='low')
+    manager.delete_task(2)
+
+    assert [task['id'] for task in snapshot.query_tasks(priority='high')] == [1, 2]
+    assert snapshot.query_tasks(priority='low') == []
+    assert [task['id'] for task in manager.query_tasks(priority='low')] == [1]
+    assert manager.query_tasks(priority='high') == []
+
+
+def test_query_unknown_field(manager):
+    manager.add_task('Звіт')
+
+    with pytest.raises(ValueError):
+        manager.query_tasks(name='Звіт')
+
+
+def test_stats_follow_every_change(manager):
+    """Лічильники статистики збігаються з підрахунком після кожної зміни"""
+    rng = random.Random(5)
+    assert manager.get_stats() == counted_stats(manager)
+    for _ in range(150):
+        random_changes(manager, rng, 1)
+        assert manager.get_stats() == counted_stats(manager)
+
+    assert manager.clear_completed_tasks()
+    assert manager.get_stats() == counted_stats(manager)
+    assert manager.get_stats()['completed'] == 0
+
+    assert manager.clear_all_tasks()
+    assert manager.get_stats() == counted_stats(manager)
+    assert manager.get_stats()['by_category'] == {}
+
+
+def test_stats_after_batch_rollback(manager, monkeypatch):
+    """Після відкату пакета лічильники повертаються до стану до пакета"""
+    manager.add_task('Звіт', category='Робота', priority='high')
+    manager.add_task('Лист', completed=True, category='Робота')
+    manager.add_task('Покупки', category='Дім')
+    before = manager.get_stats()
+
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.mark_completed(1)
+            manager.update_task(3, category='Робота', priority='low')
+            manager.delete_task(2)
+            manager.add_task('Нова', completed=True)
+            raise RuntimeError('скасування')
+    assert manager.get_stats() == before
+
+    monkeypatch.setattr(manager, 'save_tasks', lambda: False)
+    with manager.batch() as batch:
+        manager.mark_completed(3)
+        manager.clear_completed_tasks()
+    assert not batch.committed
+    assert manager.get_stats() == before == counted_stats(manager)
+
+    monkeypatch.undo()
+    manager.mark_completed(3)
+    assert manager.get_stats() == counted_stats(manager)
+    assert manager.get_stats()['by_category']['Дім'] == {'total': 1, 'completed': 1, 'pending': 0}
+
+
+def test_stats_values(manager):
+    manager.add_task('Звіт', category='Робота', priority='high')
+    manager.add_task('Лист', completed=True, category='Робота')
+    manager.add_task('Покупки')
+
+    assert manager.get_stats() == {
+        'total': 3,
+        'completed': 1,
+        'pending': 2,
+        'completion_rate': 33.33,
+        'by_category': {'Робота': {'total': 2, 'completed': 1, 'pending': 1},
+                        None: {'total': 1, 'completed': 0, 'pending': 1}},
+        'by_priority': {'high': {'total': 1, 'completed': 0, 'pending': 1},
+                        None: {'total': 2, 'completed': 1, 'pending': 1}}
+    }
+
+
+def test_stats_after_journal_replay(tmp_path):
+    """Лічильники відновлюються з журналу змін"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    manager = TaskManager(tasks_file, storage=STORAGE_JOURNAL)
+    random_changes(manager, random.Random(6), 60)
+    expected = manager.get_stats()
+    # Зупинка без ущільнення: стан відновлюється відтворенням журналу
+    manager.journal.close()
+
+    reopened = TaskManager(tasks_file, storage=STORAGE_JOURNAL)
+    try:
+        assert reopened.get_stats() == expected == counted_stats(reopened)
+    finally:
+        reopened.close()
+
+
+def stored_names(tasks_file):
+    with open(tasks_file, encoding='utf-8') as f:
+        return [task['name'] for task in json.load(f)['tasks']]
+
+
+def test_batch_commits_with_one_write(tmp_path):
+    """Зміни пакета записуються одним збереженням, читання бачать їх лише після завершення"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    manager = TaskManager(tasks_file)
+    try:
+        manager.add_task('Звіт')
+        writes = manager._persist.writes
+        seen = []
+
+        with manager.batch() as batch:
+            assert manager.add_task('Лист')
+            assert manager.add_task('Покупки')
+            assert manager.mark_completed(1)
+            assert not manager.add_task('Лист')
+            assert manager.get_tasks_count() == 1
+            reader = threading.Thread(target=lambda: seen.append(manager.get_tasks_count()))
+            reader.start()
+            reader.join(5)
+            assert manager._persist.writes == writes
+
+        assert batch.committed
+        assert seen == [1]
+        assert manager._persist.writes == writes + 1
+        assert stored_names(tasks_file) == ['Звіт', 'Лист', 'Покупки']
+        assert manager.get_task_by_id(1)['completed'] is True
+
+        with manager.batch() as batch:
+            pass
+        assert batch.committed
+        assert manager._persist.writes == writes + 1
+    finally:
+        manager.close()
+
+
+def test_batch_rollback_on_exception(tmp_path):
+    """Виняток у пакеті скасовує всі його зміни, а файл не перезаписується"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    manager = TaskManager(tasks_file)
+    try:
+        manager.add_task('Звіт')
+        manager.add_task('Лист')
+        before = manager.get_all_tasks()
+        writes = manager._persist.writes
+
+        with pytest.raises(RuntimeError):
+            with manager.batch() as batch:
+                manager.add_task('Покупки')
+                manager.update_task(1, name='Новий звіт', completed=True)
+                manager.delete_task(2)
+                raise RuntimeError('скасування')
+
+        assert not batch.committed
+        assert manager.get_all_tasks() == before
+        assert manager._persist.writes == writes
+        assert stored_names(tasks_file) == ['Звіт', 'Лист']
+
+        # ID скасованої задачі видається знову
+        assert manager.add_task('Покупки')
+        assert manager.get_task_by_name('Покупки')['id'] == 3
+    finally:
+        manager.close()
+
+
+def test_batch_rollback_on_failed_save(manager, monkeypatch):
+    """Якщо збереження пакета не вдалося, зміни скасовуються без винятку"""
+    manager.add_task('Звіт')
+    before = manager.get_all_tasks()
+
+    monkeypatch.setattr(manager, 'save_tasks', lambda: False)
+    with manager.batch() as batch:
+        assert manager.add_task('Лист')
+        assert manager.clear_all_tasks()
+    assert not batch.committed
+    assert manager.get_all_tasks() == before
+
+    monkeypatch.undo()
+    with manager.batch() as batch:
+        assert manager.add_task('Лист')
+    assert batch.committed
+    assert manager.get_tasks_count() == 2
+
+
+def test_nested_batches_join_outer(tmp_path):
+    """Вкладений пакет є частиною зовнішнього: один запис і спільний відкат"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    manager = TaskManager(tasks_file)
+    try:
+        writes = manager._persist.writes
+        with manager.batch() as outer:
+            manager.add_task('Звіт')
+            with manager.batch() as inner:
+                manager.add_task('Лист')
+            assert inner is outer
+            assert manager._persist.writes == writes
+            manager.add_task('Покупки')
+        assert outer.committed
+        assert manager._persist.writes == writes + 1
+        assert stored_names(tasks_file) == ['Звіт', 'Лист', 'Покупки']
+
+        with pytest.raises(RuntimeError):
+            with manager.batch():
+                manager.delete_task(1)
+                with manager.batch():
+                    manager.add_task('Нова')
+                    raise RuntimeError('скасування')
+        assert [task['name'] for task in manager.get_all_tasks()] == ['Звіт', 'Лист', 'Покупки']
+        assert manager._persist.writes == writes + 1
+    finally:
+        manager.close()
+
+
+def test_journal_batch_is_one_append(tmp_path, monkeypatch):
+    """У режимі журналу пакет додається до журналу одним записом і відтворюється повністю"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    manager = TaskManager(tasks_file, storage=STORAGE_JOURNAL)
+    appends = []
+    append_many = manager.journal.append_many
+    monkeypatch.setattr(manager.journal, 'append_many', lambda records: appends.append(len(records))
+                        or append_many(records))
+
+    with manager.batch() as batch:
+        for number in range(5):
+            manager.add_task(f'Задача {number}')
+        manager.mark_completed(2)
+    assert batch.committed
+    assert appends == [6]
+    manager.journal.close()
+
+    reopened = TaskManager(tasks_file, storage=STORAGE_JOURNAL)
+    try:
+        assert reopened.get_tasks_count() == 5
+        assert reopened.get_completed_count() == 1
+        assert reopened.get_task_by_id(2)['completed'] is True
+    finally:
+        reopened.close()
+
+
+def due_names(tasks):
+    return [task['name'] for task in tasks]
+
+
+@pytest.fixture
+def dated(manager):
+    """Задачі з датами виконання у різних форматах"""
+    manager.add_task('Звіт', due_date='12.03.2025')
+    manager.add_task('Лист', due_date='2025-03-10', completed=True)
+    manager.add_task('Без дати')
+    manager.add_task('Дзвінок', due_date='10.03.2025 09:00')
+    manager.add_task('Колись', due_date='колись')
+    manager.add_task('Покупки', due_date='2025-03-11')
+    return manager
+
+
+def test_tasks_due_between(dated):
+    """Межі діапазону включні та приймаються у форматах DD.MM.YYYY, ISO, date і datetime"""
+    assert due_names(dated.tasks_due_between('10.03.2025', '11.03.2025')) == ['Дзвінок', 'Лист', 'Покупки']
+    assert due_names(dated.tasks_due_between('2025-03-10', '2025-03-11')) == ['Дзвінок', 'Лист', 'Покупки']
+    assert due_names(dated.tasks_due_between(date(2025, 3, 10), date(2025, 3, 11), pending_only=True)) == \
+        ['Дзвінок', 'Покупки']
+    assert due_names(dated.tasks_due_between(datetime(2025, 3, 10, 10, 0), '2025-03-12T00:00')) == \
+        ['Лист', 'Покупки']
+    assert due_names(dated.tasks_due_between(start='11.03.2025')) == ['Покупки', 'Звіт']
+    assert due_names(dated.tasks_due_between(end='10.03.2025')) == ['Дзвінок', 'Лист']
+    assert due_names(dated.tasks_due_between()) == ['Дзвінок', 'Лист', 'Покупки', 'Звіт']
+    assert dated.tasks_due_between('12.03.2025', '10.03.2025') == []
+
+
+def test_tasks_due_between_invalid_bounds(dated):
+    assert dated.tasks_due_between('завтра', '12.03.2025') == []
+    assert dated.tasks_due_between('10.03.2025', '31.02.2025') == []
+
+
+def test_overdue_and_next_due(dated):
+    """Прострочені та найближчі задачі рахуються від вказаного моменту без виконаних задач"""
+    now = datetime(2025, 3, 11, 12, 0)
+
+    assert due_names(dated.overdue(now)) == ['Дзвінок']
+    assert due_names(dated.overdue(datetime(2025, 3, 10, 9, 0))) == []
+    assert due_names(dated.overdue(datetime(2025, 3, 10, 9, 1))) == ['Дзвінок']
+    # Дата без часу - термін до кінця дня, тому задача на сьогодні ще не прострочена
+    assert due_names(dated.next_due(5, now)) == ['Покупки', 'Звіт']
+    assert due_names(dated.next_due(1, datetime(2025, 3, 1))) == ['Дзвінок']
+    assert due_names(dated.next_due(5, datetime(2025, 3, 1))) == ['Дзвінок', 'Покупки', 'Звіт']
+
+
+def test_due_queries_follow_changes(dated):
+    """Зміна дати, статусу та видалення задачі одразу враховуються в запитах за датою"""
+    snapshot = dated.snapshot()
+    now = datetime(2025, 3, 11, 12, 0)
+
+    assert dated.update_task(1, due_date='09.03.2025')
+    assert dated.mark_completed(4)
+    assert dated.mark_completed(2, completed=False)
+    assert dated.update_task(3, due_date='2025-03-10')
+    assert dated.delete_task(6)
+
+    assert due_names(dated.overdue(now)) == ['Звіт', 'Лист', 'Без дати']
+    assert due_names(dated.tasks_due_between('10.03.2025', '12.03.2025')) == ['Дзвінок', 'Лист', 'Без дати']
+    assert due_names(snapshot.overdue(due_key(now))) == ['Дзвінок']
+
+    with pytest.raises(RuntimeError):
+        with dated.batch():
+            dated.update_task(5, due_date='01.01.2025')
+            raise RuntimeError('скасування')
+    assert due_names(dated.overdue(now)) == ['Звіт', 'Лист', 'Без дати']
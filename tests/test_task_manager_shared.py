@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import multiprocessing
+
+from src.task_manager import TaskManager
+from src.task_persistence import DURABILITY_INTERVAL
+
+
+def open_shared(tasks_file, **kwargs):
+    """Менеджер спільного файлу задач"""
+    return TaskManager(tasks_file, shared=True, **kwargs)
+
+
+def open_delayed(tasks_file):
+    """Менеджер спільного файлу, що тримає зміни в пам'яті до flush()"""
+    return open_shared(tasks_file, durability=DURABILITY_INTERVAL, commit_interval=3600)
+
+
+def read_names(tasks_file):
+    """Назви задач у файлі за ID"""
+    with open(tasks_file, encoding='utf-8') as f:
+        return {task['id']: task['name'] for task in json.load(f)['tasks']}
+
+
+def test_reads_pick_up_other_process_changes(tmp_path):
+    """Зміни, записані іншим процесом, видно під час наступного читання"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    first = open_shared(tasks_file)
+    second = open_shared(tasks_file)
+    try:
+        first.add_task('перша')
+        assert second.get_task_by_name('перша') is not None
+
+        second.mark_completed(1)
+        assert first.get_task_by_id(1)['completed']
+    finally:
+        first.close()
+        second.close()
+
+
+def test_unsynced_changes_are_merged_with_new_ids(tmp_path):
+    """Незбережені задачі отримують вільні ID, якщо їхні ID зайняв інший процес"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    first = open_delayed(tasks_file)
+    second = open_shared(tasks_file)
+    try:
+        first.add_task('з першого')
+        second.add_task('з другого')
+        second.add_task('ще з другого')
+        assert first.flush(5)
+
+        assert read_names(tasks_file) == {1: 'з другого', 2: 'ще з другого', 3: 'з першого'}
+        assert first.get_task_by_name('з першого')['id'] == 3
+        assert second.get_task_by_name('з першого')['id'] == 3
+    finally:
+        first.close()
+        second.close()
+
+
+def test_update_follows_remapped_id(tmp_path):
+    """Зміна задачі, що отримала новий ID під час об'єднання, застосовується до неї"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    first = open_delayed(tasks_file)
+    second = open_shared(tasks_file)
+    try:
+        first.add_task('звіт')
+        first.mark_completed(1)
+        second.add_task('лист')
+        assert first.flush(5)
+
+        assert second.get_task_by_name('звіт')['id'] == 2
+        assert second.get_task_by_name('звіт')['completed']
+        assert not second.get_task_by_name('лист')['completed']
+    finally:
+        first.close()
+        second.close()
+
+
+def test_same_name_is_not_duplicated(tmp_path):
+    """Задача з назвою, яку вже додав інший процес, не дублюється"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    first = open_delayed(tasks_file)
+    second = open_shared(tasks_file)
+    try:
+        first.add_task('звіт')
+        second.add_task('звіт')
+        assert first.flush(5)
+
+        assert list(read_names(tasks_file).values()) == ['звіт']
+        assert first.get_tasks_count() == 1
+    finally:
+        first.close()
+        second.close()
+
+
+def test_changes_to_task_deleted_elsewhere_are_dropped(tmp_path):
+    """Зміна задачі, яку інший процес видалив, відкидається"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    setup = open_shared(tasks_file)
+    setup.add_task('звіт')
+    setup.close()
+
+    first = open_delayed(tasks_file)
+    second = open_shared(tasks_file)
+    try:
+        first.mark_completed(1)
+        second.delete_task(1)
+        assert first.flush(5)
+
+        assert read_names(tasks_file) == {}
+        assert first.get_task_by_id(1) is None
+    finally:
+        first.close()
+        second.close()
+
+
+def add_tasks(tasks_file, prefix, count):
+    """Додавання задач з окремого процесу"""
+    task_manager = open_shared(tasks_file)
+    for number in range(count):
+        task_manager.add_task(f'{prefix}-{number}')
+    task_manager.close()
+
+
+def test_processes_do_not_lose_tasks(tmp_path):
+    """Задачі, що паралельно додають кілька процесів, не губляться і мають різні ID"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    processes = [multiprocessing.Process(target=add_tasks, args=(tasks_file, f'п{number}', 20))
+                 for number in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    names = read_names(tasks_file)
+    assert sorted(names.values()) == sorted(f'п{process}-{number}' for process in range(4) for number in range(20))
+    assert sorted(names) == list(range(1, 81))
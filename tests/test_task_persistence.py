@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+
+import pytest
+
+from src.task_manager import TaskManager
+from src.task_persistence import (PersistScheduler, write_atomic, DURABILITY_ALWAYS, DURABILITY_GROUP,
+                                  DURABILITY_INTERVAL)
+
+
+class Writer:
+    """Функція запису, яку можна зупинити або змусити повернути помилку"""
+
+    def __init__(self, results=None):
+        self.calls = 0
+        self.results = list(results or [])
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+
+    def __call__(self):
+        self.started.set()
+        assert self.release.wait(5)
+        self.calls += 1
+        return self.results.pop(0) if self.results else True
+
+
+def test_concurrent_adds_are_on_disk_after_close(tmp_path):
+    """Усі паралельні зміни з політикою group записано після close(), і записів менше, ніж змін"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    manager = TaskManager(tasks_file, durability=DURABILITY_GROUP, commit_window=0.05)
+    barrier = threading.Barrier(8)
+
+    def add(thread):
+        barrier.wait()
+        for number in range(25):
+            assert manager.add_task(f'потік {thread} задача {number}')
+
+    threads = [threading.Thread(target=add, args=(thread,)) for thread in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager.close()
+
+    with open(tasks_file, encoding='utf-8') as f:
+        tasks = json.load(f)['tasks']
+    assert len(tasks) == 200
+    assert sorted(task['id'] for task in tasks) == list(range(1, 201))
+    assert manager._persist.writes < 200
+
+
+def test_flush_times_out_while_write_is_stalled():
+    writer = Writer()
+    writer.release.clear()
+    scheduler = PersistScheduler(writer, policy=DURABILITY_GROUP, window=0.01)
+    try:
+        assert scheduler.request() is True
+        assert writer.started.wait(5)
+        assert scheduler.flush(0.2) is False
+
+        writer.release.set()
+        assert scheduler.flush(5) is True
+        assert writer.calls == 1
+    finally:
+        writer.release.set()
+        scheduler.close(5)
+
+
+def test_interval_policy_writes_on_flush_and_close():
+    writer = Writer()
+    scheduler = PersistScheduler(writer, policy=DURABILITY_INTERVAL, interval=3600)
+    for _ in range(3):
+        scheduler.request()
+    # Інтервал ще не минув
+    assert not writer.started.wait(0.1)
+
+    # flush() записує одразу, одним записом для всіх запитів
+    assert scheduler.flush(5) is True
+    assert writer.calls == 1
+
+    scheduler.request()
+    assert scheduler.close(5) is True
+    assert writer.calls == 2
+
+
+def test_close_without_pending_changes_does_not_write():
+    writer = Writer()
+    scheduler = PersistScheduler(writer, policy=DURABILITY_GROUP)
+    assert scheduler.close(5) is True
+    assert writer.calls == 0
+
+
+def test_failed_write_is_retried():
+    writer = Writer(results=[False, True])
+    scheduler = PersistScheduler(writer, policy=DURABILITY_GROUP, window=0.01)
+    try:
+        assert scheduler.request(wait=False)
+        assert scheduler.flush(5) is True
+        assert writer.calls == 2
+    finally:
+        scheduler.close(5)
+
+
+def test_always_policy_writes_synchronously():
+    writer = Writer(results=[True, False])
+    scheduler = PersistScheduler(writer, policy=DURABILITY_ALWAYS)
+    assert scheduler.request() is True
+    assert scheduler.request() is False
+    assert writer.calls == 2
+    assert scheduler.flush(0) is True
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        PersistScheduler(Writer(), policy='sometimes')
+
+
+def test_write_atomic_replaces_file(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    write_atomic(path, 'перший')
+    write_atomic(path, b'second')
+    with open(path, 'rb') as f:
+        assert f.read() == b'second'
+    assert os.listdir(str(tmp_path)) == ['tasks.json']
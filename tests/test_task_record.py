@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import sys
+
+import pytest
+
+from src.task_codec import FORMAT_BINARY, load_tasks_file
+from src.task_manager import TaskManager, STORAGE_JOURNAL
+from src.task_record import Task, parse_timestamp, format_timestamp
+
+
+def task_data(**fields):
+    data = {'id': 1, 'name': 'Звіт', 'completed': False, 'due_date': '01.02.2024', 'priority': 'high',
+            'category': 'робота', 'created_at': '31.01.2024 09:15:00'}
+    data.update(fields)
+    return data
+
+
+def test_task_equals_dict():
+    """Запис дорівнює словнику з тими самими полями та перетворюється у нього"""
+    data = task_data(tags=['a'])
+    task = Task(data)
+
+    assert task == data
+    assert data == task
+    assert dict(task) == data
+    assert task.to_dict() == data
+    assert task.copy() == data and type(task.copy()) is dict
+    assert task != task_data(name='Інша')
+    assert len(task) == len(data)
+    assert set(task) == set(data)
+
+
+def test_missing_fields_behave_like_absent_keys():
+    """Відсутні поля не видно через in, get та ітерацію, а доступ до них дає KeyError"""
+    task = Task({'id': 3, 'name': 'Без дати'})
+
+    assert 'due_date' not in task
+    assert task.get('due_date') is None
+    assert task.get('due_date', 'немає') == 'немає'
+    assert list(task) == ['id', 'name']
+    with pytest.raises(KeyError):
+        task['due_date']
+    with pytest.raises(KeyError):
+        del task['due_date']
+
+    task['due_date'] = None
+    assert 'due_date' in task and task['due_date'] is None
+    del task['due_date']
+    assert 'due_date' not in task
+
+
+def test_extra_keys():
+    """Невідомі поля зберігаються окремо та поводяться як ключі словника"""
+    task = Task(task_data(tags=['a'], note='текст'))
+
+    assert task['tags'] == ['a']
+    assert task.get('note') == 'текст'
+    assert task.get('other', 0) == 0
+    assert list(task)[-2:] == ['tags', 'note']
+
+    task.update(note='інший', owner=7)
+    assert task['note'] == 'інший' and task['owner'] == 7
+
+    del task['tags']
+    del task['note']
+    del task['owner']
+    assert task._extra is None
+    assert task == task_data()
+    with pytest.raises(KeyError):
+        task['note']
+    with pytest.raises(KeyError):
+        del task['note']
+
+
+def test_timestamp_round_trip():
+    """Позначки часу зберігаються числами, а читаються тим самим рядком"""
+    value = '29.02.2024 23:59:58'
+    task = Task(task_data(created_at=value))
+
+    assert isinstance(task.created_at, int)
+    assert task['created_at'] == value
+    assert task.get('created_at') == value
+    assert format_timestamp(parse_timestamp(value)) == value
+    assert parse_timestamp('01.01.1970 00:00:00') == 0
+
+    task['updated_at'] = '01.03.2024 00:00:00'
+    assert task.updated_at - task.created_at == 2
+    assert task.to_dict()['updated_at'] == '01.03.2024 00:00:00'
+
+
+@pytest.mark.parametrize('value', [
+    '2024-02-01 10:00:00',
+    '31.02.2024 10:00:00',
+    '01.02.2024 24:00:00',
+    '01.02.2024 10:60:00',
+    '01.02.2024 10:00',
+    '01.02.2024T10:00:00',
+    '０1.02.2024 10:00:00',
+    '',
+    None,
+])
+def test_unknown_timestamps_are_kept(value):
+    """Значення, що не відповідають формату, зберігаються як є"""
+    task = Task(task_data(completed_at=value))
+
+    assert task['completed_at'] == value
+    assert task.to_dict()['completed_at'] == value
+    assert parse_timestamp(value) is value
+
+
+def test_priority_and_category_are_interned():
+    """Пріоритет та категорія з різних джерел стають одним об'єктом рядка"""
+    category = ''.join(['робо', 'та'])
+    first = Task(json.loads(json.dumps(task_data())))
+    second = Task(task_data(id=2, category=category, priority=''.join(['hi', 'gh'])))
+
+    assert first['category'] is second['category'] is sys.intern('робота')
+    assert first['priority'] is second['priority']
+
+    first['category'] = ''.join(['ді', 'м'])
+    assert first['category'] is sys.intern('дім')
+
+
+def test_compact_manager_stores_task_records(tmp_path):
+    """Менеджер з compact=True зберігає записи Task і віддає задачі як словники"""
+    manager = TaskManager(str(tmp_path / 'tasks.json'), compact=True)
+    manager.add_task('Звіт', due_date='01.02.2024', priority='high', category='робота')
+    manager.update_task(1, completed=True)
+
+    task = manager.snapshot().tasks[1]
+    assert isinstance(task, Task)
+    assert task['completed'] is True
+    assert isinstance(task.created_at, int)
+    manager.close()
+
+    with open(tmp_path / 'tasks.json', encoding='utf-8') as f:
+        stored = json.load(f)['tasks'][0]
+    assert stored['created_at'] == task['created_at']
+    assert stored['completed'] is True
+
+
+def test_batch_rollback_keeps_task_records(tmp_path, monkeypatch):
+    """Після відкату пакета задачі знову є записами Task з попередніми значеннями"""
+    manager = TaskManager(str(tmp_path / 'tasks.json'), compact=True)
+    manager.add_task('Звіт', priority='high')
+    manager.add_task('Лист', priority='low')
+    before = {task_id: task.to_dict() for task_id, task in manager.snapshot().tasks.items()}
+
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.update_task(1, name='Змінено', priority='low')
+            manager.delete_task(2)
+            raise RuntimeError('скасування')
+
+    monkeypatch.setattr(manager, 'save_tasks', lambda: False)
+    with manager.batch() as batch:
+        manager.update_task(1, category='дім')
+        manager.add_task('Нова')
+    assert not batch.committed
+
+    tasks = manager.snapshot().tasks
+    assert all(isinstance(task, Task) for task in tasks.values())
+    assert {task_id: task.to_dict() for task_id, task in tasks.items()} == before
+
+    monkeypatch.undo()
+    manager.update_task(1, completed=True)
+    assert isinstance(manager.snapshot().tasks[1], Task)
+    assert manager.snapshot().tasks[1]['completed'] is True
+    manager.close()
+
+
+@pytest.mark.parametrize('options', [
+    {'storage': STORAGE_JOURNAL},
+    {'file_format': FORMAT_BINARY},
+    {'storage': STORAGE_JOURNAL, 'file_format': FORMAT_BINARY},
+])
+def test_compact_records_survive_reopen(tmp_path, options):
+    """Задачі з compact=True однаково зберігаються журналом та у бінарному форматі"""
+    tasks_file = str(tmp_path / 'tasks.json')
+    manager = TaskManager(tasks_file, compact=True, **options)
+    manager.add_task('Звіт', due_date='01.02.2024', priority='high', category='робота')
+    manager.add_task('Лист')
+    manager.update_task(1, completed=True)
+    manager.delete_task(2)
+    expected = manager.tasks['tasks']
+    manager.close()
+
+    data = load_tasks_file(tasks_file)
+    assert data['tasks'] == expected
+
+    reopened = TaskManager(tasks_file, compact=True, **options)
+    task = reopened.snapshot().tasks[1]
+    assert isinstance(task, Task)
+    assert reopened.tasks['tasks'] == expected
+    assert task['created_at'] == expected[0]['created_at']
+    assert reopened.snapshot().tasks[1]['category'] is sys.intern('робота')
+    reopened.close()
+
+    plain = TaskManager(tasks_file, **options)
+    assert plain.tasks['tasks'] == expected
+    assert type(plain.snapshot().tasks[1]) is dict
+    plain.close()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+from src.task_shards import TaskShards
+
+
+def test_evicted_shard_is_closed_and_reopened(tmp_path):
+    """Витіснене сховище закривається (з викликом on_close) і відкривається з тими самими задачами"""
+    closed = []
+    shards = TaskShards(str(tmp_path / 'shards'), max_open=2, on_close=closed.append)
+    try:
+        with shards.use(1) as first:
+            first.add_task('задача 1')
+        with shards.use(2) as task_manager:
+            task_manager.add_task('задача 2')
+        with shards.use(3) as task_manager:
+            task_manager.add_task('задача 3')
+
+        assert closed == [first]
+        assert shards.open_count() == 2
+        with shards.use(1) as task_manager:
+            assert task_manager is not first
+            assert [task['name'] for task in task_manager.get_all_tasks()] == ['задача 1']
+    finally:
+        shards.close()
+
+
+def test_shard_in_use_is_not_evicted(tmp_path):
+    shards = TaskShards(str(tmp_path / 'shards'), max_open=1)
+    try:
+        with shards.use(1) as first:
+            with shards.use(2):
+                pass
+            first.add_task('задача')
+            assert first.get_tasks_count() == 1
+        assert shards.open_count() == 1
+    finally:
+        shards.close()
+
+
+def test_slow_load_does_not_block_other_chats(tmp_path):
+    """Завантаження файлу одного чату не тримає загальне блокування"""
+    shards = TaskShards(str(tmp_path / 'shards'))
+    loading = threading.Event()
+    release = threading.Event()
+    open_manager = shards._open_manager
+
+    def slow_open(key, tenant):
+        if tenant == 'slow':
+            loading.set()
+            release.wait(5)
+        return open_manager(key, tenant)
+
+    shards._open_manager = slow_open
+    results = {}
+
+    def use(tenant):
+        with shards.use(tenant) as task_manager:
+            results.setdefault(tenant, []).append(task_manager)
+
+    slow = [threading.Thread(target=use, args=('slow',)) for _ in range(2)]
+    try:
+        slow[0].start()
+        assert loading.wait(5)
+        slow[1].start()
+
+        fast = threading.Thread(target=use, args=('fast',))
+        fast.start()
+        fast.join(5)
+        assert not fast.is_alive()
+        assert 'slow' not in results
+
+        release.set()
+        for thread in slow:
+            thread.join(5)
+        # Обидва звернення отримали один менеджер задач
+        assert len(results['slow']) == 2 and results['slow'][0] is results['slow'][1]
+    finally:
+        release.set()
+        shards.close()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import threading
+
+import pytest
+
+from src.task_index import TaskIndex, UNDATED, due_key
+from src.task_manager import TaskManager, STORAGE_JOURNAL
+from src.task_snapshot import SORT_DUE_DATE, SORT_ID, SORT_ID_DESC, _read_throughput
+
+CATEGORIES = ['робота', 'дім', None]
+PRIORITIES = ['high', 'medium', 'low', None]
+
+
+def make_manager(tmp_path, **kwargs):
+    """Менеджер задач у тимчасовому каталозі"""
+    return TaskManager(str(tmp_path / 'tasks.json'), storage=STORAGE_JOURNAL, **kwargs)
+
+
+def check_snapshot(snapshot):
+    """
+    Перевірка узгодженості знімка: індекси описують саме ті задачі, що є в знімку
+
+    :param snapshot: TaskSnapshot
+    """
+    tasks = snapshot.tasks
+    assert sorted(snapshot.index.keys()) == sorted(tasks)
+    assert snapshot.get_completed_count() + snapshot.get_pending_count() == len(tasks)
+
+    for field in ('completed', 'category', 'priority'):
+        expected = {}
+        for task_id, task in tasks.items():
+            expected.setdefault(TaskIndex.field_value(task, field), []).append(task_id)
+        for value, task_ids in expected.items():
+            assert snapshot.index.lookup(field, value) == sorted(task_ids)
+            assert snapshot.index.count(field, value) == len(task_ids)
+
+    for task in tasks.values():
+        assert snapshot.get_task_by_name(task['name']) is task
+    assert len(snapshot.name_index) == len(tasks)
+
+    expected = []
+    for task_id, task in tasks.items():
+        due = due_key(task.get('due_date'))
+        expected.append((UNDATED if due is None else due, task_id, task.get('completed')))
+    expected.sort()
+    assert snapshot.due_index.entries() == [(due, task_id) for due, task_id, _ in expected]
+    assert snapshot.due_index.entries(pending_only=True) == [
+        (due, task_id) for due, task_id, completed in expected if not completed]
+
+
+def random_change(manager, rng, counter):
+    """Випадкове додавання, зміна або видалення задачі"""
+    task_ids = [task['id'] for task in manager.get_all_tasks()]
+    action = rng.random()
+    if action < 0.5 or not task_ids:
+        manager.add_task(f"задача {next(counter)}", completed=rng.random() < 0.3,
+                         due_date=rng.choice([None, '01.03.2025', '15.03.2025']),
+                         priority=rng.choice(PRIORITIES), category=rng.choice(CATEGORIES))
+    elif action < 0.8:
+        manager.update_task(rng.choice(task_ids), completed=rng.random() < 0.5,
+                            category=rng.choice(CATEGORIES), due_date=rng.choice([None, '10.03.2025']))
+    else:
+        manager.delete_task(rng.choice(task_ids))
+
+
+def test_snapshot_is_not_changed_by_later_writes(tmp_path):
+    """Знімок, отриманий до змін, не бачить їх, а новий знімок - бачить"""
+    manager = make_manager(tmp_path)
+    try:
+        for number in range(10):
+            manager.add_task(f"задача {number}", category='робота', due_date='01.03.2025')
+        before = manager.snapshot()
+        tasks_before = dict(before.tasks)
+
+        manager.update_task(1, completed=True, category='дім')
+        manager.delete_task(2)
+        manager.add_task('нова задача', category='робота')
+
+        assert before.tasks == tasks_before
+        assert before.get_completed_count() == 0
+        assert before.index.lookup('category', 'робота') == list(range(1, 11))
+        assert before.search_tasks('нова') == []
+        check_snapshot(before)
+
+        after = manager.snapshot()
+        assert after.version > before.version
+        assert after.get_completed_count() == 1
+        assert 2 not in after.tasks
+        assert [task['name'] for task in after.search_tasks('нова')] == ['нова задача']
+        check_snapshot(after)
+    finally:
+        manager.close()
+
+
+def test_reads_without_changes_reuse_snapshot(tmp_path):
+    """Читання без змін між ними не публікують новий знімок"""
+    manager = make_manager(tmp_path)
+    try:
+        manager.add_task('задача')
+        snapshot = manager.snapshot()
+        manager.get_stats()
+        assert manager.snapshot() is snapshot
+    finally:
+        manager.close()
+
+
+def test_concurrent_readers_see_consistent_snapshots(tmp_path):
+    """Паралельні читачі під час змін отримують лише узгоджені знімки"""
+    manager = make_manager(tmp_path)
+    stop = threading.Event()
+    errors = []
+    checked = []
+
+    def reader():
+        version = -1
+        try:
+            while not stop.is_set():
+                snapshot = manager.snapshot()
+                assert snapshot.version >= version
+                version = snapshot.version
+                check_snapshot(snapshot)
+                checked.append(version)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in readers:
+        thread.start()
+    try:
+        rng = random.Random(16)
+        counter = iter(range(10 ** 6))
+        for step in range(600):
+            if stop.is_set():
+                break
+            if step % 50 == 0:
+                with manager.batch():
+                    for _ in range(10):
+                        random_change(manager, rng, counter)
+            else:
+                random_change(manager, rng, counter)
+    finally:
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+    try:
+        assert not errors, errors[0]
+        assert checked
+        check_snapshot(manager.snapshot())
+    finally:
+        manager.close()
+
+
+def test_read_throughput_benchmark(tmp_path):
+    """Вимірювання з main(): читачі не бачать неузгоджених знімків під час запису"""
+    task_manager = TaskManager(str(tmp_path / 'tasks.json'))
+    try:
+        with task_manager.batch():
+            for number in range(200):
+                task_manager.add_task(f'задача {number}', completed=number % 2 == 0)
+        rate, torn = _read_throughput(task_manager, readers=2, duration=0.3)
+        assert rate > 0
+        assert torn == 0
+    finally:
+        task_manager.close()
+
+
+@pytest.fixture
+def paged(tmp_path):
+    """25 задач з різними термінами (частина без терміну), категоріями та статусом"""
+    manager = TaskManager(str(tmp_path / 'tasks.json'))
+    dates = ['05.03.2025', '2025-03-01', None, '01.03.2025 09:00', '2025-02-28T18:00:00']
+    with manager.batch():
+        for number in range(25):
+            manager.add_task(f'задача {number + 1}', completed=number % 3 == 0, due_date=dates[number % 5],
+                             category=CATEGORIES[number % 3])
+    yield manager
+    manager.close()
+
+
+def expected_order(manager, sort, **filters):
+    """Очікуваний порядок ID, побудований без індексів"""
+    tasks = [task for task in manager.get_all_tasks()
+             if all(TaskIndex.field_value(task, field) == value for field, value in filters.items())]
+    if sort == SORT_DUE_DATE:
+        tasks.sort(key=lambda task: (due_key(task.get('due_date')) or UNDATED, task['id']))
+    else:
+        tasks.sort(key=lambda task: task['id'], reverse=sort == SORT_ID_DESC)
+    return [task['id'] for task in tasks]
+
+
+def walk(manager, sort, limit=10, **filters):
+    """Перебір усіх сторінок вперед, а потім назад від останньої"""
+    pages = [manager.list_tasks(limit=limit, sort=sort, **filters)]
+    while pages[-1]['next_cursor']:
+        pages.append(manager.list_tasks(pages[-1]['next_cursor'], limit=limit, sort=sort, **filters))
+    backward = [pages[-1]]
+    while backward[-1]['prev_cursor']:
+        backward.append(manager.list_tasks(backward[-1]['prev_cursor'], limit=limit, sort=sort, **filters))
+    return ([[task['id'] for task in page['tasks']] for page in pages],
+            [[task['id'] for task in page['tasks']] for page in reversed(backward)])
+
+
+@pytest.mark.parametrize('sort', [SORT_ID, SORT_ID_DESC, SORT_DUE_DATE])
+@pytest.mark.parametrize('filters', [{}, {'completed': False}, {'completed': True}, {'category': 'робота'},
+                                     {'completed': False, 'category': 'дім'}])
+def test_pages_cover_all_tasks_in_order(paged, sort, filters):
+    """Сторінки вперед і назад дають ті самі задачі в порядку сортування з урахуванням фільтрів"""
+    expected = expected_order(paged, sort, **filters)
+    forward, backward = walk(paged, sort, limit=4, **filters)
+
+    assert [task_id for page in forward for task_id in page] == expected
+    assert backward == forward
+    assert all(len(page) == 4 for page in forward[:-1])
+
+
+def test_page_cursors(paged):
+    first = paged.list_tasks(limit=10)
+    assert [task['id'] for task in first['tasks']] == list(range(1, 11))
+    assert first['prev_cursor'] is None and first['next_cursor'] == '>10'
+
+    last = paged.list_tasks('>20', limit=10)
+    assert [task['id'] for task in last['tasks']] == list(range(21, 26))
+    assert last['next_cursor'] is None and last['prev_cursor'] == '<21'
+
+    newest = paged.list_tasks(limit=10, sort=SORT_ID_DESC)
+    assert [task['id'] for task in newest['tasks']] == list(range(25, 15, -1))
+    assert newest['next_cursor'] == '>16'
+
+    due = paged.list_tasks(limit=3, sort=SORT_DUE_DATE)
+    assert due['next_cursor'] == f">{due_key('2025-02-28T18:00:00')}.{due['tasks'][-1]['id']}"
+
+
+def test_short_previous_page_falls_back_to_first_page(paged):
+    """Якщо перед курсором задач менше за сторінку, показується перша сторінка"""
+    page = paged.list_tasks('>3', limit=10)
+    assert [task['id'] for task in page['tasks']] == list(range(4, 14))
+
+    previous = paged.list_tasks(page['prev_cursor'], limit=10)
+    assert [task['id'] for task in previous['tasks']] == list(range(1, 11))
+    assert previous['prev_cursor'] is None
+    assert previous['next_cursor'] == '>10'
+
+
+def test_cursor_survives_deleted_task(paged):
+    """Курсор - позиція в порядку сортування, тому видалення задачі на межі сторінки нічого не пропускає"""
+    page = paged.list_tasks(limit=10)
+    paged.delete_task(10)
+    following = paged.list_tasks(page['next_cursor'], limit=10)
+    assert [task['id'] for task in following['tasks']] == list(range(11, 21))
+
+
+@pytest.mark.parametrize('cursor, sort, filters', [
+    (None, 'name', {}),
+    (None, SORT_ID, {'name': 'задача 1'}),
+    ('10', SORT_ID, {}),
+    ('>abc', SORT_ID, {}),
+    ('>10', SORT_DUE_DATE, {})
+])
+def test_invalid_page_requests_are_rejected(paged, cursor, sort, filters):
+    with pytest.raises(ValueError):
+        paged.list_tasks(cursor, limit=10, sort=sort, **filters)
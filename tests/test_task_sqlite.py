@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sqlite3
+import threading
+
+import pytest
+
+from src.task_sqlite import SQLiteTaskManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Менеджер задач SQLite у тимчасовому каталозі"""
+    task_manager = SQLiteTaskManager(str(tmp_path / 'tasks.db'))
+    yield task_manager
+    task_manager.close()
+
+
+def test_duplicate_name_is_rejected(manager):
+    assert manager.add_task('звіт')
+    assert manager.add_task('звіт') is False
+    assert manager.get_tasks_count() == 1
+
+
+def test_unique_index_rejects_duplicates(manager):
+    """Унікальність назв забезпечує сама база"""
+    manager.add_task('звіт')
+    with pytest.raises(sqlite3.IntegrityError):
+        with manager.conn:
+            manager.conn.execute("INSERT INTO tasks (name) VALUES ('звіт')")
+
+
+def test_concurrent_adds_create_one_task(manager):
+    """Паралельні додавання задачі з однією назвою створюють одну задачу"""
+    results = []
+    barrier = threading.Barrier(8)
+
+    def add():
+        barrier.wait()
+        results.append(manager.add_task('звіт'))
+
+    threads = [threading.Thread(target=add) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    assert manager.get_tasks_count() == 1
+
+
+def test_rename_onto_existing_name_is_rejected(manager):
+    manager.add_task('звіт')
+    manager.add_task('лист')
+    assert manager.update_task(2, name='звіт') is False
+    assert manager.get_task_by_id(2)['name'] == 'лист'
+    assert manager.update_task(2, name='лист', priority='high')
+    assert manager.update_task(2, name='нова назва')
+    assert manager.get_task_by_name('нова назва')['id'] == 2
+
+
+def test_completed_at_follows_completed(manager):
+    """completed_at встановлюється під час виконання і скидається при поверненні"""
+    manager.add_task('звіт')
+    assert manager.get_task_by_id(1).get('completed_at') is None
+
+    manager.mark_completed(1)
+    task = manager.get_task_by_id(1)
+    assert task['completed'] and task['completed_at']
+
+    manager.mark_completed(1, False)
+    task = manager.get_task_by_id(1)
+    assert not task['completed'] and task['completed_at'] is None
+
+    manager.add_task('лист', completed=True)
+    task = manager.get_task_by_name('лист')
+    assert task['completed_at'] == task['created_at']
+
+
+def test_old_index_is_made_unique(tmp_path):
+    """Неунікальний індекс назв зі старої схеми замінюється унікальним"""
+    path = str(tmp_path / 'tasks.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                 "completed INTEGER NOT NULL DEFAULT 0, due_date TEXT, priority TEXT, category TEXT, "
+                 "created_at TEXT, updated_at TEXT, extra TEXT)")
+    conn.execute("CREATE INDEX idx_tasks_name ON tasks(name)")
+    conn.commit()
+    conn.close()
+
+    manager = SQLiteTaskManager(path)
+    try:
+        unique = {row['name']: row['unique'] for row in manager.conn.execute("PRAGMA index_list(tasks)")}
+        assert unique['idx_tasks_name']
+    finally:
+        manager.close()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import json
+
+import pytest
+
+from src.task_manager import TaskManager
+from src.task_transfer import FORMAT_CSV, FORMAT_NDJSON, parse_completed
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Менеджер задач у тимчасовому каталозі"""
+    task_manager = TaskManager(str(tmp_path / 'tasks.json'))
+    yield task_manager
+    task_manager.close()
+
+
+def ndjson(*rows):
+    """Файл NDJSON з об'єктів або готових рядків"""
+    return io.StringIO('\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows) + '\n')
+
+
+@pytest.mark.parametrize('value, expected', [
+    (True, True), (False, False), (1, True), (0, False),
+    ('true', True), ('false', False), ('False', False), (' 1 ', True), ('0', False)
+])
+def test_parse_completed(value, expected):
+    assert parse_completed(value) is expected
+
+
+@pytest.mark.parametrize('value', ['yes', 'так', '', 2, None, [], 1.0])
+def test_parse_completed_rejects_other_values(value):
+    with pytest.raises(ValueError):
+        parse_completed(value)
+
+
+def test_import_skips_rows_with_invalid_types(manager):
+    """Невірний рядок пропускається і рахується, решта імпорту зберігається"""
+    result = manager.import_tasks(ndjson(
+        {'name': 'звіт', 'category': 'робота'},
+        {'name': 'список', 'category': ['a', 'b']},
+        {'name': 'словник', 'category': {'a': 1}},
+        {'name': 42},
+        {'name': 'дата', 'due_date': 'завтра'},
+        {'name': 'пріоритет', 'priority': ['high']},
+        {'name': 'стан', 'completed': 'maybe'},
+        'не json',
+        '[1, 2]',
+        {'name': 'число', 'priority': 2, 'due_date': '2025-03-20'}
+    ), FORMAT_NDJSON)
+
+    assert result == {'added': 2, 'skipped': 0, 'invalid': 8}
+    assert [task['name'] for task in manager.get_all_tasks()] == ['звіт', 'число']
+
+
+def test_import_parses_completed_strictly(manager):
+    """Рядок "false" не означає виконану задачу"""
+    result = manager.import_tasks(ndjson(
+        {'name': 'a', 'completed': 'false'},
+        {'name': 'b', 'completed': 'true'},
+        {'name': 'c', 'completed': 0},
+        {'name': 'd', 'completed': 1}
+    ), FORMAT_NDJSON)
+
+    assert result['added'] == 4
+    completed = {task['name']: task['completed'] for task in manager.get_all_tasks()}
+    assert completed == {'a': False, 'b': True, 'c': False, 'd': True}
+    assert manager.get_task_by_name('b').get('completed_at')
+    assert not manager.get_task_by_name('a').get('completed_at')
+
+
+def test_import_skips_duplicates(manager):
+    """Дублікати назв (з менеджера та всередині файлу) пропускаються"""
+    manager.add_task('звіт')
+    result = manager.import_tasks(ndjson({'name': 'звіт'}, {'name': 'лист'}, {'name': 'лист'}), FORMAT_NDJSON)
+    assert result == {'added': 1, 'skipped': 2, 'invalid': 0}
+
+
+@pytest.mark.parametrize('file_format', [FORMAT_NDJSON, FORMAT_CSV])
+def test_export_import_round_trip(tmp_path, manager, file_format):
+    """Експортовані задачі імпортуються з тими самими полями"""
+    manager.add_task('звіт', due_date='20.03.2025', priority='high', category='робота')
+    manager.add_task('лист', category='дім')
+    manager.mark_completed(2)
+    path = str(tmp_path / f'tasks.{file_format}')
+    assert manager.export_tasks(path) == 2
+
+    target = TaskManager(str(tmp_path / 'imported.json'))
+    try:
+        assert target.import_tasks(path) == {'added': 2, 'skipped': 0, 'invalid': 0}
+        fields = ('name', 'completed', 'due_date', 'priority', 'category', 'created_at', 'completed_at')
+        assert ([{field: task.get(field) for field in fields} for task in target.get_all_tasks()] ==
+                [{field: task.get(field) for field in fields} for task in manager.get_all_tasks()])
+    finally:
+        target.close()
+
+
+def test_export_filters(tmp_path, manager):
+    """Експорт з фільтром записує лише відповідні задачі"""
+    manager.add_task('звіт', category='робота')
+    manager.add_task('лист', category='дім')
+    path = tmp_path / 'work.ndjson'
+    assert manager.export_tasks(str(path), category='робота') == 1
+    assert [json.loads(line)['name'] for line in path.read_text(encoding='utf-8').splitlines()] == ['звіт']
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import asyncio
+import threading
+
+from src import telegram_bot_extended
+from src.telegram_async import AsyncBotRunner
+from src.telegram_bot_extended import TelegramBotExtended, STATE_WAITING_TOKEN
+
+
+def message(update_id, chat_id):
+    return {'update_id': update_id, 'message': {'chat': {'id': chat_id}, 'text': str(update_id)}}
+
+
+class FakeClient:
+    """Клієнт з заздалегідь заданими пакетами оновлень; після них зупиняє цикл"""
+
+    def __init__(self, runner, batches):
+        self.runner = runner
+        self.batches = list(batches)
+        self.offsets = []
+
+    async def get_updates(self, offset=0, timeout=30, allowed_updates=None):
+        self.offsets.append(offset)
+        if self.batches:
+            return self.batches.pop(0)
+        self.runner.stop()
+        return []
+
+    async def close(self):
+        pass
+
+
+class FakeBot:
+    """Бот із синхронним обробником повідомлень"""
+
+    def __init__(self, delays=None):
+        self.token = 'token'
+        self.last_update_id = 0
+        self.delays = delays or {}
+        self.handled = []  # (ID чату, текст, час завершення)
+        self._lock = threading.Lock()
+
+    def handle_message(self, message):
+        chat_id = message['chat']['id']
+        time.sleep(self.delays.get(chat_id, 0))
+        with self._lock:
+            self.handled.append((chat_id, message['text'], time.monotonic()))
+
+
+def make_runner(bot, batches, **options):
+    """Цикл оновлень з клієнтом FakeClient"""
+    runner = AsyncBotRunner(bot, **options)
+    asyncio.run(runner.client.close())
+    runner.client = FakeClient(runner, batches)
+    return runner
+
+
+def run(bot, batches, **options):
+    """Запуск циклу до вичерпання пакетів"""
+    runner = make_runner(bot, batches, **options)
+    started = time.monotonic()
+    asyncio.run(runner.run())
+    return runner, started
+
+
+def test_slow_chat_does_not_delay_other_chats():
+    """Повільний обробник одного чату не затримує відповіді іншим"""
+    bot = FakeBot(delays={1: 0.5})
+    updates = [message(update_id, update_id % 5 + 1) for update_id in range(1, 21)]
+    runner, started = run(bot, [updates[:10], updates[10:]], workers=8)
+
+    assert len(bot.handled) == 20
+    assert bot.last_update_id == 20
+    assert runner.client.offsets[:3] == [1, 11, 21]
+    fast = [finished - started for chat_id, _, finished in bot.handled if chat_id != 1]
+    assert max(fast) < 0.3
+    # Чат 1 отримав 4 оновлення по 0.5 с - вони обробляються по черзі
+    slow = [finished - started for chat_id, _, finished in bot.handled if chat_id == 1]
+    assert len(slow) == 4 and slow[-1] >= 1.9
+
+
+def test_updates_of_one_chat_keep_order():
+    bot = FakeBot(delays={7: 0.01})
+    updates = [message(update_id, 7 if update_id % 2 else 8) for update_id in range(1, 31)]
+    run(bot, [updates[:15], updates[15:]], workers=8)
+
+    for chat_id in (7, 8):
+        texts = [int(text) for chat, text, _ in bot.handled if chat == chat_id]
+        assert texts == sorted(texts) and len(texts) == 15
+
+
+def test_async_handler_runs_concurrently():
+    """Асинхронні обробники виконуються одночасно в циклі подій"""
+    bot = FakeBot()
+    running = []
+    peak = []
+
+    async def handler(payload):
+        running.append(payload['chat']['id'])
+        peak.append(len(running))
+        await asyncio.sleep(0.1)
+        running.remove(payload['chat']['id'])
+
+    runner = make_runner(bot, [[message(update_id, update_id) for update_id in range(1, 51)]])
+    runner.on('message', handler)
+    started = time.monotonic()
+    asyncio.run(runner.run())
+
+    assert max(peak) == 50
+    assert time.monotonic() - started < 1
+
+
+def test_in_flight_limit():
+    """Не більше max_in_flight оновлень обробляються одночасно"""
+    bot = FakeBot()
+    running = []
+    peak = []
+
+    async def handler(payload):
+        running.append(payload)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(payload)
+
+    runner = make_runner(bot, [[message(update_id, update_id) for update_id in range(1, 31)]], max_in_flight=5)
+    runner.on('message', handler)
+    asyncio.run(runner.run())
+
+    assert max(peak) == 5
+    assert len(peak) == 30
+
+
+def test_sync_bot_handlers_save_config_safely(tmp_path, monkeypatch):
+    """Синхронні обробники бота в потоках runner'а змінюють конфігурацію по черзі"""
+    monkeypatch.chdir(tmp_path)
+    writes = []
+    active = []
+    write_atomic = telegram_bot_extended.write_atomic
+
+    def slow_write(path, data):
+        active.append(1)
+        writes.append(len(active))
+        time.sleep(0.05)
+        write_atomic(path, data)
+        active.pop()
+
+    monkeypatch.setattr(telegram_bot_extended, 'write_atomic', slow_write)
+    bot = TelegramBotExtended(fallback_token='token')
+    bot.api_request = lambda method, data=None, files=None, timeout=None, raise_rate_limit=False: {}
+    bot.user_states = {101: STATE_WAITING_TOKEN, 202: STATE_WAITING_TOKEN}
+    updates = [{'update_id': update_id, 'message': {'chat': {'id': chat_id}, 'from': {'id': chat_id}, 'text': text}}
+               for update_id, chat_id, text in ((1, 101, 'token-a'), (2, 202, 'token-b'))]
+    try:
+        asyncio.run(make_runner(bot, [updates], workers=4).run())
+    finally:
+        bot.outbox.close(5)
+        bot.task_manager.close()
+
+    # Перший запис зберігає chat_id, потім по одному запису на кожен токен
+    assert writes == [1, 1, 1]
+    with open(telegram_bot_extended.CONFIG_FILE, encoding='utf-8') as f:
+        config = json.load(f)
+    assert config['chat_id'] == bot.chat_id
+    assert config['token'] == bot.token
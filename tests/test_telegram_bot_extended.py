@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import threading
+
+import pytest
+
+from src import telegram_bot_extended
+from src.telegram_bot_extended import TelegramBotExtended, STATE_WAITING_TOKEN
+from src.update_poller import UpdatePoller
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    """Бот у тимчасовому каталозі; запити до API записуються замість відправки"""
+    monkeypatch.chdir(tmp_path)
+    telegram_bot = TelegramBotExtended(fallback_token='token')
+    telegram_bot.requests = []
+
+    def api_request(method, data=None, files=None, timeout=None, raise_rate_limit=False):
+        telegram_bot.requests.append((method, data))
+        return {'message_id': 1}
+
+    telegram_bot.api_request = api_request
+    yield telegram_bot
+    telegram_bot.outbox.close(5)
+    telegram_bot.task_manager.close()
+
+
+def press(bot, data):
+    """Натискання inline кнопки"""
+    bot.handle_callback_query({'id': 'query', 'data': data, 'from': {'id': 5},
+                               'message': {'chat': {'id': 5}, 'message_id': 10}})
+    bot.outbox.close(5)
+
+
+def test_task_action_data_round_trip():
+    data = TelegramBotExtended.task_action_data('delete', 42)
+    assert data == 'v2:delete:42'
+    assert TelegramBotExtended.parse_task_action(data) == ('delete', 42)
+    assert TelegramBotExtended.parse_task_action('delete_42') is None
+    assert TelegramBotExtended.parse_task_action('v1:delete:42') is None
+    assert TelegramBotExtended.parse_task_action('v2:rename:42') is None
+
+
+def test_task_buttons_carry_version_and_id():
+    buttons = TelegramBotExtended.task_action_buttons([{'id': 7, 'name': 'a'}, {'id': 9, 'name': 'b'}])
+    assert [[button['callback_data'] for button in row] for row in buttons] == [
+        ['v2:complete:7', 'v2:uncomplete:7', 'v2:delete:7'],
+        ['v2:complete:9', 'v2:uncomplete:9', 'v2:delete:9']
+    ]
+
+
+def test_versioned_button_acts_on_task_id(bot):
+    bot.task_manager.add_task('перша')
+    bot.task_manager.add_task('друга')
+    press(bot, 'v2:complete:2')
+    assert bot.task_manager.get_task_by_id(2)['completed']
+    assert not bot.task_manager.get_task_by_id(1)['completed']
+    assert bot.requests[0] == ('answerCallbackQuery', {'callback_query_id': 'query'})
+
+
+@pytest.mark.parametrize('data', ['complete_1', 'uncomplete_1', 'delete_1'])
+def test_unversioned_button_is_outdated(bot, data):
+    """Кнопка зі старих повідомлень (позиція задачі) нічого не змінює"""
+    bot.task_manager.add_task('задача')
+    bot.task_manager.mark_completed(1)
+    press(bot, data)
+
+    task = bot.task_manager.get_task_by_id(1)
+    assert task is not None and task['completed']
+    method, answer = bot.requests[0]
+    assert method == 'answerCallbackQuery'
+    assert answer['show_alert'] and 'застаріла' in answer['text']
+    assert len(bot.requests) == 1
+
+
+def poll_once(bot, updates):
+    """Обробка пакета оновлень через UpdatePoller, як у polling()"""
+    batches = [updates]
+    poller = UpdatePoller(bot, workers=4)
+
+    def get_updates(offset=0, timeout=30, limit=None):
+        if batches:
+            return batches.pop()
+        poller.stop()
+        return []
+
+    bot.get_updates = get_updates
+    poller.run()
+    bot.outbox.close(5)
+
+
+@pytest.fixture
+def slow_config_writes(monkeypatch):
+    """Повільний запис конфігурації, щоб обробники двох чатів перетиналися"""
+    writes = []
+    active = []
+    write_atomic = telegram_bot_extended.write_atomic
+
+    def slow_write(path, data):
+        active.append(threading.get_ident())
+        writes.append((len(active), data))
+        time.sleep(0.05)
+        write_atomic(path, data)
+        active.pop()
+
+    monkeypatch.setattr(telegram_bot_extended, 'write_atomic', slow_write)
+    return writes
+
+
+def message(update_id, chat_id, text):
+    return {'update_id': update_id, 'message': {'chat': {'id': chat_id}, 'from': {'id': chat_id}, 'text': text}}
+
+
+def test_first_chat_id_is_saved_once(bot, slow_config_writes):
+    """Два чати одночасно: chat_id зберігається один раз і збігається з файлом"""
+    poll_once(bot, [message(1, 101, 'привіт'), message(2, 202, 'привіт')])
+
+    assert len(slow_config_writes) == 1
+    assert bot.chat_id in (101, 202)
+    with open(telegram_bot_extended.CONFIG_FILE, encoding='utf-8') as f:
+        assert json.load(f)['chat_id'] == bot.chat_id
+
+
+def test_concurrent_config_changes_are_serialized(bot, slow_config_writes):
+    """Записи конфігурації з різних потоків не перетинаються, і файл містить останній стан"""
+    bot.chat_id = 1
+    bot.user_states = {101: STATE_WAITING_TOKEN, 202: STATE_WAITING_TOKEN}
+    poll_once(bot, [message(1, 101, 'token-a'), message(2, 202, 'token-b')])
+
+    assert len(slow_config_writes) == 2
+    assert all(concurrent == 1 for concurrent, _ in slow_config_writes)
+    with open(telegram_bot_extended.CONFIG_FILE, encoding='utf-8') as f:
+        assert json.load(f)['token'] == bot.token
+    assert bot.token in ('token-a', 'token-b')
+
+
+def page_buttons(markup):
+    """Дані кнопок переходу між сторінками"""
+    return [button['callback_data'] for row in markup['inline_keyboard'] for button in row
+            if button['callback_data'].startswith('page_')]
+
+
+def listed_names(text):
+    return [line.split('. ', 1)[1].split(' ', 1)[1] for line in text.splitlines() if '. ' in line]
+
+
+@pytest.fixture
+def screens(bot):
+    """Повідомлення зі списками задач без черги вихідних повідомлень (ліміт 1 повідомлення на секунду в чаті)"""
+    sent = []
+    bot.send_message = lambda chat_id, text, reply_markup=None, **kwargs: sent.append(
+        ('sendMessage', {'chat_id': chat_id, 'text': text, 'reply_markup': reply_markup}))
+    bot.edit_message_text = lambda chat_id, message_id, text, reply_markup=None, **kwargs: sent.append(
+        ('editMessageText', {'chat_id': chat_id, 'message_id': message_id, 'text': text, 'reply_markup': reply_markup}))
+    return sent
+
+
+def click(bot, data):
+    bot.handle_callback_query({'id': 'query', 'data': data, 'from': {'id': 5},
+                               'message': {'chat': {'id': 5}, 'message_id': 10}})
+
+
+def test_page_buttons_edit_the_list_message(bot, screens):
+    """Кнопки сторінок редагують те саме повідомлення наступною та попередньою сторінкою"""
+    with bot.task_manager.batch():
+        for number in range(1, 26):
+            bot.task_manager.add_task(f'задача{number:02d}', completed=number % 2 == 0)
+
+    bot.show_task_list(5, 'pending')
+    method, first = screens[-1]
+    assert method == 'sendMessage'
+    assert listed_names(first['text']) == [f'задача{number:02d}' for number in range(1, 20, 2)]
+    assert page_buttons(first['reply_markup']) == ['page_pending_>19']
+
+    click(bot, 'page_pending_>19')
+    method, second = screens[-1]
+    assert method == 'editMessageText' and second['message_id'] == 10
+    assert listed_names(second['text']) == ['задача21', 'задача23', 'задача25']
+    assert page_buttons(second['reply_markup']) == ['page_pending_<21']
+
+    click(bot, 'page_pending_<21')
+    method, third = screens[-1]
+    assert listed_names(third['text']) == listed_names(first['text'])
+    assert page_buttons(third['reply_markup']) == ['page_pending_>19']
+
+
+def test_broken_page_button_shows_first_page(bot, screens):
+    bot.task_manager.add_task('задача')
+    click(bot, 'page_all_>oops')
+    method, data = screens[-1]
+    assert method == 'editMessageText'
+    assert listed_names(data['text']) == ['задача']
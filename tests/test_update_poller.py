@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+from collections import deque
+
+from src.http_transport import HttpTransport
+from src.update_poller import UpdatePoller, _BenchmarkAPI, _BenchmarkBot, chat_key
+
+
+def message(update_id, chat_id):
+    return {'update_id': update_id, 'message': {'chat': {'id': chat_id}, 'text': str(update_id)}}
+
+
+class FakeBot:
+    """Бот з заздалегідь заданими пакетами оновлень"""
+
+    def __init__(self, batches, handler=None):
+        self.batches = deque(batches)
+        self.handler = handler
+        self.last_update_id = 0
+        self.polls = []     # (час, offset, timeout, limit)
+        self.handled = []   # (ID чату, ID оновлення)
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def get_updates(self, offset=0, timeout=30, limit=None):
+        self.polls.append((time.monotonic(), offset, timeout, limit))
+        if self.batches:
+            return self.batches.popleft()
+        self.done.set()
+        time.sleep(0.01)
+        return []
+
+    def handle_update(self, update):
+        if self.handler:
+            self.handler(update)
+        with self._lock:
+            self.handled.append((chat_key(update), update['update_id']))
+
+
+def run(bot, **options):
+    """Опитування до вичерпання пакетів і завершення обробки"""
+    poller = UpdatePoller(bot, **options)
+    thread = threading.Thread(target=poller.run)
+    thread.start()
+    assert bot.done.wait(5)
+    poller.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+    return poller
+
+
+def test_chat_key():
+    assert chat_key(message(1, 42)) == 42
+    assert chat_key({'update_id': 2, 'callback_query': {'from': {'id': 7}, 'message': {'chat': {'id': 9}}}}) == 9
+    assert chat_key({'update_id': 3, 'inline_query': {'from': {'id': 7}}}) == 7
+
+
+def test_next_poll_does_not_wait_for_handlers():
+    """Наступний getUpdates надсилається, поки обробляється попередній пакет, без паузи"""
+    release = threading.Event()
+    bot = FakeBot([[message(1, 1)], [message(2, 2)]], handler=lambda update: release.wait(5))
+
+    poller = UpdatePoller(bot)
+    thread = threading.Thread(target=poller.run)
+    thread.start()
+    try:
+        assert bot.done.wait(2)
+        assert not bot.handled
+        gaps = [later[0] - earlier[0] for earlier, later in zip(bot.polls, bot.polls[1:3])]
+        assert max(gaps) < 0.5
+        assert [poll[1] for poll in bot.polls[:3]] == [1, 2, 3]
+    finally:
+        release.set()
+        poller.stop()
+        thread.join(5)
+    assert sorted(bot.handled) == [(1, 1), (2, 2)]
+
+
+def test_full_batch_polls_again_without_timeout():
+    bot = FakeBot([[message(1, 1), message(2, 2)], [message(3, 3)]])
+    run(bot, limit=2, poll_timeout=30)
+    assert [poll[2] for poll in bot.polls[:3]] == [30, 0, 30]
+    assert bot.polls[0][3] == 2
+
+
+def test_updates_of_one_chat_are_handled_in_order():
+    """Оновлення одного чату - по черзі в порядку надходження, різних чатів - паралельно"""
+    active = {}
+    overlap = []
+    lock = threading.Lock()
+
+    def handler(update):
+        chat_id = chat_key(update)
+        with lock:
+            if active.get(chat_id):
+                overlap.append(chat_id)
+            active[chat_id] = True
+        time.sleep(0.02)
+        with lock:
+            active[chat_id] = False
+
+    updates = [message(update_id, update_id % 4) for update_id in range(1, 41)]
+    bot = FakeBot([updates[:20], updates[20:]], handler=handler)
+    started = time.monotonic()
+    run(bot, workers=4)
+    deadline = time.monotonic() + 5
+    while len(bot.handled) < 40 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not overlap
+    for chat_id in range(4):
+        handled = [update_id for chat, update_id in bot.handled if chat == chat_id]
+        assert handled == sorted(handled) and len(handled) == 10
+    # 40 обробок по 20 мс у 4 чатах паралельно - близько 0.2 с замість 0.8 с
+    assert time.monotonic() - started < 0.7
+
+
+def test_reply_latency_against_fake_api():
+    """Відповіді на повідомлення з локального імітатора Bot API надходять без паузи між запитами"""
+    api = _BenchmarkAPI()
+    transport = HttpTransport()
+    bot = _BenchmarkBot(api, transport)
+    poller = UpdatePoller(bot, poll_timeout=1)
+    thread = threading.Thread(target=poller.run)
+    thread.start()
+    try:
+        for number in range(20):
+            api.push(1 + number % 9)  # Без повільних чатів (кратних 10)
+            time.sleep(0.01)
+        deadline = time.monotonic() + 5
+        while len(api.replied) < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        poller.stop()
+        thread.join(5)
+        api.server.shutdown()
+        transport.close()
+
+    latencies = [api.replied[update_id] - pushed for update_id, pushed in api.pushed.items()]
+    assert len(latencies) == 20
+    assert max(latencies) < 0.5